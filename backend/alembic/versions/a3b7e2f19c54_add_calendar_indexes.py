@@ -0,0 +1,27 @@
+"""add_calendar_indexes
+
+Revision ID: a3b7e2f19c54
+Revises: e5a9c0d4f6b2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b7e2f19c54'
+down_revision: Union[str, None] = 'e5a9c0d4f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_lessons_school_date', 'lessons', ['school_id', 'lesson_date'], unique=False)
+    op.create_index('ix_events_start_datetime', 'events', ['start_datetime'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_start_datetime', table_name='events')
+    op.drop_index('ix_lessons_school_date', table_name='lessons')
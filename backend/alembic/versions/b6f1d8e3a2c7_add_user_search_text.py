@@ -0,0 +1,65 @@
+"""add_user_search_text
+
+Revision ID: b6f1d8e3a2c7
+Revises: a3b7e2f19c54
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f1d8e3a2c7'
+down_revision: Union[str, None] = 'a3b7e2f19c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+_TURKISH_I_FOLD = str.maketrans({"I": "i", "İ": "i", "ı": "i"})
+
+
+def _fold(*parts: str | None) -> str:
+    """Bu revizyondaki app.utils.fold_search_text kopyasi (uygulama kodu degisse de sabit kalir)."""
+    text = " ".join(part for part in parts if part).translate(_TURKISH_I_FOLD)
+    text = "".join(
+        ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)
+    )
+    return " ".join(text.casefold().split())
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('users', sa.Column('search_text', sa.String(length=500), nullable=True))
+
+    conn = op.get_bind()
+    users = sa.table(
+        'users',
+        sa.column('id'), sa.column('first_name'), sa.column('last_name'),
+        sa.column('email'), sa.column('search_text'),
+    )
+    rows = conn.execute(sa.select(users.c.id, users.c.first_name, users.c.last_name, users.c.email)).all()
+    update = (
+        sa.update(users)
+        .where(users.c.id == sa.bindparam('user_id'))
+        .values(search_text=sa.bindparam('folded'))
+    )
+    for start in range(0, len(rows), BACKFILL_BATCH):
+        conn.execute(update, [
+            {'user_id': row.id, 'folded': _fold(row.first_name, row.last_name, row.email)}
+            for row in rows[start:start + BACKFILL_BATCH]
+        ])
+
+    op.create_index(
+        'ix_users_search_text_trgm', 'users', ['search_text'], unique=False,
+        postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_text_trgm', table_name='users')
+    op.drop_column('users', 'search_text')
@@ -0,0 +1,38 @@
+"""add_attendance_sync_operations
+
+Revision ID: c4d2a7e91b30
+Revises: f0888503e082
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2a7e91b30'
+down_revision: Union[str, None] = 'f0888503e082'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_sync_operations',
+        sa.Column('op_id', sa.String(length=64), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('lesson_id', sa.String(length=36), nullable=False),
+        sa.Column('student_id', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('detail', sa.String(length=200), nullable=True),
+        sa.Column('performed_by', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['performed_by'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('performed_by', 'op_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('attendance_sync_operations')
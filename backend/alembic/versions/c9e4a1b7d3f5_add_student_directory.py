@@ -0,0 +1,133 @@
+"""add_student_directory
+
+Revision ID: c9e4a1b7d3f5
+Revises: b6f1d8e3a2c7
+Create Date: 2026-10-17 00:00:00.000000
+
+Tablo mevcut ogrencilerden tek INSERT ... SELECT ile doldurulur. Sorgu
+uygulama kodundan alinmaz, bu revizyonda sabitlenmistir: gereken saat
+grade_requirements satirindan, yoksa derece varsayilanlarindan gelir; alt
+sinir varsayilandandir ve gereken saati gecemez.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e4a1b7d3f5'
+down_revision: Union[str, None] = 'b6f1d8e3a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _branch_columns(prefix: str) -> list:
+    return [
+        sa.Column(f'{prefix}_progress_id', sa.String(length=36), nullable=True),
+        sa.Column(f'{prefix}_grade', sa.Integer(), nullable=True),
+        sa.Column(f'{prefix}_completed_hours', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column(f'{prefix}_remaining_hours', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column(f'{prefix}_exam_eligibility', sa.String(length=20), nullable=True),
+    ]
+
+
+def _required(p: str) -> str:
+    return f"""COALESCE(
+        (SELECT gr.required_hours FROM grade_requirements gr
+         WHERE gr.branch = {p}.branch AND gr.grade = {p}.current_grade),
+        CASE
+            WHEN {p}.current_grade BETWEEN 1 AND 3 THEN 54
+            WHEN {p}.current_grade BETWEEN 4 AND 8 THEN 60
+            WHEN {p}.current_grade BETWEEN 9 AND 10 THEN 96
+            WHEN {p}.current_grade BETWEEN 11 AND 12 THEN 128
+            ELSE 0
+        END
+    )"""
+
+
+def _minimum(p: str) -> str:
+    default = f"""CASE
+        WHEN {p}.current_grade BETWEEN 1 AND 3 THEN 44
+        WHEN {p}.current_grade BETWEEN 4 AND 8 THEN 52
+        WHEN {p}.current_grade BETWEEN 9 AND 10 THEN 80
+        WHEN {p}.current_grade BETWEEN 11 AND 12 THEN 110
+        ELSE 0
+    END"""
+    return f"CASE WHEN {default} < {_required(p)} THEN {default} ELSE {_required(p)} END"
+
+
+def _progress_columns(p: str) -> str:
+    required = _required(p)
+    return f"""
+        {p}.id,
+        {p}.current_grade,
+        {p}.completed_hours,
+        CASE WHEN {required} - {p}.completed_hours < 0 THEN 0
+             ELSE {required} - {p}.completed_hours END,
+        CASE
+            WHEN {required} = 0 THEN 'ELIGIBLE'
+            WHEN {p}.completed_hours >= {required} THEN 'ELIGIBLE'
+            WHEN {p}.completed_hours >= {_minimum(p)} THEN 'NEEDS_APPROVAL'
+            ELSE 'NOT_ELIGIBLE'
+        END"""
+
+
+BACKFILL = f"""
+INSERT INTO student_directory (
+    student_id, user_id, school_id, created_at,
+    first_name, last_name, email, user_status, user_role, school_name,
+    date_of_birth, emergency_contact, emergency_phone, notes,
+    wt_progress_id, wt_grade, wt_completed_hours, wt_remaining_hours, wt_exam_eligibility,
+    escrima_progress_id, escrima_grade, escrima_completed_hours, escrima_remaining_hours,
+    escrima_exam_eligibility
+)
+SELECT
+    s.id, s.user_id, s.school_id, s.created_at,
+    u.first_name, u.last_name, u.email, u.status, u.role, sc.name,
+    s.date_of_birth, s.emergency_contact, s.emergency_phone, s.notes,
+    {_progress_columns('wt')},
+    {_progress_columns('es')}
+FROM students s
+JOIN users u ON u.id = s.user_id
+LEFT JOIN schools sc ON sc.id = s.school_id
+LEFT JOIN student_progress wt ON wt.student_id = s.id AND wt.branch = 'WING_TSUN'
+LEFT JOIN student_progress es ON es.student_id = s.id AND es.branch = 'ESCRIMA'
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'student_directory',
+        sa.Column('student_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('school_id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('user_status', sa.String(length=20), nullable=False),
+        sa.Column('user_role', sa.String(length=20), nullable=False),
+        sa.Column('school_name', sa.String(length=200), nullable=True),
+        sa.Column('date_of_birth', sa.Date(), nullable=True),
+        sa.Column('emergency_contact', sa.String(length=200), nullable=True),
+        sa.Column('emergency_phone', sa.String(length=20), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        *_branch_columns('wt'),
+        *_branch_columns('escrima'),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.create_index('ix_student_directory_school_created', 'student_directory', ['school_id', 'created_at'], unique=False)
+    op.create_index('ix_student_directory_status_created', 'student_directory', ['user_status', 'created_at'], unique=False)
+    op.create_index('ix_student_directory_created', 'student_directory', ['created_at'], unique=False)
+
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_student_directory_created', table_name='student_directory')
+    op.drop_index('ix_student_directory_status_created', table_name='student_directory')
+    op.drop_index('ix_student_directory_school_created', table_name='student_directory')
+    op.drop_table('student_directory')
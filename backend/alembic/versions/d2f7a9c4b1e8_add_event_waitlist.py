@@ -0,0 +1,40 @@
+"""add_event_waitlist
+
+Revision ID: d2f7a9c4b1e8
+Revises: c9e4a1b7d3f5
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c4b1e8'
+down_revision: Union[str, None] = 'c9e4a1b7d3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event_registrations',
+        sa.Column('status', sa.String(length=20), server_default='CONFIRMED', nullable=False),
+    )
+    op.create_index(
+        'ix_event_registrations_status', 'event_registrations', ['event_id', 'status', 'created_at']
+    )
+    op.add_column('events', sa.Column('seats_taken', sa.Integer(), server_default='0', nullable=False))
+    # Mevcut kayitlarin hepsi CONFIRMED
+    op.execute(
+        "UPDATE events SET seats_taken = "
+        "(SELECT count(*) FROM event_registrations r WHERE r.event_id = events.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'seats_taken')
+    op.drop_index('ix_event_registrations_status', table_name='event_registrations')
+    op.drop_column('event_registrations', 'status')
@@ -0,0 +1,47 @@
+"""add_hours_reconciliation_runs
+
+Revision ID: d81f3b6c2a47
+Revises: c4d2a7e91b30
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3b6c2a47'
+down_revision: Union[str, None] = 'c4d2a7e91b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'hours_reconciliation_runs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('since', sa.DateTime(), nullable=True),
+        sa.Column('fix', sa.Boolean(), nullable=False),
+        sa.Column('checked', sa.Integer(), nullable=False),
+        sa.Column('mismatched', sa.Integer(), nullable=False),
+        sa.Column('fixed', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_hours_reconciliation_runs_started_at'),
+        'hours_reconciliation_runs', ['started_at'], unique=False,
+    )
+    # Artimli mutabakatin "son dokunulan" taramalari icin
+    op.create_index('ix_attendances_created_at', 'attendances', ['created_at'], unique=False)
+    op.create_index('ix_student_progress_updated_at', 'student_progress', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_student_progress_updated_at', table_name='student_progress')
+    op.drop_index('ix_attendances_created_at', table_name='attendances')
+    op.drop_index(op.f('ix_hours_reconciliation_runs_started_at'), table_name='hours_reconciliation_runs')
+    op.drop_table('hours_reconciliation_runs')
@@ -0,0 +1,33 @@
+"""add_virtual_schedule_occurrences
+
+Revision ID: e5a9c0d4f6b2
+Revises: d81f3b6c2a47
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c0d4f6b2'
+down_revision: Union[str, None] = 'd81f3b6c2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'lesson_schedules',
+        sa.Column('is_virtual', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.add_column('lessons', sa.Column('occurrence_date', sa.DateTime(), nullable=True))
+    op.create_unique_constraint('uq_schedule_occurrence', 'lessons', ['schedule_id', 'occurrence_date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_schedule_occurrence', 'lessons', type_='unique')
+    op.drop_column('lessons', 'occurrence_date')
+    op.drop_column('lesson_schedules', 'is_virtual')
@@ -0,0 +1,53 @@
+"""add_hours_recompute_jobs
+
+Revision ID: e8c3f1a6b2d9
+Revises: d2f7a9c4b1e8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3f1a6b2d9'
+down_revision: Union[str, None] = 'd2f7a9c4b1e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'hours_recompute_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('branch', sa.String(length=20), nullable=False),
+        sa.Column('grade', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('updated', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('requested_by', sa.String(length=36), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_hours_recompute_jobs_created_at'),
+        'hours_recompute_jobs', ['created_at'], unique=False,
+    )
+    # (brans, derece) satirlarinin id sirasiyla parca parca taranmasi icin
+    op.create_index(
+        'ix_student_progress_branch_grade',
+        'student_progress', ['branch', 'current_grade', 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_student_progress_branch_grade', table_name='student_progress')
+    op.drop_index(op.f('ix_hours_recompute_jobs_created_at'), table_name='hours_recompute_jobs')
+    op.drop_table('hours_recompute_jobs')
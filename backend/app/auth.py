@@ -10,10 +10,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.database import get_db
-from app.models.user import User, UserRole, UserStatus
+from app.models.user import User, UserRole
 from app.permissions import Permission, user_has_permission
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.principal import Principal, invalidate_principal, load_principal
+from app.services.password_hashing import run_hashing
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -25,6 +32,17 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Async handler'lar bcrypt'i event loop disinda, sinirli havuzda calistirir
+# (bkz. app/services/password_hashing.py). Senkron fonksiyonlar seed/CLI betikleri icindir.
+async def hash_password(password: str) -> str:
+    return await run_hashing(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Sifreyi dogrular; hash eski bir maliyet faktoruyle uretildiyse yeni hash'i de dondurur."""
+    return await run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -41,34 +59,57 @@ def create_refresh_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def _user_id_from_token(token: str) -> str | None:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id: str = payload.get("sub")
+    token_type: str = payload.get("type")
+    if user_id is None or token_type != "access":
+        return None
+    return user_id
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> Principal:
+    """Yetki kontrolleri icin hafif, onbellekli principal (bkz. app/principal.py)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Kimlik doğrulama başarısız",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        if user_id is None or token_type != "access":
-            raise credentials_exception
-    except JWTError:
+    user_id = _user_id_from_token(token)
+    if user_id is None:
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    principal = await load_principal(db, user_id)
+    if principal is None:
+        raise credentials_exception
+    return principal
+
 
+async def get_current_user_record(
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Profil/parola gibi kullanicinin kendi satirini okuyan ya da degistiren endpoint'ler icin."""
+    result = await db.execute(select(User).where(User.id == principal.id))
+    user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        invalidate_principal(principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Kimlik doğrulama başarısız",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
-async def get_current_user_optional(request: Request, db: AsyncSession = Depends(get_db)) -> User | None:
-    """Return current user if Authorization header present, otherwise None."""
+async def get_current_user_optional(request: Request, db: AsyncSession = Depends(get_db)) -> Principal | None:
+    """Return current principal if Authorization header present, otherwise None."""
     auth = request.headers.get("authorization")
     if not auth:
         return None
@@ -78,28 +119,20 @@ async def get_current_user_optional(request: Request, db: AsyncSession = Depends
     else:
         token = auth
 
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        if user_id is None or token_type != "access":
-            return None
-    except JWTError:
+    user_id = _user_id_from_token(token)
+    if user_id is None:
         return None
-
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    return user
+    return await load_principal(db, user_id)
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     return current_user
 
 
 def require_roles(*roles: UserRole):
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role not in [r.value for r in roles]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -119,7 +152,7 @@ require_member_or_above = require_roles(UserRole.SUPER_ADMIN, UserRole.ADMIN, Us
 def require_admin_or_permission(permission: Permission):
     """Gercek ADMIN/SUPER_ADMIN her zaman gecer; MANAGER sadece ilgili extra_permissions
     anahtarina sahipse gecer. Granular yetki sistemi icin (bkz. app/permissions.py)."""
-    async def checker(current_user: User = Depends(get_current_user)) -> User:
+    async def checker(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role in (UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value):
             return current_user
         if current_user.role == UserRole.MANAGER.value and user_has_permission(current_user, permission):
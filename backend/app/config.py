@@ -16,6 +16,18 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Principal onbellegi (worker basina) - 0 onbellegi kapatir
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Sifre hash'leme - bcrypt maliyet faktoru ve worker basina thread havuzu
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Derece kurallari (GradeRequirement) worker basina bu aralikla yeniden yuklenir - 0 kapatir
+    GRADE_RULES_REFRESH_SECONDS: int = 60
+
     # App
     APP_NAME: str = "Wing Tsun & Escrima School Management"
     ENVIRONMENT: str = "development"
@@ -0,0 +1,79 @@
+"""Endpoint bazli iliski yukleme planlari.
+
+Modellerdeki tum iliskiler lazy="raise" ile tanimlidir: bir School ya da User
+yuklemek artik ogrenci/yoklama/kayit zincirini sessizce cekmez, yuklenmemis bir
+iliskiye erisim ise hemen hata verir. Her router response'unun gercekten
+ihtiyac duydugu iliskileri buradaki isimli planlardan biriyle acikca ister:
+
+    select(Student).options(*load_plan("student_list"))
+"""
+from sqlalchemy.orm import selectinload
+
+from app.models.attendance import Attendance
+from app.models.email_log import EmailLog
+from app.models.enrollment import Enrollment
+from app.models.event import Event, EventRegistration
+from app.models.grade_change_request import GradeChangeRequest
+from app.models.lesson import Lesson
+from app.models.product import Product
+from app.models.request import Request
+from app.models.school import School, SchoolManager
+from app.models.student import Student
+
+LOAD_PLANS: dict[str, tuple] = {
+    # Ogrenci listesi / detayi: kullanici, okul ve iki brans ilerlemesi
+    "student_list": (
+        selectinload(Student.user),
+        selectinload(Student.school),
+        selectinload(Student.progress),
+    ),
+    "student_detail": (
+        selectinload(Student.user),
+        selectinload(Student.school),
+        selectinload(Student.progress),
+    ),
+    # Onay/askiya alma gibi yalnizca kullanici alanlarina dokunan islemler
+    "student_user": (selectinload(Student.user),),
+    "student_dashboard": (
+        selectinload(Student.school),
+        selectinload(Student.progress),
+    ),
+    # Bir dersin yoklama listesi (ogrenci adlariyla)
+    "lesson_roster": (
+        selectinload(Attendance.student).selectinload(Student.user),
+    ),
+    # Cocuk satir sayilari app/services/counts.py alt sorgularindan gelir
+    "lesson_list": (selectinload(Lesson.school),),
+    "event_list": (selectinload(Event.selected_schools),),
+    "event_registrations": (
+        selectinload(EventRegistration.student).selectinload(Student.user),
+    ),
+    "grade_change_request": (
+        selectinload(GradeChangeRequest.student).selectinload(Student.user),
+        selectinload(GradeChangeRequest.student).selectinload(Student.school),
+        selectinload(GradeChangeRequest.requester),
+    ),
+    "request_list": (
+        selectinload(Request.student).selectinload(Student.user),
+        selectinload(Request.product),
+    ),
+    "enrollment_list": (
+        selectinload(Enrollment.user),
+        selectinload(Enrollment.school),
+    ),
+    "email_log_list": (selectinload(EmailLog.sender),),
+    "product_list": (selectinload(Product.category),),
+    "school_instructors": (
+        selectinload(School.managers).selectinload(SchoolManager.manager),
+    ),
+    "user_student": (selectinload(Student.school),),
+}
+
+
+def load_plan(name: str) -> tuple:
+    """Isimli yukleme planinin loader option'larini dondurur.
+
+    Bilinmeyen bir isim KeyError firlatir; yanlis yazilmis bir plan adi
+    sessizce "hicbir sey yukleme" anlamina gelmemeli.
+    """
+    return LOAD_PLANS[name]
@@ -1,3 +1,6 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -12,9 +15,14 @@ from slowapi.errors import RateLimitExceeded
 from sqlalchemy import text
 
 from app.config import settings
-from app.database import engine
+from app.database import AsyncSessionLocal, engine
 from app.models.base import Base
+from app.models.user import USER_SEARCH_SQLITE_DDL
 from app.rate_limit import limiter
+from app.services.grade_hours import load_grade_rules
+from app.services.password_hashing import shutdown_hashing_pool
+from app.services.student_directory import rebuild_student_directory
+from app.utils import fold_search_text
 
 
 async def _migrate_sqlite(conn):
@@ -34,13 +42,40 @@ async def _migrate_sqlite(conn):
         "exam_branch_escrima": "ALTER TABLE event_registrations ADD COLUMN exam_branch_escrima BOOLEAN DEFAULT 0",
         "needs_manager_approval": "ALTER TABLE event_registrations ADD COLUMN needs_manager_approval BOOLEAN DEFAULT 0",
         "manager_approved": "ALTER TABLE event_registrations ADD COLUMN manager_approved BOOLEAN DEFAULT 0",
+        "status": "ALTER TABLE event_registrations ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'CONFIRMED'",
+    })
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_event_registrations_status "
+        "ON event_registrations (event_id, status, created_at)"
+    ))
+
+    # events: kontenjan sayaci (CONFIRMED kayitlardan yeniden hesaplanir)
+    await _add_columns("events", {
+        "seats_taken": "ALTER TABLE events ADD COLUMN seats_taken INTEGER NOT NULL DEFAULT 0",
     })
+    await conn.execute(text(
+        "UPDATE events SET seats_taken = (SELECT count(*) FROM event_registrations r "
+        "WHERE r.event_id = events.id AND r.status = 'CONFIRMED')"
+    ))
 
-    # users: avatar, granular admin permissions
+    # users: avatar, granular admin permissions, search
     await _add_columns("users", {
         "avatar_url": "ALTER TABLE users ADD COLUMN avatar_url VARCHAR(1000)",
         "extra_permissions": "ALTER TABLE users ADD COLUMN extra_permissions JSON",
+        "search_text": "ALTER TABLE users ADD COLUMN search_text VARCHAR(500)",
     })
+    for statement in USER_SEARCH_SQLITE_DDL:
+        await conn.execute(text(statement))
+    result = await conn.execute(text(
+        "SELECT id, first_name, last_name, email FROM users WHERE search_text IS NULL"
+    ))
+    backfill = [
+        {"id": row.id, "search_text": fold_search_text(row.first_name, row.last_name, row.email)}
+        for row in result
+    ]
+    if backfill:
+        await conn.execute(text("UPDATE users SET search_text = :search_text WHERE id = :id"), backfill)
+    await conn.execute(text("INSERT INTO user_search(user_search) VALUES ('rebuild')"))
 
     # media: youtube, title, school_id
     await _add_columns("media", {
@@ -49,9 +84,18 @@ async def _migrate_sqlite(conn):
         "school_id": "ALTER TABLE media ADD COLUMN school_id VARCHAR(36) REFERENCES schools(id)",
     })
 
-    # lessons: schedule_id
+    # lessons: schedule_id, occurrence_date
     await _add_columns("lessons", {
         "schedule_id": "ALTER TABLE lessons ADD COLUMN schedule_id VARCHAR(36) REFERENCES lesson_schedules(id)",
+        "occurrence_date": "ALTER TABLE lessons ADD COLUMN occurrence_date DATETIME",
+    })
+    await conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_schedule_occurrence ON lessons (schedule_id, occurrence_date)"
+    ))
+
+    # lesson_schedules: virtual occurrences
+    await _add_columns("lesson_schedules", {
+        "is_virtual": "ALTER TABLE lesson_schedules ADD COLUMN is_virtual BOOLEAN NOT NULL DEFAULT 0",
     })
 
     # products: price
@@ -59,6 +103,45 @@ async def _migrate_sqlite(conn):
         "price": "ALTER TABLE products ADD COLUMN price NUMERIC(10,2)",
     })
 
+    # takvim: tarih araligi indeksleri
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_lessons_school_date ON lessons (school_id, lesson_date)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_events_start_datetime ON events (start_datetime)"
+    ))
+
+    # saat mutabakati: artimli tarama indeksleri
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_attendances_created_at ON attendances (created_at)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_student_progress_updated_at ON student_progress (updated_at)"
+    ))
+    # kalan saat yeniden hesaplama: (brans, derece) taramasi
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_student_progress_branch_grade "
+        "ON student_progress (branch, current_grade, id)"
+    ))
+
+    # ogrenci dizini: bos ise mevcut ogrencilerden doldurulur
+    if not (await conn.execute(text("SELECT 1 FROM student_directory LIMIT 1"))).first():
+        await rebuild_student_directory(conn)
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _refresh_grade_rules(interval: int):
+    """Diger worker'larda yapilan GradeRequirement degisikliklerini alir."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as session:
+                await load_grade_rules(session)
+        except Exception as exc:
+            logger.warning("Derece kurallari yenilenemedi: %s", exc)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -71,7 +154,15 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
             await _migrate_sqlite(conn)
+    async with AsyncSessionLocal() as session:
+        await load_grade_rules(session)
+    refresh_task = None
+    if settings.GRADE_RULES_REFRESH_SECONDS > 0:
+        refresh_task = asyncio.create_task(_refresh_grade_rules(settings.GRADE_RULES_REFRESH_SECONDS))
     yield
+    if refresh_task is not None:
+        refresh_task.cancel()
+    shutdown_hashing_pool()
     await engine.dispose()
 
 
@@ -124,6 +215,7 @@ from app.routers import enrollments
 from app.routers import lesson_schedules
 from app.routers import public
 from app.routers import site_content
+from app.routers import calendar
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -142,6 +234,7 @@ app.include_router(enrollments.router, prefix="/api/enrollments", tags=["Enrollm
 app.include_router(lesson_schedules.router, prefix="/api/lesson-schedules", tags=["LessonSchedules"])
 app.include_router(public.router, prefix="/api/public", tags=["Public"])
 app.include_router(site_content.router, prefix="/api/site-content", tags=["SiteContent"])
+app.include_router(calendar.router, prefix="/api/calendar", tags=["Calendar"])
 
 
 @app.get("/api/health")
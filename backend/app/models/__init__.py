@@ -2,10 +2,14 @@ from app.models.base import Base, TimestampMixin
 from app.models.user import User
 from app.models.school import School, SchoolManager
 from app.models.student import Student, StudentProgress
+from app.models.student_directory import StudentDirectory
 from app.models.grade import GradeRequirement
 from app.models.lesson_schedule import LessonSchedule
 from app.models.lesson import Lesson
 from app.models.attendance import Attendance
+from app.models.attendance_sync import AttendanceSyncOperation
+from app.models.hours_reconciliation import HoursReconciliationRun
+from app.models.hours_recompute import HoursRecomputeJob
 from app.models.event import Event, EventSchool, EventRegistration, SeminarEvaluation
 from app.models.product import ProductCategory, Product
 from app.models.request import Request
@@ -23,10 +27,14 @@ __all__ = [
     "SchoolManager",
     "Student",
     "StudentProgress",
+    "StudentDirectory",
     "GradeRequirement",
     "LessonSchedule",
     "Lesson",
     "Attendance",
+    "AttendanceSyncOperation",
+    "HoursReconciliationRun",
+    "HoursRecomputeJob",
     "Event",
     "EventSchool",
     "EventRegistration",
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Numeric, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import String, Numeric, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, UUIDMixin
 
@@ -9,6 +9,7 @@ class Attendance(Base, UUIDMixin):
     __tablename__ = "attendances"
     __table_args__ = (
         UniqueConstraint("lesson_id", "student_id", name="uq_lesson_student"),
+        Index("ix_attendances_created_at", "created_at"),
     )
 
     lesson_id: Mapped[str] = mapped_column(
@@ -22,5 +23,5 @@ class Attendance(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    lesson = relationship("Lesson", back_populates="attendances")
-    student = relationship("Student", back_populates="attendances")
+    lesson = relationship("Lesson", back_populates="attendances", lazy="raise")
+    student = relationship("Student", back_populates="attendances", lazy="raise")
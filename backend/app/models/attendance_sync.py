@@ -0,0 +1,41 @@
+import enum
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey, PrimaryKeyConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class SyncOperationType(str, enum.Enum):
+    ADD = "ADD"
+    REMOVE = "REMOVE"
+
+
+class SyncOperationStatus(str, enum.Enum):
+    APPLIED = "APPLIED"
+    ALREADY_APPLIED = "ALREADY_APPLIED"  # sunucu zaten istenen durumdaydi
+    SUPERSEDED = "SUPERSEDED"  # ayni batch'te ayni ders/ogrenci icin daha sonraki islem var
+    REJECTED = "REJECTED"
+
+
+class AttendanceSyncOperation(Base):
+    """Cevrimdisi yoklama senkronizasyonunda islenmis islemler.
+
+    op_id istemcinin urettigi kimliktir ve yalnizca gonderen kullanici icinde
+    tekildir; ayni islem tekrar gonderildiginde yeniden uygulanmaz, kaydedilen
+    sonuc dondurulur.
+    """
+    __tablename__ = "attendance_sync_operations"
+    __table_args__ = (PrimaryKeyConstraint("performed_by", "op_id"),)
+
+    op_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    operation: Mapped[str] = mapped_column(String(10), nullable=False)
+    lesson_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    student_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    detail: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    performed_by: Mapped[str] = mapped_column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(), server_default=func.now(), nullable=False
+    )
@@ -19,12 +19,15 @@ class AuditAction(str, enum.Enum):
     STUDENT_APPROVED = "STUDENT_APPROVED"
     STUDENT_REJECTED = "STUDENT_REJECTED"
     STUDENT_UPDATED = "STUDENT_UPDATED"
+    STUDENTS_IMPORTED = "STUDENTS_IMPORTED"
     REQUEST_HANDLED = "REQUEST_HANDLED"
     EVENT_COMPLETED = "EVENT_COMPLETED"
     MANUAL_GRADE_CHANGE = "MANUAL_GRADE_CHANGE"
     GRADE_CHANGE_REQUESTED = "GRADE_CHANGE_REQUESTED"
     GRADE_CHANGE_APPROVED = "GRADE_CHANGE_APPROVED"
     GRADE_CHANGE_REJECTED = "GRADE_CHANGE_REJECTED"
+    HOURS_RECONCILED = "HOURS_RECONCILED"
+    GRADE_REQUIREMENT_CHANGED = "GRADE_REQUIREMENT_CHANGED"
 
 
 class AuditLog(Base, UUIDMixin):
@@ -43,4 +46,4 @@ class AuditLog(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    performer = relationship("User", foreign_keys=[performed_by], lazy="selectin")
+    performer = relationship("User", foreign_keys=[performed_by], lazy="raise")
@@ -19,4 +19,4 @@ class EmailLog(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    sender = relationship("User", foreign_keys=[sent_by], lazy="selectin")
+    sender = relationship("User", foreign_keys=[sent_by], lazy="raise")
@@ -22,6 +22,6 @@ class Enrollment(Base, UUIDMixin, TimestampMixin):
     handled_by: Mapped[str | None] = mapped_column(String(36), ForeignKey("users.id"), nullable=True)
     handled_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
 
-    user = relationship("User", foreign_keys=[user_id])
-    school = relationship("School", foreign_keys=[school_id])
-    handler = relationship("User", foreign_keys=[handled_by])
+    user = relationship("User", foreign_keys=[user_id], lazy="raise")
+    school = relationship("School", foreign_keys=[school_id], lazy="raise")
+    handler = relationship("User", foreign_keys=[handled_by], lazy="raise")
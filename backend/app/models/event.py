@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import String, Text, Integer, Numeric, Boolean, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import String, Text, Integer, Numeric, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, TimestampMixin, UUIDMixin
 
@@ -16,8 +16,14 @@ class EventScope(str, enum.Enum):
     SELECTED_SCHOOLS = "SELECTED_SCHOOLS"
 
 
+class RegistrationStatus(str, enum.Enum):
+    CONFIRMED = "CONFIRMED"
+    WAITLISTED = "WAITLISTED"
+
+
 class Event(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "events"
+    __table_args__ = (Index("ix_events_start_datetime", "start_datetime"),)
 
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -26,16 +32,19 @@ class Event(Base, UUIDMixin, TimestampMixin):
     end_datetime: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
     location: Mapped[str] = mapped_column(String(300), nullable=False)
     capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # CONFIRMED kayit sayaci; kontenjan kontrolu bu sayac uzerinden atomik yapilir
+    # (bkz. app/services/event_registration.py)
+    seats_taken: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     scope: Mapped[str] = mapped_column(String(30), nullable=False, default="ALL_SCHOOLS")
     wt_fee: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
     escrima_fee: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     created_by: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
 
-    creator = relationship("User", foreign_keys=[created_by])
-    selected_schools = relationship("EventSchool", back_populates="event", lazy="selectin")
-    registrations = relationship("EventRegistration", back_populates="event", lazy="selectin")
-    evaluations = relationship("SeminarEvaluation", back_populates="event", lazy="selectin")
+    creator = relationship("User", foreign_keys=[created_by], lazy="raise")
+    selected_schools = relationship("EventSchool", back_populates="event", lazy="raise", passive_deletes=True)
+    registrations = relationship("EventRegistration", back_populates="event", lazy="raise", passive_deletes=True)
+    evaluations = relationship("SeminarEvaluation", back_populates="event", lazy="raise", passive_deletes=True)
 
 
 class EventSchool(Base, UUIDMixin):
@@ -45,13 +54,16 @@ class EventSchool(Base, UUIDMixin):
     event_id: Mapped[str] = mapped_column(String(36), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     school_id: Mapped[str] = mapped_column(String(36), ForeignKey("schools.id", ondelete="CASCADE"), nullable=False)
 
-    event = relationship("Event", back_populates="selected_schools")
-    school = relationship("School")
+    event = relationship("Event", back_populates="selected_schools", lazy="raise")
+    school = relationship("School", lazy="raise")
 
 
 class EventRegistration(Base, UUIDMixin):
     __tablename__ = "event_registrations"
-    __table_args__ = (UniqueConstraint("event_id", "student_id", name="uq_event_student_reg"),)
+    __table_args__ = (
+        UniqueConstraint("event_id", "student_id", name="uq_event_student_reg"),
+        Index("ix_event_registrations_status", "event_id", "status", "created_at"),
+    )
 
     event_id: Mapped[str] = mapped_column(String(36), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     student_id: Mapped[str] = mapped_column(String(36), ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
@@ -62,10 +74,14 @@ class EventRegistration(Base, UUIDMixin):
     exam_branch_escrima: Mapped[bool] = mapped_column(Boolean, default=False)
     needs_manager_approval: Mapped[bool] = mapped_column(Boolean, default=False)
     manager_approved: Mapped[bool] = mapped_column(Boolean, default=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False,
+        default=RegistrationStatus.CONFIRMED.value, server_default=RegistrationStatus.CONFIRMED.value,
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(), server_default=func.now(), nullable=False)
 
-    event = relationship("Event", back_populates="registrations")
-    student = relationship("Student", back_populates="event_registrations")
+    event = relationship("Event", back_populates="registrations", lazy="raise")
+    student = relationship("Student", back_populates="event_registrations", lazy="raise")
 
 
 class SeminarEvaluation(Base, UUIDMixin):
@@ -81,6 +97,6 @@ class SeminarEvaluation(Base, UUIDMixin):
     evaluated_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(), server_default=func.now(), nullable=False)
 
-    event = relationship("Event", back_populates="evaluations")
-    student = relationship("Student")
-    evaluator = relationship("User", foreign_keys=[evaluated_by])
+    event = relationship("Event", back_populates="evaluations", lazy="raise")
+    student = relationship("Student", lazy="raise")
+    evaluator = relationship("User", foreign_keys=[evaluated_by], lazy="raise")
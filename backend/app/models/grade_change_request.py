@@ -33,6 +33,6 @@ class GradeChangeRequest(Base, UUIDMixin, TimestampMixin):
     )
     handled_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
 
-    student = relationship("Student")
-    requester = relationship("User", foreign_keys=[requested_by])
-    handler = relationship("User", foreign_keys=[handled_by])
+    student = relationship("Student", lazy="raise")
+    requester = relationship("User", foreign_keys=[requested_by], lazy="raise")
+    handler = relationship("User", foreign_keys=[handled_by], lazy="raise")
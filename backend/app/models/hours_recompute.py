@@ -0,0 +1,37 @@
+import enum
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, UUIDMixin
+
+
+class HoursRecomputeStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class HoursRecomputeJob(Base, UUIDMixin):
+    """Derece gereksinimi degisince kalan saatlerin yeniden hesaplanmasi.
+
+    Is arka planda parca parca calisir; processed/total ilerlemeyi gosterir
+    (bkz. app/services/hours_recompute.py).
+    """
+    __tablename__ = "hours_recompute_jobs"
+
+    branch: Mapped[str] = mapped_column(String(20), nullable=False)
+    grade: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), default=HoursRecomputeStatus.PENDING.value, nullable=False
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    processed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    requested_by: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False, index=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
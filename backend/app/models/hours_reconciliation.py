@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, UUIDMixin
+
+
+class HoursReconciliationRun(Base, UUIDMixin):
+    """Saat defteri mutabakat calistirmalari.
+
+    Artimli calistirmalar, son tamamlanan calistirmanin started_at degerini
+    watermark olarak kullanir (bkz. app/services/hours_ledger.py).
+    """
+    __tablename__ = "hours_reconciliation_runs"
+
+    started_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False, index=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
+    since: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
+    fix: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    checked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    mismatched: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fixed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
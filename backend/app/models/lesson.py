@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import String, Text, Numeric, DateTime, ForeignKey, func
+from sqlalchemy import String, Text, Numeric, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, UUIDMixin
 
@@ -19,6 +19,10 @@ LESSON_DURATION = {
 
 class Lesson(Base, UUIDMixin):
     __tablename__ = "lessons"
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "occurrence_date", name="uq_schedule_occurrence"),
+        Index("ix_lessons_school_date", "school_id", "lesson_date"),
+    )
 
     school_id: Mapped[str] = mapped_column(
         String(36), ForeignKey("schools.id", ondelete="CASCADE"), nullable=False
@@ -34,11 +38,14 @@ class Lesson(Base, UUIDMixin):
     schedule_id: Mapped[str | None] = mapped_column(
         String(36), ForeignKey("lesson_schedules.id", ondelete="SET NULL"), nullable=True
     )
+    # Programdan uretilen derslerde programin orijinal tarih/saati; ders baska
+    # bir zamana tasinsa da sanal tekrarla eslesmeyi saglar
+    occurrence_date: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    school = relationship("School", back_populates="lessons")
-    creator = relationship("User", foreign_keys=[created_by])
-    schedule = relationship("LessonSchedule", back_populates="lessons")
-    attendances = relationship("Attendance", back_populates="lesson", lazy="selectin")
+    school = relationship("School", back_populates="lessons", lazy="raise")
+    creator = relationship("User", foreign_keys=[created_by], lazy="raise")
+    schedule = relationship("LessonSchedule", back_populates="lessons", lazy="raise")
+    attendances = relationship("Attendance", back_populates="lesson", lazy="raise", passive_deletes=True)
@@ -19,6 +19,9 @@ class LessonSchedule(Base, UUIDMixin):
     start_date: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
     end_date: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # True: dersler onceden yazilmaz, okuma aninda tekrar kuralindan uretilir;
+    # Lesson satiri ilk yoklamada ya da duzenlemede olusturulur
+    is_virtual: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_by: Mapped[str] = mapped_column(
         String(36), ForeignKey("users.id"), nullable=False
@@ -27,6 +30,6 @@ class LessonSchedule(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    school = relationship("School")
-    creator = relationship("User", foreign_keys=[created_by])
-    lessons = relationship("Lesson", back_populates="schedule", lazy="selectin")
+    school = relationship("School", lazy="raise")
+    creator = relationship("User", foreign_keys=[created_by], lazy="raise")
+    lessons = relationship("Lesson", back_populates="schedule", lazy="raise", passive_deletes=True)
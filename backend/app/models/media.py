@@ -33,5 +33,5 @@ class Media(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    uploader = relationship("User", foreign_keys=[uploaded_by], lazy="selectin")
-    school = relationship("School", foreign_keys=[school_id], lazy="selectin")
+    uploader = relationship("User", foreign_keys=[uploaded_by], lazy="raise")
+    school = relationship("School", foreign_keys=[school_id], lazy="raise")
@@ -15,7 +15,7 @@ class ProductCategory(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    products = relationship("Product", back_populates="category", lazy="selectin")
+    products = relationship("Product", back_populates="category", lazy="raise", passive_deletes=True)
 
 
 class Product(Base, UUIDMixin, TimestampMixin):
@@ -31,4 +31,4 @@ class Product(Base, UUIDMixin, TimestampMixin):
     price: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
-    category = relationship("ProductCategory", back_populates="products")
+    category = relationship("ProductCategory", back_populates="products", lazy="raise")
@@ -43,6 +43,6 @@ class Request(Base, UUIDMixin, TimestampMixin):
     )
     handled_at: Mapped[datetime | None] = mapped_column(DateTime(), nullable=True)
 
-    student = relationship("Student", back_populates="requests")
-    product = relationship("Product")
-    handler = relationship("User", foreign_keys=[handled_by])
+    student = relationship("Student", back_populates="requests", lazy="raise")
+    product = relationship("Product", lazy="raise")
+    handler = relationship("User", foreign_keys=[handled_by], lazy="raise")
@@ -18,9 +18,9 @@ class School(Base, UUIDMixin, TimestampMixin):
     long_description: Mapped[str | None] = mapped_column(Text, nullable=True)
     youtube_url: Mapped[str | None] = mapped_column(String(1000), nullable=True)
 
-    managers = relationship("SchoolManager", back_populates="school", lazy="selectin")
-    students = relationship("Student", back_populates="school", lazy="selectin")
-    lessons = relationship("Lesson", back_populates="school", lazy="selectin")
+    managers = relationship("SchoolManager", back_populates="school", lazy="raise", passive_deletes=True)
+    students = relationship("Student", back_populates="school", lazy="raise", passive_deletes=True)
+    lessons = relationship("Lesson", back_populates="school", lazy="raise", passive_deletes=True)
 
 
 class SchoolManager(Base, UUIDMixin):
@@ -39,5 +39,5 @@ class SchoolManager(Base, UUIDMixin):
         DateTime(), server_default=func.now(), nullable=False
     )
 
-    school = relationship("School", back_populates="managers")
-    manager = relationship("User", back_populates="managed_schools")
+    school = relationship("School", back_populates="managers", lazy="raise")
+    manager = relationship("User", back_populates="managed_schools", lazy="raise")
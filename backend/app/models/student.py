@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import date
-from sqlalchemy import String, Text, Date, Integer, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Text, Date, Integer, Numeric, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, TimestampMixin, UUIDMixin
 
@@ -25,18 +25,20 @@ class Student(Base, UUIDMixin, TimestampMixin):
     emergency_phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    user = relationship("User", back_populates="student_profile")
-    school = relationship("School", back_populates="students")
-    progress = relationship("StudentProgress", back_populates="student", lazy="selectin")
-    attendances = relationship("Attendance", back_populates="student", lazy="selectin")
-    event_registrations = relationship("EventRegistration", back_populates="student", lazy="selectin")
-    requests = relationship("Request", back_populates="student", lazy="selectin")
+    user = relationship("User", back_populates="student_profile", lazy="raise")
+    school = relationship("School", back_populates="students", lazy="raise")
+    progress = relationship("StudentProgress", back_populates="student", lazy="raise", passive_deletes=True)
+    attendances = relationship("Attendance", back_populates="student", lazy="raise", passive_deletes=True)
+    event_registrations = relationship("EventRegistration", back_populates="student", lazy="raise", passive_deletes=True)
+    requests = relationship("Request", back_populates="student", lazy="raise", passive_deletes=True)
 
 
 class StudentProgress(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "student_progress"
     __table_args__ = (
         UniqueConstraint("student_id", "branch", name="uq_student_branch_progress"),
+        Index("ix_student_progress_updated_at", "updated_at"),
+        Index("ix_student_progress_branch_grade", "branch", "current_grade", "id"),
     )
 
     student_id: Mapped[str] = mapped_column(
@@ -47,4 +49,4 @@ class StudentProgress(Base, UUIDMixin, TimestampMixin):
     completed_hours: Mapped[float] = mapped_column(Numeric(8, 2), default=0, nullable=False)
     remaining_hours: Mapped[float] = mapped_column(Numeric(8, 2), default=0, nullable=False)
 
-    student = relationship("Student", back_populates="progress")
+    student = relationship("Student", back_populates="progress", lazy="raise")
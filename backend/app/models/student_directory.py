@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class StudentDirectory(Base):
+    """Ogrenci listeleri icin duzlestirilmis okuma modeli.
+
+    Her ogrenci icin tek satir: Student + User + School alanlari ve iki
+    bransin ilerlemesi. Kaynak tablolara yazan islemler ayni transaction
+    icinde refresh_student_directory cagirir (bkz.
+    app/services/student_directory.py); satir elle guncellenmez.
+    """
+    __tablename__ = "student_directory"
+    __table_args__ = (
+        Index("ix_student_directory_school_created", "school_id", "created_at"),
+        Index("ix_student_directory_status_created", "user_status", "created_at"),
+        Index("ix_student_directory_created", "created_at"),
+    )
+
+    student_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False, unique=True)
+    school_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+
+    first_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    last_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
+    user_status: Mapped[str] = mapped_column(String(20), nullable=False)
+    user_role: Mapped[str] = mapped_column(String(20), nullable=False)
+    school_name: Mapped[str | None] = mapped_column(String(200), nullable=True)
+
+    date_of_birth: Mapped[date | None] = mapped_column(Date, nullable=True)
+    emergency_contact: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    emergency_phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Brans ilerlemeleri; ilerleme kaydi yoksa hepsi NULL
+    wt_progress_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    wt_grade: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    wt_completed_hours: Mapped[float | None] = mapped_column(Numeric(8, 2), nullable=True)
+    wt_remaining_hours: Mapped[float | None] = mapped_column(Numeric(8, 2), nullable=True)
+    wt_exam_eligibility: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    escrima_progress_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    escrima_grade: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    escrima_completed_hours: Mapped[float | None] = mapped_column(Numeric(8, 2), nullable=True)
+    escrima_remaining_hours: Mapped[float | None] = mapped_column(Numeric(8, 2), nullable=True)
+    escrima_exam_eligibility: Mapped[str | None] = mapped_column(String(20), nullable=True)
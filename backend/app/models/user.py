@@ -1,8 +1,9 @@
 import uuid
 import enum
-from sqlalchemy import String, Boolean, Integer, Text, JSON
+from sqlalchemy import DDL, String, Boolean, Index, Integer, Text, JSON, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, TimestampMixin, UUIDMixin
+from app.utils import fold_search_text
 
 
 class UserRole(str, enum.Enum):
@@ -26,6 +27,14 @@ class InstructorTitle(str, enum.Enum):
 
 class User(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -42,11 +51,41 @@ class User(Base, UUIDMixin, TimestampMixin):
     is_featured_instructor: Mapped[bool] = mapped_column(Boolean, default=False)
     instagram_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     extra_permissions: Mapped[list[str] | None] = mapped_column(JSON, nullable=True, default=list)
+    # Ad, soyad ve e-postanin fold_search_text hali; insert/update'te yazilir
+    search_text: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
     # Relationships
-    managed_schools = relationship("SchoolManager", back_populates="manager", lazy="selectin")
-    student_profile = relationship("Student", back_populates="user", uselist=False, lazy="selectin")
+    managed_schools = relationship("SchoolManager", back_populates="manager", lazy="raise", passive_deletes=True)
+    student_profile = relationship("Student", back_populates="user", uselist=False, lazy="raise", passive_deletes=True)
 
     @property
     def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _sync_search_text(mapper, connection, target: User) -> None:
+    target.search_text = fold_search_text(target.first_name, target.last_name, target.email)
+
+
+# SQLite (dev/test) icin search_text'in FTS5 trigram dizini. Metin users'ta
+# durur (external content); tetikleyiciler dizini satirlarla birlikte
+# gunceller. Dizin users.rowid'ye baglidir ve VACUUM rowid'leri degistirebilir;
+# bu yuzden _migrate_sqlite acilista 'rebuild' calistirir.
+USER_SEARCH_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "search_text, content='users', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO user_search(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO user_search(user_search, rowid, search_text) "
+    "VALUES ('delete', old.rowid, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF search_text ON users BEGIN "
+    "INSERT INTO user_search(user_search, rowid, search_text) "
+    "VALUES ('delete', old.rowid, old.search_text); "
+    "INSERT INTO user_search(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+)
+
+for _statement in USER_SEARCH_SQLITE_DDL:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
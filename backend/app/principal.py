@@ -0,0 +1,112 @@
+"""Kimligi dogrulanmis kullanicinin hafif temsili (principal) ve worker bazli onbellegi.
+
+Yetki kontrolleri yalnizca rol, durum, ekstra izinler, yonetilen okullar ve
+ogrenci kaydi kimligine bakar; bunlar icin her istekte User satirini yuklemek
+gereksizdir. Principal bu alanlari tasir ve her worker surecinde
+PRINCIPAL_CACHE_TTL_SECONDS boyunca saklanir.
+
+Bu alanlari degistiren endpoint'ler commit sonrasi invalidate_principal()
+cagirir. Onbellek surec icidir; diger worker'lardaki kopyalar en gec TTL
+dolunca yenilenir.
+"""
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.school import SchoolManager
+from app.models.student import Student
+from app.models.user import User, UserRole
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: str
+    role: str
+    status: str
+    extra_permissions: tuple[str, ...] = ()
+    can_upload_media: bool = False
+    managed_school_ids: frozenset[str] = frozenset()
+    student_id: str | None = None
+
+
+_cache: dict[str, tuple[float, Principal]] = {}
+
+
+def get_cached_principal(user_id: str) -> Principal | None:
+    entry = _cache.get(user_id)
+    if entry is None:
+        return None
+    expires_at, principal = entry
+    if expires_at <= time.monotonic():
+        _cache.pop(user_id, None)
+        return None
+    return principal
+
+
+def cache_principal(principal: Principal) -> None:
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return
+    now = time.monotonic()
+    if len(_cache) >= settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+        for key in [k for k, (exp, _) in _cache.items() if exp <= now]:
+            del _cache[key]
+        # Hala doluysa en eski kaydi at (dict ekleme sirasini korur)
+        while len(_cache) >= settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+            _cache.pop(next(iter(_cache)))
+    _cache[principal.id] = (now + ttl, principal)
+
+
+def invalidate_principal(*user_ids: str) -> None:
+    for user_id in user_ids:
+        _cache.pop(str(user_id), None)
+
+
+def clear_principal_cache() -> None:
+    _cache.clear()
+
+
+async def load_principal(db: AsyncSession, user_id: str) -> Principal | None:
+    """Principal'i onbellekten, yoksa iki hafif sorguyla DB'den getirir."""
+    principal = get_cached_principal(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(
+            User.id,
+            User.role,
+            User.status,
+            User.extra_permissions,
+            User.can_upload_media,
+            Student.id,
+        )
+        .outerjoin(Student, Student.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    uid, role, status, extra_permissions, can_upload_media, student_id = row
+
+    managed_school_ids: frozenset[str] = frozenset()
+    if role == UserRole.MANAGER.value:
+        schools_result = await db.execute(
+            select(SchoolManager.school_id).where(SchoolManager.user_id == uid)
+        )
+        managed_school_ids = frozenset(str(sid) for sid in schools_result.scalars().all())
+
+    principal = Principal(
+        id=str(uid),
+        role=role,
+        status=status,
+        extra_permissions=tuple(extra_permissions or ()),
+        can_upload_media=bool(can_upload_media),
+        managed_school_ids=managed_school_ids,
+        student_id=str(student_id) if student_id else None,
+    )
+    cache_principal(principal)
+    return principal
@@ -1,19 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above
-from app.models.user import User, UserRole
-from app.models.school import SchoolManager
+from app.principal import Principal
+from app.load_plans import load_plan
 from app.models.lesson import Lesson
 from app.models.attendance import Attendance
-from app.models.student import Student, StudentProgress
+from app.models.attendance_sync import SyncOperationStatus
 from app.models.audit_log import AuditAction
+from app.services.attendance import record_attendance, replace_roster, sync_attendance
 from app.services.audit import create_audit_log
-from app.services.grade_hours import update_progress_hours
-from app.schemas.attendance import AttendanceCreate, AttendanceResponse, AttendanceListResponse
+from app.services.grade_hours import apply_progress_hours
+from app.services.lesson_schedules import get_or_materialize_lesson
+from app.services.school_scope import school_scope
+from app.services.student_directory import refresh_student_directory
+from app.schemas.attendance import (
+    AttendanceCreate,
+    AttendanceResponse,
+    AttendanceListResponse,
+    AttendanceRosterReplace,
+    AttendanceRosterResponse,
+    AttendanceSyncRequest,
+    AttendanceSyncResponse,
+)
 
 router = APIRouter()
 
@@ -21,109 +33,59 @@ router = APIRouter()
 @router.post("/", response_model=AttendanceListResponse)
 async def create_attendance(
     data: AttendanceCreate,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    # Get lesson
-    lesson_result = await db.execute(
-        select(Lesson).where(Lesson.id == data.lesson_id)
-    )
-    lesson = lesson_result.scalar_one_or_none()
+    # Get lesson (sanal program dersi ilk yoklamada olusturulur)
+    lesson = await get_or_materialize_lesson(db, data.lesson_id, current_user.id)
     if not lesson:
         raise HTTPException(status_code=404, detail="Ders bulunamadı")
 
     # MANAGER check: own school only
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if lesson.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu ders sizin okulunuzda değil")
-
-    created = []
-    for sid in data.student_ids:
-        # Check student belongs to same school
-        student_result = await db.execute(
-            select(Student).options(selectinload(Student.user)).where(Student.id == sid)
-        )
-        student = student_result.scalar_one_or_none()
-        if not student or student.school_id != lesson.school_id:
-            continue
-
-        # Check duplicate
-        existing = await db.execute(
-            select(Attendance).where(
-                Attendance.lesson_id == lesson.id,
-                Attendance.student_id == sid,
-            )
-        )
-        if existing.scalar_one_or_none():
-            continue
-
-        hours = float(lesson.duration_hours)
-
-        att = Attendance(
-            lesson_id=lesson.id,
-            student_id=sid,
-            hours_credited=hours,
-        )
-        db.add(att)
+    if not school_scope(current_user).allows(lesson.school_id):
+        raise HTTPException(status_code=403, detail="Bu ders sizin okulunuzda değil")
 
-        # Update student progress (completed + remaining)
-        progress_result = await db.execute(
-            select(StudentProgress).where(
-                StudentProgress.student_id == sid,
-                StudentProgress.branch == lesson.branch,
-            )
-        )
-        progress = progress_result.scalar_one_or_none()
-        if progress:
-            update_progress_hours(progress, hours)
-
-        await create_audit_log(
-            db,
-            action=AuditAction.ATTENDANCE_CREATED,
-            entity_type="Attendance",
-            entity_id=sid,
-            performed_by=current_user.id,
-            details=f"Yoklama: {student.user.full_name}, {lesson.branch}, {hours} saat",
-        )
+    items = await record_attendance(db, lesson, data.student_ids, current_user.id)
+    await db.commit()
 
-        created.append(att)
+    return AttendanceListResponse(items=items, total=len(items))
 
-    await db.commit()
 
-    items = []
-    for att in created:
-        await db.refresh(att)
-        student_result = await db.execute(
-            select(Student).options(selectinload(Student.user)).where(Student.id == att.student_id)
-        )
-        student = student_result.scalar_one_or_none()
-        items.append(
-            AttendanceResponse(
-                id=str(att.id),
-                lesson_id=str(att.lesson_id),
-                student_id=str(att.student_id),
-                hours_credited=float(att.hours_credited),
-                created_at=att.created_at,
-                student_name=student.user.full_name if student and student.user else None,
-            )
+@router.post("/sync", response_model=AttendanceSyncResponse)
+async def sync_offline_attendance(
+    data: AttendanceSyncRequest,
+    current_user: Principal = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tabletlerde cevrimdisi alinan yoklama islemlerini tek istekte uygular.
+
+    Her islem istemcinin urettigi op_id tasir; ayni islem tekrar gonderilirse
+    yeniden uygulanmaz. Sonuclar islem bazinda dondurulur.
+    """
+    try:
+        results = await sync_attendance(db, current_user, data.operations)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Eşzamanlı bir senkronizasyonla çakıştı, lütfen tekrar deneyin",
         )
-
-    return AttendanceListResponse(items=items, total=len(items))
+    return AttendanceSyncResponse(
+        results=results,
+        applied=sum(1 for r in results if r.status == SyncOperationStatus.APPLIED.value),
+    )
 
 
 @router.get("/lesson/{lesson_id}", response_model=AttendanceListResponse)
 async def get_lesson_attendance(
     lesson_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
         select(Attendance)
-        .options(selectinload(Attendance.student).selectinload(Student.user))
+        .options(*load_plan("lesson_roster"))
         .where(Attendance.lesson_id == lesson_id)
     )
     attendances = result.scalars().all()
@@ -144,10 +106,34 @@ async def get_lesson_attendance(
     )
 
 
+@router.put("/lesson/{lesson_id}", response_model=AttendanceRosterResponse)
+async def replace_lesson_attendance(
+    lesson_id: str,
+    data: AttendanceRosterReplace,
+    current_user: Principal = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(get_db),
+):
+    """Dersin yoklamasini gonderilen tam ogrenci listesiyle degistirir.
+
+    Listede olmayan yoklamalar silinir ve saatleri geri alinir, yeni ogrenciler
+    eklenir; hepsi tek transaction icinde yapilir.
+    """
+    lesson = await get_or_materialize_lesson(db, lesson_id, current_user.id)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Ders bulunamadı")
+
+    if not school_scope(current_user).allows(lesson.school_id):
+        raise HTTPException(status_code=403, detail="Bu ders sizin okulunuzda değil")
+
+    response = await replace_roster(db, lesson, data.student_ids, current_user.id)
+    await db.commit()
+    return response
+
+
 @router.delete("/{attendance_id}")
 async def delete_attendance(
     attendance_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -163,15 +149,8 @@ async def delete_attendance(
 
     # Revert hours from student progress (completed + remaining)
     if lesson:
-        progress_result = await db.execute(
-            select(StudentProgress).where(
-                StudentProgress.student_id == att.student_id,
-                StudentProgress.branch == lesson.branch,
-            )
-        )
-        progress = progress_result.scalar_one_or_none()
-        if progress:
-            update_progress_hours(progress, -float(att.hours_credited))
+        await apply_progress_hours(db, [att.student_id], lesson.branch, -float(att.hours_credited))
+        await refresh_student_directory(db, [att.student_id])
 
     await create_audit_log(
         db,
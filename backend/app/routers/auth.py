@@ -4,11 +4,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.auth import (
-    get_password_hash,
-    verify_password,
+    hash_password,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
-    get_current_user,
+    get_current_user_record,
 )
 from app.rate_limit import limiter
 from app.models.user import User, UserRole, UserStatus
@@ -53,7 +53,10 @@ async def login(request: Request, data: LoginRequest, db: AsyncSession = Depends
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.password_hash):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="E-posta veya şifre hatalı",
@@ -65,6 +68,11 @@ async def login(request: Request, data: LoginRequest, db: AsyncSession = Depends
             detail="Hesabınız henüz aktif değil. Onay bekleniyor.",
         )
 
+    # BCRYPT_ROUNDS degistiyse hash'i yeni maliyetle yenile
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
@@ -83,7 +91,7 @@ async def register(request: Request, data: RegisterRequest, db: AsyncSession = D
 
     user = User(
         email=data.email,
-        password_hash=get_password_hash(data.password),
+        password_hash=await hash_password(data.password),
         first_name=data.first_name,
         last_name=data.last_name,
         phone=data.phone,
@@ -120,19 +128,20 @@ async def refresh_token(data: RefreshRequest, db: AsyncSession = Depends(get_db)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_record)):
     return _user_to_response(current_user)
 
 
 @router.post("/change-password")
 async def change_password(
     data: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
-    if not verify_password(data.current_password, current_user.password_hash):
+    valid, _ = await verify_and_update_password(data.current_password, current_user.password_hash)
+    if not valid:
         raise HTTPException(status_code=400, detail="Mevcut şifre hatalı")
 
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await hash_password(data.new_password)
     await db.commit()
     return {"message": "Şifre başarıyla değiştirildi"}
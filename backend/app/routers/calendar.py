@@ -0,0 +1,162 @@
+"""Birlesik takvim: dersler, sanal program dersleri ve etkinlikler.
+
+Uc kaynak tarih sirali okunur ve heapq.merge ile birlestirilerek JSON dizisi
+olarak parca parca yazilir; tum takvim tek bir response nesnesine
+donusturulmez. Sorgular (school_id, lesson_date) ve (start_datetime)
+indekslerini kullanir.
+"""
+import heapq
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.models.event import Event, EventSchool, EventScope
+from app.models.lesson import Lesson
+from app.models.school import School
+from app.principal import Principal
+from app.schemas.calendar import CalendarItem
+from app.services.lesson_schedules import virtual_occurrences
+from app.services.school_scope import school_scope
+
+router = APIRouter()
+
+# Tek istekte okunabilecek en uzun aralik
+CALENDAR_MAX_DAYS = 400
+
+
+def _lesson_items(rows):
+    for row in rows:
+        yield CalendarItem(
+            kind="LESSON",
+            id=str(row.id),
+            title=f"{row.branch} {row.lesson_type}",
+            start=row.lesson_date,
+            end=row.lesson_date + timedelta(hours=float(row.duration_hours)),
+            school_id=str(row.school_id),
+            school_name=row.school_name,
+            branch=row.branch,
+            lesson_type=row.lesson_type,
+            schedule_id=str(row.schedule_id) if row.schedule_id else None,
+        )
+
+
+def _virtual_items(lessons):
+    for lesson in lessons:
+        yield CalendarItem(
+            kind="LESSON",
+            id=lesson.id,
+            title=f"{lesson.branch} {lesson.lesson_type}",
+            start=lesson.lesson_date,
+            end=lesson.lesson_date + timedelta(hours=lesson.duration_hours),
+            school_id=lesson.school_id,
+            school_name=lesson.school_name,
+            branch=lesson.branch,
+            lesson_type=lesson.lesson_type,
+            schedule_id=lesson.schedule_id,
+            is_virtual=True,
+        )
+
+
+def _event_items(rows):
+    for row in rows:
+        yield CalendarItem(
+            kind="EVENT",
+            id=str(row.id),
+            title=row.name,
+            start=row.start_datetime,
+            end=row.end_datetime,
+            event_type=row.event_type,
+        )
+
+
+def _stream_json_array(items):
+    yield "["
+    for index, item in enumerate(items):
+        if index:
+            yield ","
+        yield item.model_dump_json()
+    yield "]"
+
+
+@router.get("/", response_model=list[CalendarItem])
+async def get_calendar(
+    date_from: datetime = Query(..., alias="from"),
+    date_to: datetime = Query(..., alias="to"),
+    school_ids: list[str] | None = Query(None),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """from/to araligindaki dersler ve aralikla cakisan etkinlikler, baslangic zamanina gore sirali.
+
+    school_ids tekrar eden parametre ya da virgulle ayrilmis liste olabilir.
+    MANAGER yalnizca kendi okullarini gorur.
+    """
+    date_from = date_from.replace(tzinfo=None)
+    date_to = date_to.replace(tzinfo=None)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="Bitiş tarihi başlangıçtan önce olamaz")
+    if date_to - date_from > timedelta(days=CALENDAR_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"En fazla {CALENDAR_MAX_DAYS} günlük aralık istenebilir")
+
+    scope = school_scope(current_user)
+    requested = None
+    if school_ids:
+        requested = [sid for value in school_ids for sid in value.split(",") if sid]
+    if scope.restricted:
+        requested = sorted(scope.school_ids if requested is None else scope.school_ids & set(requested))
+
+    lesson_query = (
+        select(
+            Lesson.id,
+            Lesson.school_id,
+            Lesson.branch,
+            Lesson.lesson_type,
+            Lesson.lesson_date,
+            Lesson.duration_hours,
+            Lesson.schedule_id,
+            School.name.label("school_name"),
+        )
+        .outerjoin(School, School.id == Lesson.school_id)
+        .where(Lesson.lesson_date >= date_from, Lesson.lesson_date <= date_to)
+        .order_by(Lesson.lesson_date)
+    )
+    event_query = (
+        select(Event.id, Event.name, Event.event_type, Event.start_datetime, Event.end_datetime)
+        # Aralikla cakisan etkinlikler: aralik oncesinde baslayip icine sarkan
+        # cok gunluk etkinlikler de gelir
+        .where(
+            Event.start_datetime <= date_to,
+            func.coalesce(Event.end_datetime, Event.start_datetime) >= date_from,
+        )
+        .order_by(Event.start_datetime)
+    )
+    if requested is not None:
+        lesson_query = lesson_query.where(Lesson.school_id.in_(requested))
+        event_query = event_query.where(
+            or_(
+                Event.scope == EventScope.ALL_SCHOOLS.value,
+                exists().where(
+                    EventSchool.event_id == Event.id,
+                    EventSchool.school_id.in_(requested),
+                ),
+            )
+        )
+
+    lesson_rows = (await db.execute(lesson_query)).all()
+    event_rows = (await db.execute(event_query)).all()
+    virtual = await virtual_occurrences(
+        db, school_ids=requested, date_from=date_from, date_to=date_to
+    )
+
+    items = heapq.merge(
+        _lesson_items(lesson_rows),
+        _virtual_items(virtual),
+        _event_items(event_rows),
+        key=lambda item: item.start,
+    )
+    return StreamingResponse(_stream_json_array(items), media_type="application/json")
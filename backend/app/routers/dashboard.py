@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.auth import get_current_user
+from app.auth import get_current_user, require_admin_or_above
+from app.principal import Principal
+from app.load_plans import load_plan
 from app.models.user import User, UserRole, UserStatus
-from app.models.school import School, SchoolManager
+from app.models.school import School
 from app.models.student import Student, StudentProgress, Branch
 from app.models.event import Event
 from app.models.request import Request, RequestStatus
 from app.schemas.dashboard import DashboardStats, ManagerDashboardStats, StudentDashboardStats
 from app.services.grade_hours import get_hours_for_grade
+from app.services.password_hashing import hashing_stats
+from app.services.school_scope import school_scope
 from app.utils import utcnow_naive
 
 router = APIRouter()
@@ -19,7 +22,7 @@ router = APIRouter()
 
 @router.get("/stats")
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     if current_user.role in (UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value):
@@ -30,6 +33,14 @@ async def get_dashboard_stats(
         return await _student_stats(current_user, db)
 
 
+@router.get("/password-hashing")
+async def get_password_hashing_stats(
+    current_user: Principal = Depends(require_admin_or_above),
+):
+    """Bu worker'in bcrypt havuzu: thread/sira doluluklari ve sayaclar."""
+    return hashing_stats()
+
+
 async def _admin_stats(db: AsyncSession) -> DashboardStats:
     schools = await db.execute(select(func.count(School.id)))
     students = await db.execute(
@@ -63,30 +74,28 @@ async def _admin_stats(db: AsyncSession) -> DashboardStats:
     )
 
 
-async def _manager_stats(user: User, db: AsyncSession) -> ManagerDashboardStats:
-    # Get manager's school
-    sm_result = await db.execute(
-        select(SchoolManager)
-        .options(selectinload(SchoolManager.school))
-        .where(SchoolManager.user_id == user.id)
-    )
-    sm = sm_result.scalar_one_or_none()
-    school_name = sm.school.name if sm and sm.school else "Bilinmiyor"
-    school_id = sm.school_id if sm else None
+async def _manager_stats(user: Principal, db: AsyncSession) -> ManagerDashboardStats:
+    scope = school_scope(user)
 
     total_students = 0
     pending_requests_count = 0
     pending_approvals_count = 0
+    school_name = "Bilinmiyor"
+
+    if scope.school_ids:
+        names = await db.execute(
+            select(School.name).where(scope.filter(School.id)).order_by(School.name)
+        )
+        school_name = ", ".join(names.scalars().all()) or school_name
 
-    if school_id:
         students = await db.execute(
             select(func.count(Student.id))
             .join(Student.user)
-            .where(Student.school_id == school_id, User.status == UserStatus.ACTIVE.value)
+            .where(scope.filter(Student.school_id), User.status == UserStatus.ACTIVE.value)
         )
         total_students = students.scalar() or 0
 
-        student_ids_q = select(Student.id).where(Student.school_id == school_id)
+        student_ids_q = select(Student.id).where(scope.filter(Student.school_id))
         pr = await db.execute(
             select(func.count(Request.id)).where(
                 Request.student_id.in_(student_ids_q),
@@ -98,7 +107,7 @@ async def _manager_stats(user: User, db: AsyncSession) -> ManagerDashboardStats:
         pa = await db.execute(
             select(func.count(Student.id))
             .join(Student.user)
-            .where(Student.school_id == school_id, User.status == UserStatus.PENDING.value)
+            .where(scope.filter(Student.school_id), User.status == UserStatus.PENDING.value)
         )
         pending_approvals_count = pa.scalar() or 0
 
@@ -118,10 +127,10 @@ async def _manager_stats(user: User, db: AsyncSession) -> ManagerDashboardStats:
     )
 
 
-async def _student_stats(user: User, db: AsyncSession) -> StudentDashboardStats:
+async def _student_stats(user: Principal, db: AsyncSession) -> StudentDashboardStats:
     student_result = await db.execute(
         select(Student)
-        .options(selectinload(Student.school), selectinload(Student.progress))
+        .options(*load_plan("student_dashboard"))
         .where(Student.user_id == user.id)
     )
     student = student_result.scalar_one_or_none()
@@ -141,7 +150,7 @@ async def _student_stats(user: User, db: AsyncSession) -> StudentDashboardStats:
     if student:
         school_name = student.school.name if student.school else None
         for p in student.progress:
-            hours_info = get_hours_for_grade(p.current_grade)
+            hours_info = get_hours_for_grade(p.current_grade, p.branch)
             completed = float(p.completed_hours)
             remaining = max(0, hours_info["required"] - completed)
             if p.branch == Branch.WING_TSUN.value:
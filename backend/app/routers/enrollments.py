@@ -1,22 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above, get_current_user_optional, require_admin_or_above
+from app.principal import Principal, invalidate_principal
+from app.load_plans import load_plan
 from app.models.enrollment import Enrollment, EnrollmentStatus
 from app.models.user import User, UserRole, UserStatus
 from app.models.school import School
 from app.models.student import Student, StudentProgress, Branch
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse, EnrollmentListResponse
 from app.services.grade_hours import get_hours_for_grade
+from app.services.pagination import Keyset, paginate
+from app.services.student_directory import refresh_student_directory
 
 router = APIRouter()
 
 
 @router.post("/", response_model=EnrollmentResponse)
-async def create_enrollment(data: EnrollmentCreate, user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_enrollment(data: EnrollmentCreate, user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     # Onaylı enrollment varsa tekrar başvurulamaz
     approved_q = select(Enrollment).where(
         Enrollment.user_id == user.id,
@@ -64,8 +67,10 @@ async def create_enrollment(data: EnrollmentCreate, user: User = Depends(get_cur
 async def list_enrollments(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+    include_total: bool = True,
     status: str | None = Query(None),
-    current_user: User | None = Depends(get_current_user_optional),
+    current_user: Principal | None = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db),
 ):
     # Admins/managers see all; ordinary users see their own
@@ -83,14 +88,18 @@ async def list_enrollments(
         query = query.where(Enrollment.status == status)
         count_q = count_q.where(Enrollment.status == status)
 
-    total = (await db.execute(count_q)).scalar()
-
     # selectinload ile user ve school tek sorguda çekilir (N+1 önlenir)
-    query = query.options(
-        selectinload(Enrollment.user),
-        selectinload(Enrollment.school),
+    query = query.options(*load_plan("enrollment_list"))
+    page = await paginate(
+        db,
+        query,
+        Keyset(Enrollment.created_at, Enrollment.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_q if include_total else None,
     )
-    res = (await db.execute(query.order_by(Enrollment.created_at.desc()).offset(skip).limit(limit))).scalars().all()
+    res = page.rows
 
     items = [
         EnrollmentResponse(
@@ -107,11 +116,11 @@ async def list_enrollments(
         for r in res
     ]
 
-    return EnrollmentListResponse(items=items, total=total)
+    return EnrollmentListResponse(items=items, total=page.total, next_cursor=page.next_cursor)
 
 
 @router.post("/{enrollment_id}/approve")
-async def approve_enrollment(enrollment_id: str, current_user: User = Depends(require_manager_or_above), db: AsyncSession = Depends(get_db)):
+async def approve_enrollment(enrollment_id: str, current_user: Principal = Depends(require_manager_or_above), db: AsyncSession = Depends(get_db)):
     res = await db.execute(select(Enrollment).where(Enrollment.id == enrollment_id))
     e = res.scalar_one_or_none()
     if not e:
@@ -142,7 +151,7 @@ async def approve_enrollment(enrollment_id: str, current_user: User = Depends(re
                 )
             )
             if not existing_progress.scalar_one_or_none():
-                initial_hours = get_hours_for_grade(1)
+                initial_hours = get_hours_for_grade(1, branch.value)
                 progress = StudentProgress(
                     student_id=s.id,
                     branch=branch.value,
@@ -152,12 +161,14 @@ async def approve_enrollment(enrollment_id: str, current_user: User = Depends(re
                 )
                 db.add(progress)
 
+        await refresh_student_directory(db, [s.id])
         await db.commit()
+    invalidate_principal(e.user_id)
     return {"message": "Onaylandi"}
 
 
 @router.post("/{enrollment_id}/reject")
-async def reject_enrollment(enrollment_id: str, current_user: User = Depends(require_manager_or_above), db: AsyncSession = Depends(get_db)):
+async def reject_enrollment(enrollment_id: str, current_user: Principal = Depends(require_manager_or_above), db: AsyncSession = Depends(get_db)):
     res = await db.execute(select(Enrollment).where(Enrollment.id == enrollment_id))
     e = res.scalar_one_or_none()
     if not e:
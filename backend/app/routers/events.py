@@ -1,25 +1,37 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manage_events
-from app.models.user import User, UserRole
+from app.principal import Principal
+from app.load_plans import load_plan
+from app.models.user import UserRole
 from app.models.student import Student, StudentProgress, Branch
 from app.models.event import (
     Event, EventType, EventScope, EventSchool,
-    EventRegistration, SeminarEvaluation,
+    EventRegistration, RegistrationStatus,
 )
 from app.models.audit_log import AuditAction
 from app.services.audit import create_audit_log
+from app.services.counts import event_registration_count, event_waitlist_count
+from app.services.eligibility_report import build_eligibility_report
+from app.services.event_registration import claim_seat, fill_from_waitlist
 from app.utils import utcnow_naive
 from app.schemas.event import (
     EventCreate, EventUpdate, EventResponse, EventListResponse,
     EventRegistrationCreate, EventRegistrationResponse,
-    ExamEligibilityResponse, SeminarEvaluateRequest,
+    ExamEligibilityResponse, EligibilityReportResponse,
+    SeminarEvaluateRequest, SeminarEvaluateResponse,
 )
 from app.services.grade_hours import check_exam_eligibility, get_hours_for_grade
+from app.services.pagination import Keyset, paginate
+from app.services.school_scope import school_scope
+from app.services.seminar_evaluation import apply_seminar_results
 
 router = APIRouter()
 
@@ -30,13 +42,12 @@ async def list_events(
     is_completed: bool | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    include_total: bool = True,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Event).options(
-        selectinload(Event.selected_schools),
-        selectinload(Event.registrations),
-    )
+    query = select(Event, event_registration_count(), event_waitlist_count()).options(*load_plan("event_list"))
     count_query = select(func.count(Event.id))
 
     if event_type:
@@ -46,13 +57,17 @@ async def list_events(
         query = query.where(Event.is_completed == is_completed)
         count_query = count_query.where(Event.is_completed == is_completed)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(Event.start_datetime.desc()).offset(skip).limit(limit)
+    page = await paginate(
+        db,
+        query,
+        Keyset(Event.start_datetime, Event.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
+        scalars=False,
     )
-    events = result.scalars().unique().all()
+    events = page.rows
 
     return EventListResponse(
         items=[
@@ -71,19 +86,21 @@ async def list_events(
                 is_completed=e.is_completed,
                 created_by=str(e.created_by),
                 created_at=e.created_at,
-                registration_count=len(e.registrations) if e.registrations else 0,
+                registration_count=registration_count,
+                waitlist_count=waitlist_count,
                 selected_school_ids=[str(es.school_id) for es in (e.selected_schools or [])],
             )
-            for e in events
+            for e, registration_count, waitlist_count in events
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
 
 
 @router.post("/", response_model=EventResponse)
 async def create_event(
     data: EventCreate,
-    current_user: User = Depends(require_manage_events),
+    current_user: Principal = Depends(require_manage_events),
     db: AsyncSession = Depends(get_db),
 ):
     event = Event(
@@ -132,17 +149,18 @@ async def create_event(
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(
     event_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(Event)
-        .options(selectinload(Event.selected_schools), selectinload(Event.registrations))
+        select(Event, event_registration_count(), event_waitlist_count())
+        .options(*load_plan("event_list"))
         .where(Event.id == event_id)
     )
-    event = result.scalar_one_or_none()
-    if not event:
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Etkinlik bulunamadi")
+    event, registration_count, waitlist_count = row
 
     return EventResponse(
         id=str(event.id),
@@ -159,7 +177,8 @@ async def get_event(
         is_completed=event.is_completed,
         created_by=str(event.created_by),
         created_at=event.created_at,
-        registration_count=len(event.registrations) if event.registrations else 0,
+        registration_count=registration_count,
+        waitlist_count=waitlist_count,
         selected_school_ids=[str(es.school_id) for es in (event.selected_schools or [])],
     )
 
@@ -168,7 +187,7 @@ async def get_event(
 async def update_event(
     event_id: str,
     data: EventUpdate,
-    current_user: User = Depends(require_manage_events),
+    current_user: Principal = Depends(require_manage_events),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Event).where(Event.id == event_id))
@@ -181,6 +200,8 @@ async def update_event(
 
     for field, value in update_data.items():
         setattr(event, field, value)
+    if "capacity" in update_data:
+        await fill_from_waitlist(db, event.id)
 
     if school_ids is not None:
         old = await db.execute(
@@ -215,7 +236,7 @@ async def update_event(
 @router.delete("/{event_id}")
 async def delete_event(
     event_id: str,
-    current_user: User = Depends(require_manage_events),
+    current_user: Principal = Depends(require_manage_events),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Event).where(Event.id == event_id))
@@ -230,54 +251,74 @@ async def delete_event(
 
 # --- Registration ---
 
+def _registration_response(reg: EventRegistration, student_name: str | None = None) -> EventRegistrationResponse:
+    return EventRegistrationResponse(
+        id=str(reg.id),
+        event_id=str(reg.event_id),
+        student_id=str(reg.student_id),
+        register_wt=reg.register_wt,
+        register_escrima=reg.register_escrima,
+        will_take_exam=reg.will_take_exam,
+        exam_branch_wt=reg.exam_branch_wt,
+        exam_branch_escrima=reg.exam_branch_escrima,
+        needs_manager_approval=reg.needs_manager_approval,
+        manager_approved=reg.manager_approved,
+        status=reg.status,
+        created_at=reg.created_at,
+        student_name=student_name,
+    )
+
+
 @router.post("/{event_id}/register", response_model=EventRegistrationResponse)
 async def register_for_event(
     event_id: str,
     data: EventRegistrationCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    student_result = await db.execute(
-        select(Student).where(Student.user_id == current_user.id)
-    )
-    student = student_result.scalar_one_or_none()
-    if not student:
+    """
+    Kontenjan doluysa kayit bekleme listesine (WAITLISTED) alinir. Koltuk
+    transaction'in sonunda tek kosullu UPDATE ile alinir; event satiri
+    sadece INSERT + commit boyunca tutulur (bkz.
+    app/services/event_registration.py).
+    """
+    # Ogrenci ve ilerlemeleri tek sorguda
+    rows = (await db.execute(
+        select(Student.id, StudentProgress.branch, StudentProgress.current_grade, StudentProgress.completed_hours)
+        .outerjoin(StudentProgress, StudentProgress.student_id == Student.id)
+        .where(Student.user_id == current_user.id)
+    )).all()
+    if not rows:
         raise HTTPException(status_code=400, detail="Ogrenci profili bulunamadi")
-
-    event_result = await db.execute(select(Event).where(Event.id == event_id))
-    event = event_result.scalar_one_or_none()
-    if not event:
-        raise HTTPException(status_code=404, detail="Etkinlik bulunamadi")
-    if event.is_completed:
-        raise HTTPException(status_code=400, detail="Bu etkinlik tamamlanmis")
-
-    existing = await db.execute(
-        select(EventRegistration).where(
-            EventRegistration.event_id == event.id,
-            EventRegistration.student_id == student.id,
+    student_id = rows[0].id
+    progress_map = {row.branch: row for row in rows if row.branch is not None}
+
+    event_type = await claim_seat(db, event_id)
+    status = RegistrationStatus.CONFIRMED.value
+    if event_type is None:
+        event_result = await db.execute(
+            select(Event.event_type, Event.is_completed).where(Event.id == event_id)
         )
-    )
-    if existing.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Zaten kayitlisiniz")
+        event_row = event_result.first()
+        if not event_row:
+            raise HTTPException(status_code=404, detail="Etkinlik bulunamadi")
+        if event_row.is_completed:
+            raise HTTPException(status_code=400, detail="Bu etkinlik tamamlanmis")
+        event_type = event_row.event_type
+        status = RegistrationStatus.WAITLISTED.value
 
-    will_take_exam = data.will_take_exam if event.event_type == EventType.SEMINAR.value else False
+    will_take_exam = data.will_take_exam if event_type == EventType.SEMINAR.value else False
 
     needs_approval = False
     exam_branch_wt = data.exam_branch_wt if will_take_exam else False
     exam_branch_escrima = data.exam_branch_escrima if will_take_exam else False
 
     if will_take_exam:
-        progress_result = await db.execute(
-            select(StudentProgress).where(StudentProgress.student_id == student.id)
-        )
-        progress_list = progress_result.scalars().all()
-        progress_map = {p.branch: p for p in progress_list}
-
         if exam_branch_wt:
             wt_progress = progress_map.get(Branch.WING_TSUN.value)
             wt_hours = float(wt_progress.completed_hours) if wt_progress else 0
             wt_grade = wt_progress.current_grade if wt_progress else 1
-            wt_elig = check_exam_eligibility(wt_grade, wt_hours)
+            wt_elig = check_exam_eligibility(wt_grade, wt_hours, Branch.WING_TSUN.value)
             if wt_elig == "NOT_ELIGIBLE":
                 exam_branch_wt = False
             elif wt_elig == "NEEDS_APPROVAL":
@@ -287,7 +328,7 @@ async def register_for_event(
             esc_progress = progress_map.get(Branch.ESCRIMA.value)
             esc_hours = float(esc_progress.completed_hours) if esc_progress else 0
             esc_grade = esc_progress.current_grade if esc_progress else 1
-            esc_elig = check_exam_eligibility(esc_grade, esc_hours)
+            esc_elig = check_exam_eligibility(esc_grade, esc_hours, Branch.ESCRIMA.value)
             if esc_elig == "NOT_ELIGIBLE":
                 exam_branch_escrima = False
             elif esc_elig == "NEEDS_APPROVAL":
@@ -298,8 +339,9 @@ async def register_for_event(
             needs_approval = False
 
     reg = EventRegistration(
-        event_id=event.id,
-        student_id=student.id,
+        id=str(uuid.uuid4()),
+        event_id=event_id,
+        student_id=student_id,
         register_wt=data.register_wt,
         register_escrima=data.register_escrima,
         will_take_exam=will_take_exam,
@@ -307,53 +349,63 @@ async def register_for_event(
         exam_branch_escrima=exam_branch_escrima,
         needs_manager_approval=needs_approval,
         manager_approved=False,
+        status=status,
+        created_at=utcnow_naive(),
     )
     db.add(reg)
-    await db.commit()
-    await db.refresh(reg)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # uq_event_student_reg; alinan koltuk rollback ile geri verilir
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Zaten kayitlisiniz")
 
-    return EventRegistrationResponse(
-        id=str(reg.id),
-        event_id=str(reg.event_id),
-        student_id=str(reg.student_id),
-        register_wt=reg.register_wt,
-        register_escrima=reg.register_escrima,
-        will_take_exam=reg.will_take_exam,
-        exam_branch_wt=reg.exam_branch_wt,
-        exam_branch_escrima=reg.exam_branch_escrima,
-        needs_manager_approval=reg.needs_manager_approval,
-        manager_approved=reg.manager_approved,
-        created_at=reg.created_at,
+    return _registration_response(reg)
+
+
+@router.delete("/{event_id}/register")
+async def cancel_registration(
+    event_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Kendi kaydini iptal eder; bosalan koltuk bekleme listesinden doldurulur."""
+    result = await db.execute(
+        select(EventRegistration, Event.is_completed)
+        .join(Student, Student.id == EventRegistration.student_id)
+        .join(Event, Event.id == EventRegistration.event_id)
+        .where(EventRegistration.event_id == event_id, Student.user_id == current_user.id)
     )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Kayit bulunamadi")
+    reg, is_completed = row
+    if is_completed:
+        raise HTTPException(status_code=400, detail="Bu etkinlik tamamlanmis")
+
+    await db.delete(reg)
+    promoted = await fill_from_waitlist(db, event_id)
+    await db.commit()
+    return {"message": "Kaydiniz iptal edildi", "promoted": len(promoted)}
 
 
 @router.get("/{event_id}/registrations", response_model=list[EventRegistrationResponse])
 async def list_event_registrations(
     event_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
         select(EventRegistration)
-        .options(selectinload(EventRegistration.student).selectinload(Student.user))
+        .options(*load_plan("event_registrations"))
         .where(EventRegistration.event_id == event_id)
+        .order_by(EventRegistration.created_at, EventRegistration.id)
     )
     registrations = result.scalars().all()
 
     return [
-        EventRegistrationResponse(
-            id=str(r.id),
-            event_id=str(r.event_id),
-            student_id=str(r.student_id),
-            register_wt=r.register_wt,
-            register_escrima=r.register_escrima,
-            will_take_exam=r.will_take_exam,
-            exam_branch_wt=r.exam_branch_wt,
-            exam_branch_escrima=r.exam_branch_escrima,
-            needs_manager_approval=r.needs_manager_approval,
-            manager_approved=r.manager_approved,
-            created_at=r.created_at,
-            student_name=r.student.user.full_name if r.student and r.student.user else None,
+        _registration_response(
+            r, r.student.user.full_name if r.student and r.student.user else None
         )
         for r in registrations
     ]
@@ -364,7 +416,7 @@ async def list_event_registrations(
 @router.get("/{event_id}/my-eligibility", response_model=ExamEligibilityResponse)
 async def get_my_eligibility(
     event_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     student_result = await db.execute(
@@ -385,15 +437,15 @@ async def get_my_eligibility(
 
     wt_grade = wt_p.current_grade if wt_p else 1
     wt_hours = float(wt_p.completed_hours) if wt_p else 0
-    wt_hr = get_hours_for_grade(wt_grade)
+    wt_hr = get_hours_for_grade(wt_grade, Branch.WING_TSUN.value)
 
     esc_grade = esc_p.current_grade if esc_p else 1
     esc_hours = float(esc_p.completed_hours) if esc_p else 0
-    esc_hr = get_hours_for_grade(esc_grade)
+    esc_hr = get_hours_for_grade(esc_grade, Branch.ESCRIMA.value)
 
     return ExamEligibilityResponse(
-        wt_eligibility=check_exam_eligibility(wt_grade, wt_hours),
-        escrima_eligibility=check_exam_eligibility(esc_grade, esc_hours),
+        wt_eligibility=check_exam_eligibility(wt_grade, wt_hours, Branch.WING_TSUN.value),
+        escrima_eligibility=check_exam_eligibility(esc_grade, esc_hours, Branch.ESCRIMA.value),
         wt_completed_hours=wt_hours,
         wt_required_hours=wt_hr["required"],
         wt_minimum_hours=wt_hr["minimum"],
@@ -403,13 +455,37 @@ async def get_my_eligibility(
     )
 
 
+@router.get("/{event_id}/eligibility-report", response_model=EligibilityReportResponse)
+async def get_eligibility_report(
+    event_id: str,
+    school_id: str | None = None,
+    branch: Branch | None = None,
+    current_user: Principal = Depends(require_manage_events),
+    db: AsyncSession = Depends(get_db),
+):
+    """Etkinlik kapsamindaki ogrencilerin brans bazinda sinav uygunluk durumu."""
+    result = await db.execute(select(Event).where(Event.id == event_id))
+    event = result.scalar_one_or_none()
+    if not event:
+        raise HTTPException(status_code=404, detail="Etkinlik bulunamadi")
+
+    scope = school_scope(current_user)
+    if school_id and not scope.allows(school_id):
+        raise HTTPException(status_code=403, detail="Bu okula erisim yetkiniz yok")
+
+    report = await build_eligibility_report(
+        db, event, scope, school_id=school_id, branch=branch.value if branch else None
+    )
+    # Rapor zaten response sekliyle uretilir; binlerce satir icin model dogrulamasi atlanir
+    return JSONResponse(report)
+
 # --- Manager Exam Approval ---
 
 @router.post("/{event_id}/registrations/{reg_id}/approve-exam")
 async def approve_exam_registration(
     event_id: str,
     reg_id: str,
-    current_user: User = Depends(require_manage_events),
+    current_user: Principal = Depends(require_manage_events),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -431,15 +507,16 @@ async def approve_exam_registration(
 
 # --- Seminar Evaluation ---
 
-@router.post("/{event_id}/evaluate")
+@router.post("/{event_id}/evaluate", response_model=SeminarEvaluateResponse)
 async def evaluate_seminar(
     event_id: str,
     data: SeminarEvaluateRequest,
-    current_user: User = Depends(require_manage_events),
+    current_user: Principal = Depends(require_manage_events),
     db: AsyncSession = Depends(get_db),
 ):
     # --- Temel kontroller ---
-    event_result = await db.execute(select(Event).where(Event.id == event_id))
+    # Satir kilidi: ayni seminerin eszamanli iki degerlendirmesi dereceyi iki kez artirmaz
+    event_result = await db.execute(select(Event).where(Event.id == event_id).with_for_update())
     event = event_result.scalar_one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Etkinlik bulunamadi")
@@ -464,121 +541,16 @@ async def evaluate_seminar(
             detail=f"Su ogrenciler hem gecti hem kaldi listesinde: {list(overlap)}",
         )
 
-    now = utcnow_naive()
-    passed_count = 0
-    failed_count = 0
-
-    # --- Gecen ogrenciler: derece +1, saatler sifirla ---
-    for sid in data.passed_student_ids:
-        reg_result = await db.execute(
-            select(EventRegistration).where(
-                EventRegistration.event_id == event.id,
-                EventRegistration.student_id == sid,
-                EventRegistration.will_take_exam == True,
-            )
-        )
-        reg = reg_result.scalar_one_or_none()
-        if not reg:
-            continue
-
-        for branch_flag, branch_enum in [
-            (reg.exam_branch_wt, Branch.WING_TSUN),
-            (reg.exam_branch_escrima, Branch.ESCRIMA),
-        ]:
-            if not branch_flag:
-                continue
-
-            progress_result = await db.execute(
-                select(StudentProgress).where(
-                    StudentProgress.student_id == sid,
-                    StudentProgress.branch == branch_enum.value,
-                )
-            )
-            progress = progress_result.scalar_one_or_none()
-            if not progress:
-                continue
-
-            old_grade = progress.current_grade
-            new_grade = old_grade + 1
-            progress.current_grade = new_grade
-            new_hours = get_hours_for_grade(new_grade)
-            progress.completed_hours = 0
-            progress.remaining_hours = new_hours["required"]
-
-            db.add(SeminarEvaluation(
-                event_id=event.id,
-                student_id=sid,
-                branch=branch_enum.value,
-                passed=True,
-                grade_before=old_grade,
-                grade_after=new_grade,
-                evaluated_by=current_user.id,
-                evaluated_at=now,
-            ))
-
-            await create_audit_log(
-                db,
-                action=AuditAction.SEMINAR_EVALUATED,
-                entity_type="StudentProgress",
-                entity_id=progress.id,
-                performed_by=current_user.id,
-                details=f"Seminer sinavi gecti: {branch_enum.value} {old_grade} -> {new_grade}",
-                old_value=str(old_grade),
-                new_value=str(new_grade),
-            )
-            passed_count += 1
-
-    # --- Kalan ogrenciler: derece/saat degismez, yalnizca kayit olusturulur ---
-    for sid in data.failed_student_ids:
-        reg_result = await db.execute(
-            select(EventRegistration).where(
-                EventRegistration.event_id == event.id,
-                EventRegistration.student_id == sid,
-                EventRegistration.will_take_exam == True,
-            )
-        )
-        reg = reg_result.scalar_one_or_none()
-        if not reg:
-            continue
-
-        for branch_flag, branch_enum in [
-            (reg.exam_branch_wt, Branch.WING_TSUN),
-            (reg.exam_branch_escrima, Branch.ESCRIMA),
-        ]:
-            if not branch_flag:
-                continue
-
-            progress_result = await db.execute(
-                select(StudentProgress).where(
-                    StudentProgress.student_id == sid,
-                    StudentProgress.branch == branch_enum.value,
-                )
-            )
-            progress = progress_result.scalar_one_or_none()
-            current_grade = progress.current_grade if progress else 0
-
-            db.add(SeminarEvaluation(
-                event_id=event.id,
-                student_id=sid,
-                branch=branch_enum.value,
-                passed=False,
-                grade_before=current_grade,
-                grade_after=current_grade,
-                evaluated_by=current_user.id,
-                evaluated_at=now,
-            ))
-
-            await create_audit_log(
-                db,
-                action=AuditAction.SEMINAR_EVALUATED,
-                entity_type="StudentProgress",
-                entity_id=progress.id if progress else sid,
-                performed_by=current_user.id,
-                details=f"Seminer sinavi kaldi: {branch_enum.value} derece {current_grade}",
-                old_value=str(current_grade),
-                new_value=str(current_grade),
-            )
-            failed_count += 1
+    results = await apply_seminar_results(
+        db,
+        event.id,
+        data.passed_student_ids,
+        data.failed_student_ids,
+        performed_by=current_user.id,
+    )
+    passed_count = sum(1 for r in results if r.passed)
+    failed_count = len(results) - passed_count
+    evaluated = {r.student_id for r in results}
 
     event.is_completed = True
 
@@ -592,8 +564,13 @@ async def evaluate_seminar(
     )
 
     await db.commit()
-    return {
-        "message": "Seminer degerlendirildi.",
-        "passed": passed_count,
-        "failed": failed_count,
-    }
+    return SeminarEvaluateResponse(
+        message="Seminer degerlendirildi.",
+        passed=passed_count,
+        failed=failed_count,
+        results=results,
+        skipped_student_ids=[
+            sid for sid in dict.fromkeys([*data.passed_student_ids, *data.failed_student_ids])
+            if sid not in evaluated
+        ],
+    )
@@ -1,22 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.database import get_db
-from app.auth import get_current_user, require_manage_grades, require_manager_or_above
-from app.models.user import User, UserRole
+from app.auth import (
+    get_current_user,
+    require_admin_or_above,
+    require_manage_grades,
+    require_manager_or_above,
+)
+from app.principal import Principal
+from app.load_plans import load_plan
+from app.models.user import UserRole
 from app.models.student import Student, StudentProgress, Branch
-from app.models.school import SchoolManager
 from app.models.grade import GradeRequirement
 from app.models.grade_change_request import GradeChangeRequest, GradeChangeStatus
+from app.models.hours_recompute import HoursRecomputeJob, HoursRecomputeStatus
 from app.models.audit_log import AuditAction
 from app.services.audit import create_audit_log
+from app.services.grade_hours import get_hours_for_grade, load_grade_rules, non_negative
+from app.services.hours_ledger import reconcile_hours
+from app.services.hours_recompute import create_recompute_job, run_recompute_job
+from app.services.school_scope import school_scope
+from app.services.student_directory import refresh_student_directory
 from app.utils import utcnow_naive
 from app.schemas.grade import (
     GradeRequirementCreate,
     GradeRequirementUpdate,
     GradeRequirementResponse,
+    HoursReconciliationResponse,
+    HoursRecomputeJobResponse,
     ManualGradeChangeRequest,
 )
 from app.schemas.grade_change_request import (
@@ -47,10 +62,21 @@ def _change_request_to_response(r: GradeChangeRequest) -> GradeChangeRequestResp
     )
 
 
+def _requirement_response(req: GradeRequirement, recompute_job_id: str | None = None) -> GradeRequirementResponse:
+    return GradeRequirementResponse(
+        id=str(req.id),
+        branch=req.branch,
+        grade=req.grade,
+        grade_name=req.grade_name,
+        required_hours=float(req.required_hours),
+        recompute_job_id=recompute_job_id,
+    )
+
+
 @router.get("/requirements", response_model=list[GradeRequirementResponse])
 async def list_grade_requirements(
     branch: str | None = None,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     query = select(GradeRequirement)
@@ -61,24 +87,59 @@ async def list_grade_requirements(
     result = await db.execute(query)
     requirements = result.scalars().all()
 
-    return [
-        GradeRequirementResponse(
-            id=str(r.id),
-            branch=r.branch,
-            grade=r.grade,
-            grade_name=r.grade_name,
-            required_hours=float(r.required_hours),
-        )
-        for r in requirements
-    ]
+    return [_requirement_response(r) for r in requirements]
+
+
+async def _queue_recompute(
+    db: AsyncSession,
+    req: GradeRequirement,
+    required_before: float,
+    performed_by: str,
+) -> HoursRecomputeJob | None:
+    """Gereken saat degistiyse kalan saat isini ve audit kaydini ekler (commit oncesi)."""
+    required_after = float(req.required_hours)
+    if required_after == float(required_before):
+        return None
+    job = await create_recompute_job(db, req.branch, req.grade, performed_by)
+    await create_audit_log(
+        db,
+        AuditAction.GRADE_REQUIREMENT_CHANGED,
+        "GradeRequirement",
+        str(req.id),
+        performed_by,
+        details=f"{req.branch} {req.grade}. derece gereken saat degisti; {job.total} ilerleme yeniden hesaplanacak",
+        old_value=str(required_before),
+        new_value=str(required_after),
+    )
+    return job
+
+
+async def _commit_requirement(
+    db: AsyncSession,
+    background_tasks: BackgroundTasks,
+    req: GradeRequirement,
+    job: HoursRecomputeJob | None,
+) -> GradeRequirementResponse:
+    """Commit eder, kural tablosunu yeniler ve varsa isi arka planda baslatir."""
+    await db.commit()
+    await db.refresh(req)
+    await load_grade_rules(db)
+    if job is None:
+        return _requirement_response(req)
+    background_tasks.add_task(
+        run_recompute_job, async_sessionmaker(db.bind, expire_on_commit=False), job.id
+    )
+    return _requirement_response(req, job.id)
 
 
 @router.post("/requirements", response_model=GradeRequirementResponse)
 async def create_grade_requirement(
     data: GradeRequirementCreate,
-    current_user: User = Depends(require_manage_grades),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(require_manage_grades),
     db: AsyncSession = Depends(get_db),
 ):
+    required_before = get_hours_for_grade(data.grade, data.branch)["required"]
     req = GradeRequirement(
         branch=data.branch,
         grade=data.grade,
@@ -86,23 +147,18 @@ async def create_grade_requirement(
         required_hours=data.required_hours,
     )
     db.add(req)
-    await db.commit()
-    await db.refresh(req)
+    await db.flush()
 
-    return GradeRequirementResponse(
-        id=str(req.id),
-        branch=req.branch,
-        grade=req.grade,
-        grade_name=req.grade_name,
-        required_hours=float(req.required_hours),
-    )
+    job = await _queue_recompute(db, req, required_before, current_user.id)
+    return await _commit_requirement(db, background_tasks, req, job)
 
 
 @router.put("/requirements/{req_id}", response_model=GradeRequirementResponse)
 async def update_grade_requirement(
     req_id: str,
     data: GradeRequirementUpdate,
-    current_user: User = Depends(require_manage_grades),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(require_manage_grades),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -112,20 +168,41 @@ async def update_grade_requirement(
     if not req:
         raise HTTPException(status_code=404, detail="Derece gereksinimi bulunamadı")
 
+    required_before = float(req.required_hours)
     if data.grade_name is not None:
         req.grade_name = data.grade_name
     if data.required_hours is not None:
         req.required_hours = data.required_hours
 
-    await db.commit()
-    await db.refresh(req)
+    job = await _queue_recompute(db, req, required_before, current_user.id)
+    return await _commit_requirement(db, background_tasks, req, job)
 
-    return GradeRequirementResponse(
-        id=str(req.id),
-        branch=req.branch,
-        grade=req.grade,
-        grade_name=req.grade_name,
-        required_hours=float(req.required_hours),
+
+@router.get("/recompute-jobs/{job_id}", response_model=HoursRecomputeJobResponse)
+async def get_recompute_job(
+    job_id: str,
+    current_user: Principal = Depends(require_manage_grades),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await db.get(HoursRecomputeJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Yeniden hesaplama işi bulunamadı")
+    return HoursRecomputeJobResponse(
+        id=job.id,
+        branch=job.branch,
+        grade=job.grade,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        updated=job.updated,
+        progress=(
+            min(1.0, job.processed / job.total) if job.total
+            else float(job.status == HoursRecomputeStatus.COMPLETED.value)
+        ),
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
     )
 
 
@@ -150,6 +227,12 @@ async def _apply_grade_change(
 
     old_grade = progress.current_grade
     progress.current_grade = new_grade
+    # Saatler sifirlanmaz; kalan saat ayni UPDATE'te yeni derecenin gereksiniminden,
+    # satirin o anki completed_hours degeriyle hesaplanir
+    progress.remaining_hours = non_negative(
+        get_hours_for_grade(new_grade, branch)["required"] - StudentProgress.completed_hours
+    )
+    await refresh_student_directory(db, [student_id])
 
     await create_audit_log(
         db,
@@ -164,17 +247,10 @@ async def _apply_grade_change(
     return old_grade
 
 
-async def _manager_school_ids(db: AsyncSession, user_id: str) -> list[str]:
-    result = await db.execute(
-        select(SchoolManager.school_id).where(SchoolManager.user_id == user_id)
-    )
-    return [row[0] for row in result.all()]
-
-
 @router.post("/manual-change")
 async def manual_grade_change(
     data: ManualGradeChangeRequest,
-    current_user: User = Depends(require_manage_grades),
+    current_user: Principal = Depends(require_manage_grades),
     db: AsyncSession = Depends(get_db),
 ):
     if not data.note or not data.note.strip():
@@ -201,7 +277,7 @@ async def manual_grade_change(
 @router.post("/change-requests", response_model=GradeChangeRequestResponse)
 async def create_grade_change_request(
     data: GradeChangeRequestCreate,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     if not data.note or not data.note.strip():
@@ -214,10 +290,8 @@ async def create_grade_change_request(
     if not student:
         raise HTTPException(status_code=404, detail="Öğrenci bulunamadı")
 
-    if current_user.role == UserRole.MANAGER.value:
-        school_ids = await _manager_school_ids(db, current_user.id)
-        if student.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu öğrenci sizin okulunuzda değil")
+    if not school_scope(current_user).allows(student.school_id):
+        raise HTTPException(status_code=403, detail="Bu öğrenci sizin okulunuzda değil")
 
     progress_result = await db.execute(
         select(StudentProgress).where(
@@ -256,11 +330,7 @@ async def create_grade_change_request(
 
     result = await db.execute(
         select(GradeChangeRequest)
-        .options(
-            selectinload(GradeChangeRequest.student).selectinload(Student.user),
-            selectinload(GradeChangeRequest.student).selectinload(Student.school),
-            selectinload(GradeChangeRequest.requester),
-        )
+        .options(*load_plan("grade_change_request"))
         .where(GradeChangeRequest.id == req.id)
     )
     req = result.scalar_one()
@@ -271,18 +341,13 @@ async def create_grade_change_request(
 async def list_grade_change_requests(
     status: str | None = None,
     school_id: str | None = None,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(GradeChangeRequest).options(
-        selectinload(GradeChangeRequest.student).selectinload(Student.user),
-        selectinload(GradeChangeRequest.student).selectinload(Student.school),
-        selectinload(GradeChangeRequest.requester),
-    )
+    query = select(GradeChangeRequest).options(*load_plan("grade_change_request"))
 
     if current_user.role == UserRole.MANAGER.value:
-        school_ids = await _manager_school_ids(db, current_user.id)
-        student_ids_q = select(Student.id).where(Student.school_id.in_(school_ids))
+        student_ids_q = select(Student.id).where(school_scope(current_user).filter(Student.school_id))
         query = query.where(GradeChangeRequest.student_id.in_(student_ids_q))
     elif school_id:
         student_ids_q = select(Student.id).where(Student.school_id == school_id)
@@ -303,7 +368,7 @@ async def list_grade_change_requests(
 @router.post("/change-requests/{request_id}/approve", response_model=GradeChangeRequestResponse)
 async def approve_grade_change_request(
     request_id: str,
-    current_user: User = Depends(require_manage_grades),
+    current_user: Principal = Depends(require_manage_grades),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -333,11 +398,7 @@ async def approve_grade_change_request(
 
     result = await db.execute(
         select(GradeChangeRequest)
-        .options(
-            selectinload(GradeChangeRequest.student).selectinload(Student.user),
-            selectinload(GradeChangeRequest.student).selectinload(Student.school),
-            selectinload(GradeChangeRequest.requester),
-        )
+        .options(*load_plan("grade_change_request"))
         .where(GradeChangeRequest.id == req.id)
     )
     req = result.scalar_one()
@@ -347,7 +408,7 @@ async def approve_grade_change_request(
 @router.post("/change-requests/{request_id}/reject", response_model=GradeChangeRequestResponse)
 async def reject_grade_change_request(
     request_id: str,
-    current_user: User = Depends(require_manage_grades),
+    current_user: Principal = Depends(require_manage_grades),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -376,12 +437,28 @@ async def reject_grade_change_request(
 
     result = await db.execute(
         select(GradeChangeRequest)
-        .options(
-            selectinload(GradeChangeRequest.student).selectinload(Student.user),
-            selectinload(GradeChangeRequest.student).selectinload(Student.school),
-            selectinload(GradeChangeRequest.requester),
-        )
+        .options(*load_plan("grade_change_request"))
         .where(GradeChangeRequest.id == req.id)
     )
     req = result.scalar_one()
     return _change_request_to_response(req)
+
+
+@router.post("/hours-reconciliation", response_model=HoursReconciliationResponse)
+async def run_hours_reconciliation(
+    fix: bool = Query(False),
+    incremental: bool = Query(False),
+    since: datetime | None = Query(None),
+    current_user: Principal = Depends(require_admin_or_above),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tamamlanan saatleri yoklamalardan yeniden hesaplar; fix=true farklari duzeltir.
+
+    incremental=true son calistirmadan beri dokunulan ogrencileri, since ise
+    verilen zamandan beri dokunulanlari tarar.
+    """
+    report = await reconcile_hours(
+        db, fix=fix, since=since, incremental=incremental, performed_by=current_user.id
+    )
+    await db.commit()
+    return report
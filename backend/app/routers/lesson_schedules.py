@@ -1,15 +1,22 @@
-from datetime import datetime, timedelta, date
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above
-from app.models.user import User, UserRole
-from app.models.school import SchoolManager
+from app.principal import Principal
 from app.models.lesson_schedule import LessonSchedule
-from app.models.lesson import Lesson, LessonType, LESSON_DURATION
+from app.models.lesson import LessonType, LESSON_DURATION
+from app.models.school import School
+from app.services.counts import schedule_lesson_count
+from app.services.lesson_schedules import (
+    delete_future_unattended_lessons,
+    existing_lesson_dates,
+    generate_lesson_dates,
+    insert_schedule_lessons,
+)
+from app.services.school_scope import school_scope
 from app.schemas.lesson_schedule import (
     LessonScheduleCreate,
     LessonScheduleResponse,
@@ -30,21 +37,18 @@ DAY_NAMES_TR = {
 }
 
 
-def _generate_lesson_dates(day_of_week: int, start_dt: date, end_dt: date) -> list[date]:
-    """Generate all dates matching the given day_of_week between start and end."""
-    dates = []
-    current = start_dt
-    # Find the first occurrence of the target day
-    while current.weekday() != day_of_week:
-        current += timedelta(days=1)
-    # Iterate weekly
-    while current <= end_dt:
-        dates.append(current)
-        current += timedelta(days=7)
-    return dates
+def _schedule_query():
+    """Program + okul adi + olusturulmus ders sayisi, tek SELECT."""
+    return select(LessonSchedule, School.name, schedule_lesson_count()).outerjoin(
+        School, School.id == LessonSchedule.school_id
+    )
 
 
-def _schedule_to_response(schedule: LessonSchedule) -> LessonScheduleResponse:
+def _schedule_to_response(
+    schedule: LessonSchedule,
+    school_name: str | None,
+    generated_lesson_count: int,
+) -> LessonScheduleResponse:
     return LessonScheduleResponse(
         id=str(schedule.id),
         school_id=str(schedule.school_id),
@@ -56,11 +60,12 @@ def _schedule_to_response(schedule: LessonSchedule) -> LessonScheduleResponse:
         start_date=schedule.start_date,
         end_date=schedule.end_date,
         is_active=schedule.is_active,
+        is_virtual=schedule.is_virtual,
         notes=schedule.notes,
         created_by=str(schedule.created_by),
         created_at=schedule.created_at,
-        school_name=schedule.school.name if schedule.school else None,
-        generated_lesson_count=len(schedule.lessons) if schedule.lessons else 0,
+        school_name=school_name,
+        generated_lesson_count=generated_lesson_count,
     )
 
 
@@ -70,22 +75,16 @@ async def list_schedules(
     is_active: bool | None = True,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(LessonSchedule).options(
-        selectinload(LessonSchedule.school),
-        selectinload(LessonSchedule.lessons),
-    )
+    query = _schedule_query()
     count_q = select(func.count(LessonSchedule.id))
 
     # MANAGER only sees own schools
-    if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(LessonSchedule.school_id.in_(school_ids_q))
-        count_q = count_q.where(LessonSchedule.school_id.in_(school_ids_q))
+    scope = school_scope(current_user)
+    query = scope.apply(query, LessonSchedule.school_id)
+    count_q = scope.apply(count_q, LessonSchedule.school_id)
 
     if school_id:
         query = query.where(LessonSchedule.school_id == school_id)
@@ -98,10 +97,8 @@ async def list_schedules(
     result = await db.execute(
         query.order_by(LessonSchedule.created_at.desc()).offset(skip).limit(limit)
     )
-    schedules = result.scalars().unique().all()
-
     return LessonScheduleListResponse(
-        items=[_schedule_to_response(s) for s in schedules],
+        items=[_schedule_to_response(*row) for row in result.all()],
         total=total,
     )
 
@@ -109,7 +106,7 @@ async def list_schedules(
 @router.post("/")
 async def create_schedule(
     data: LessonScheduleCreate,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     # Validate day_of_week
@@ -123,13 +120,8 @@ async def create_schedule(
         raise HTTPException(status_code=400, detail="Gecersiz ders turu")
 
     # MANAGER check
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if data.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu okul icin program olusturamazsiniz")
+    if not school_scope(current_user).allows(data.school_id):
+        raise HTTPException(status_code=403, detail="Bu okul icin program olusturamazsiniz")
 
     # Parse dates
     try:
@@ -162,101 +154,74 @@ async def create_schedule(
         start_date=datetime.combine(start_dt, datetime.min.time()),
         end_date=datetime.combine(end_dt, datetime.min.time()),
         is_active=True,
+        is_virtual=data.is_virtual,
         notes=data.notes,
         created_by=current_user.id,
     )
     db.add(schedule)
     await db.flush()  # get schedule.id
 
-    # Generate lesson instances
-    lesson_dates = _generate_lesson_dates(data.day_of_week, start_dt, end_dt)
-    hour, minute = data.start_time.split(":")
-
+    # Generate lesson instances: tek cok satirli INSERT (sanal programda hic yazilmaz)
     generated = 0
-    for d in lesson_dates:
-        lesson_datetime = datetime(d.year, d.month, d.day, int(hour), int(minute))
-        lesson = Lesson(
-            school_id=data.school_id,
-            branch=data.branch,
-            lesson_type=data.lesson_type,
-            lesson_date=lesson_datetime,
-            duration_hours=duration,
-            created_by=current_user.id,
-            notes=data.notes,
-            schedule_id=schedule.id,
-        )
-        db.add(lesson)
-        generated += 1
+    if not data.is_virtual:
+        lesson_dates = generate_lesson_dates(data.day_of_week, start_dt, end_dt)
+        generated = await insert_schedule_lessons(db, schedule, lesson_dates, current_user.id)
 
+    school_name = (
+        await db.execute(select(School.name).where(School.id == data.school_id))
+    ).scalar_one_or_none()
     await db.commit()
-
-    # Reload with relationships
-    result = await db.execute(
-        select(LessonSchedule)
-        .options(selectinload(LessonSchedule.school), selectinload(LessonSchedule.lessons))
-        .where(LessonSchedule.id == schedule.id)
-    )
-    schedule = result.scalar_one()
+    await db.refresh(schedule)
 
     day_name = DAY_NAMES_TR.get(data.day_of_week, "?")
+    if data.is_virtual:
+        message = f"Her {day_name} {data.start_time} icin sanal program olusturuldu"
+    else:
+        message = f"Her {day_name} {data.start_time} icin {generated} ders olusturuldu"
 
     return {
-        "schedule": _schedule_to_response(schedule).model_dump(),
+        "schedule": _schedule_to_response(schedule, school_name, generated).model_dump(),
         "generated_count": generated,
-        "message": f"Her {day_name} {data.start_time} icin {generated} ders olusturuldu",
+        "message": message,
     }
 
 
 @router.get("/{schedule_id}", response_model=LessonScheduleResponse)
 async def get_schedule(
     schedule_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(LessonSchedule)
-        .options(selectinload(LessonSchedule.school), selectinload(LessonSchedule.lessons))
-        .where(LessonSchedule.id == schedule_id)
-    )
-    schedule = result.scalar_one_or_none()
-    if not schedule:
+    result = await db.execute(_schedule_query().where(LessonSchedule.id == schedule_id))
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Program bulunamadi")
 
-    return _schedule_to_response(schedule)
+    return _schedule_to_response(*row)
 
 
 @router.delete("/{schedule_id}")
 async def delete_schedule(
     schedule_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
+    # Deactivate schedule: tek UPDATE, program satiri yuklenmez
     result = await db.execute(
-        select(LessonSchedule)
-        .options(selectinload(LessonSchedule.lessons))
+        update(LessonSchedule)
         .where(LessonSchedule.id == schedule_id)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
     )
-    schedule = result.scalar_one_or_none()
-    if not schedule:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Program bulunamadi")
 
-    # Deactivate schedule
-    schedule.is_active = False
-
-    # Delete future lessons with no attendance
-    now = datetime.utcnow()
-    deleted_count = 0
-    for lesson in (schedule.lessons or []):
-        if lesson.lesson_date > now:
-            # Check if lesson has attendance
-            att_count = len(lesson.attendances) if lesson.attendances else 0
-            if att_count == 0:
-                await db.delete(lesson)
-                deleted_count += 1
+    deleted_count = await delete_future_unattended_lessons(db, schedule_id)
 
     await db.commit()
     return {
         "message": f"Program deaktif edildi. {deleted_count} gelecek ders silindi.",
+        "deleted_count": deleted_count,
     }
 
 
@@ -264,14 +229,12 @@ async def delete_schedule(
 async def extend_schedule(
     schedule_id: str,
     new_end_date: str | None = None,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     """Mevcut programa yeni dersler ekle (tarih uzatma)."""
     result = await db.execute(
-        select(LessonSchedule)
-        .options(selectinload(LessonSchedule.school), selectinload(LessonSchedule.lessons))
-        .where(LessonSchedule.id == schedule_id)
+        select(LessonSchedule).where(LessonSchedule.id == schedule_id)
     )
     schedule = result.scalar_one_or_none()
     if not schedule:
@@ -291,32 +254,18 @@ async def extend_schedule(
     start_dt = schedule.start_date.date() if isinstance(schedule.start_date, datetime) else schedule.start_date
     end_dt = schedule.end_date.date() if isinstance(schedule.end_date, datetime) else schedule.end_date
 
-    # Find existing lesson dates for this schedule
-    existing_dates = set()
-    for lesson in (schedule.lessons or []):
-        if isinstance(lesson.lesson_date, datetime):
-            existing_dates.add(lesson.lesson_date.date())
+    # Sanal programda yeni bitis tarihi yeterli; dersler okuma aninda uretilir
+    if schedule.is_virtual:
+        await db.commit()
+        return {"message": "Program bitis tarihi guncellendi.", "generated": 0}
 
     # Generate missing dates
-    all_dates = _generate_lesson_dates(schedule.day_of_week, start_dt, end_dt)
-    hour, minute = schedule.start_time.split(":")
-    generated = 0
-
-    for d in all_dates:
-        if d not in existing_dates:
-            lesson_datetime = datetime(d.year, d.month, d.day, int(hour), int(minute))
-            lesson = Lesson(
-                school_id=schedule.school_id,
-                branch=schedule.branch,
-                lesson_type=schedule.lesson_type,
-                lesson_date=lesson_datetime,
-                duration_hours=float(schedule.duration_hours),
-                created_by=current_user.id,
-                notes=schedule.notes,
-                schedule_id=schedule.id,
-            )
-            db.add(lesson)
-            generated += 1
+    existing_dates = await existing_lesson_dates(db, schedule.id)
+    missing = [
+        d for d in generate_lesson_dates(schedule.day_of_week, start_dt, end_dt)
+        if d not in existing_dates
+    ]
+    generated = await insert_schedule_lessons(db, schedule, missing, current_user.id)
 
     await db.commit()
 
@@ -1,21 +1,61 @@
+from operator import attrgetter, itemgetter
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import false, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above
-from app.models.user import User, UserRole
-from app.models.school import SchoolManager
-from app.models.lesson import Lesson, LessonType, LESSON_DURATION
+from app.principal import Principal
+from app.load_plans import load_plan
 from app.models.attendance import Attendance
-from app.models.student import Student, StudentProgress
-from app.services.grade_hours import update_progress_hours
+from app.models.lesson import Lesson, LessonType, LESSON_DURATION
+from app.models.school import School
+from app.services.attendance import revert_attendance_hours
+from app.services.counts import lesson_attendance_count
+from app.services.lesson_schedules import (
+    count_virtual_occurrences,
+    get_or_materialize_lesson,
+    resolve_occurrence,
+    virtual_occurrences,
+)
+from app.services.pagination import Keyset, paginate
+from app.services.projection import column_fields, parse_fields, project, projected_response
+from app.services.school_scope import school_scope
 from app.schemas.lesson import LessonCreate, LessonUpdate, LessonResponse, LessonListResponse
 
 router = APIRouter()
 
 
+# fields= ile secilebilen alanlar (bkz. app/services/projection.py)
+LESSON_FIELDS = {
+    **column_fields(Lesson, LessonResponse),
+    "school_name": (
+        select(School.name).where(School.id == Lesson.school_id).correlate(Lesson).scalar_subquery()
+    ),
+    "attendance_count": lesson_attendance_count(),
+    "is_virtual": false(),
+}
+
+
+def _lesson_to_response(l: Lesson, attendance_count: int) -> LessonResponse:
+    """lesson_list plani ile yuklenmis bir dersin response'u."""
+    return LessonResponse(
+        id=str(l.id),
+        school_id=str(l.school_id),
+        branch=l.branch,
+        lesson_type=l.lesson_type,
+        lesson_date=l.lesson_date,
+        duration_hours=float(l.duration_hours),
+        created_by=str(l.created_by),
+        notes=l.notes,
+        created_at=l.created_at,
+        school_name=l.school.name if l.school else None,
+        attendance_count=attendance_count,
+        schedule_id=str(l.schedule_id) if l.schedule_id else None,
+    )
+
+
 @router.get("/", response_model=LessonListResponse)
 async def list_lessons(
     school_id: str | None = None,
@@ -24,18 +64,19 @@ async def list_lessons(
     schedule_id: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: str | None = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Lesson).options(selectinload(Lesson.school), selectinload(Lesson.attendances))
+    columns = parse_fields(fields, LESSON_FIELDS)
+    query = select(Lesson, lesson_attendance_count())
     count_query = select(func.count(Lesson.id))
 
-    if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(Lesson.school_id.in_(school_ids_q))
-        count_query = count_query.where(Lesson.school_id.in_(school_ids_q))
+    scope = school_scope(current_user)
+    query = scope.apply(query, Lesson.school_id)
+    count_query = scope.apply(count_query, Lesson.school_id)
 
     if school_id:
         query = query.where(Lesson.school_id == school_id)
@@ -50,50 +91,68 @@ async def list_lessons(
         query = query.where(Lesson.schedule_id == schedule_id)
         count_query = count_query.where(Lesson.schedule_id == schedule_id)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(Lesson.lesson_date.desc()).offset(skip).limit(limit)
+    # Sanal programlarin henuz olusturulmamis dersleri de listeye katilir.
+    # Sayfa icin her programdan imlecten onceki en yeni skip+limit+1 ders
+    # yeter (+1: sonraki sayfa olup olmadigini anlamak icin); toplam ise
+    # dersler uretilmeden hesaplanir.
+    filters = dict(
+        scope=scope, school_id=school_id, branch=branch,
+        lesson_type=lesson_type, schedule_id=schedule_id,
     )
-    lessons = result.scalars().unique().all()
-
-    return LessonListResponse(
-        items=[
-            LessonResponse(
-                id=str(l.id),
-                school_id=str(l.school_id),
-                branch=l.branch,
-                lesson_type=l.lesson_type,
-                lesson_date=l.lesson_date,
-                duration_hours=float(l.duration_hours),
-                created_by=str(l.created_by),
-                notes=l.notes,
-                created_at=l.created_at,
-                school_name=l.school.name if l.school else None,
-                attendance_count=len(l.attendances) if l.attendances else 0,
-                schedule_id=str(l.schedule_id) if l.schedule_id else None,
-            )
-            for l in lessons
-        ],
-        total=total,
+    keyset = Keyset(Lesson.lesson_date, Lesson.id)
+    after = keyset.decode(cursor) if cursor else None
+    start = 0 if cursor else skip
+    virtual = await virtual_occurrences(
+        db, before=after, per_schedule_limit=start + limit + 1, **filters
     )
+    total = None
+    if include_total:
+        total = (await db.execute(count_query)).scalar() + await count_virtual_occurrences(db, **filters)
+
+    # Projeksiyonda satirlar ve sanal dersler ad->deger sozlukleridir
+    if columns:
+        query = project(query, columns, keyset)
+        virtual = [v.model_dump() for v in virtual]
+        to_item = dict
+        sort_key = itemgetter("lesson_date", "id")
+    else:
+        query = query.options(*load_plan("lesson_list"))
+        to_item = lambda row: _lesson_to_response(*row)
+        sort_key = attrgetter("lesson_date", "id")
+
+    if not virtual:
+        page = await paginate(
+            db, query, keyset, skip=skip, limit=limit, cursor=cursor,
+            scalars=False, mappings=bool(columns),
+        )
+        items = [to_item(row) for row in page.rows]
+        next_cursor = page.next_cursor
+    else:
+        # Iki kaynak ayni (lesson_date, id) sirasiyla birlesir; sayfa icin gercek
+        # derslerin ilk skip+limit satiri yeter
+        real = await paginate(
+            db, query, keyset, limit=start + limit, cursor=cursor,
+            scalars=False, mappings=bool(columns),
+        )
+        merged = sorted([to_item(row) for row in real.rows] + virtual, key=sort_key, reverse=True)
+        items = merged[start:start + limit]
+        has_more = len(merged) > start + limit or real.next_cursor is not None
+        next_cursor = keyset.encode(*sort_key(items[-1])) if has_more and items else None
+
+    if columns:
+        return projected_response(items, columns, total, next_cursor)
+    return LessonListResponse(items=items, total=total, next_cursor=next_cursor)
 
 
 @router.post("/", response_model=LessonResponse)
 async def create_lesson(
     data: LessonCreate,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     # MANAGER check: only own school
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if data.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu okul için ders oluşturamazsınız")
+    if not school_scope(current_user).allows(data.school_id):
+        raise HTTPException(status_code=403, detail="Bu okul için ders oluşturamazsınız")
 
     lt = LessonType(data.lesson_type)
     duration = data.duration_hours if data.duration_hours is not None else LESSON_DURATION[lt]
@@ -127,59 +186,87 @@ async def create_lesson(
 @router.get("/{lesson_id}", response_model=LessonResponse)
 async def get_lesson(
     lesson_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(Lesson)
-        .options(selectinload(Lesson.school), selectinload(Lesson.attendances))
+        select(Lesson, lesson_attendance_count())
+        .options(*load_plan("lesson_list"))
         .where(Lesson.id == lesson_id)
     )
-    lesson = result.scalar_one_or_none()
+    row = result.first()
+    if row:
+        return _lesson_to_response(*row)
+
+    # Sanal program dersi: henuz Lesson satiri yok
+    occurrence = await resolve_occurrence(db, lesson_id)
+    if occurrence:
+        schedule, lesson_date = occurrence
+        virtual = await virtual_occurrences(
+            db, schedule_id=schedule.id, date_from=lesson_date, date_to=lesson_date
+        )
+        if virtual:
+            return virtual[0]
+    raise HTTPException(status_code=404, detail="Ders bulunamadı")
+
+
+@router.put("/{lesson_id}", response_model=LessonResponse)
+async def update_lesson(
+    lesson_id: str,
+    data: LessonUpdate,
+    current_user: Principal = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(get_db),
+):
+    """Dersi gunceller; sanal bir program dersi ilk duzenlemede olusturulur."""
+    lesson = await get_or_materialize_lesson(db, lesson_id, current_user.id)
     if not lesson:
         raise HTTPException(status_code=404, detail="Ders bulunamadı")
 
-    return LessonResponse(
-        id=str(lesson.id),
-        school_id=str(lesson.school_id),
-        branch=lesson.branch,
-        lesson_type=lesson.lesson_type,
-        lesson_date=lesson.lesson_date,
-        duration_hours=float(lesson.duration_hours),
-        created_by=str(lesson.created_by),
-        notes=lesson.notes,
-        created_at=lesson.created_at,
-        school_name=lesson.school.name if lesson.school else None,
-        attendance_count=len(lesson.attendances) if lesson.attendances else 0,
+    if not school_scope(current_user).allows(lesson.school_id):
+        raise HTTPException(status_code=403, detail="Bu ders sizin okulunuzda değil")
+
+    if data.lesson_type is not None:
+        try:
+            LessonType(data.lesson_type)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Geçersiz ders türü")
+        lesson.lesson_type = data.lesson_type
+    if data.branch is not None and data.branch != lesson.branch:
+        has_attendance = (
+            await db.execute(select(Attendance.id).where(Attendance.lesson_id == lesson.id).limit(1))
+        ).first()
+        if has_attendance:
+            raise HTTPException(status_code=400, detail="Yoklaması alınmış dersin branşı değiştirilemez")
+        lesson.branch = data.branch
+    if data.lesson_date is not None:
+        lesson.lesson_date = data.lesson_date
+    if data.notes is not None:
+        lesson.notes = data.notes
+
+    await db.commit()
+
+    result = await db.execute(
+        select(Lesson, lesson_attendance_count())
+        .options(*load_plan("lesson_list"))
+        .where(Lesson.id == lesson.id)
+        .execution_options(populate_existing=True)
     )
+    return _lesson_to_response(*result.one())
 
 
 @router.delete("/{lesson_id}")
 async def delete_lesson(
     lesson_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Lesson)
-        .options(selectinload(Lesson.attendances))
-        .where(Lesson.id == lesson_id)
-    )
+    result = await db.execute(select(Lesson).where(Lesson.id == lesson_id))
     lesson = result.scalar_one_or_none()
     if not lesson:
         raise HTTPException(status_code=404, detail="Ders bulunamadı")
 
-    # Yoklama saatlerini geri al: dersin yoklamalarına ait saatleri StudentProgress'ten düş
-    for att in (lesson.attendances or []):
-        progress_result = await db.execute(
-            select(StudentProgress).where(
-                StudentProgress.student_id == att.student_id,
-                StudentProgress.branch == lesson.branch,
-            )
-        )
-        progress = progress_result.scalar_one_or_none()
-        if progress:
-            update_progress_hours(progress, -float(att.hours_credited))
+    # Yoklama saatlerini geri al; yoklama satirlarini DB cascade siler
+    await revert_attendance_hours(db, lesson)
 
     await db.delete(lesson)
     await db.commit()
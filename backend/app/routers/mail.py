@@ -1,19 +1,22 @@
 import asyncio
 import json
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import false, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above
-from app.models.user import User, UserRole
-from app.models.student import Student, StudentProgress, Branch
-from app.models.school import SchoolManager
+from app.principal import Principal
+from app.load_plans import load_plan
+from app.models.user import UserRole, UserStatus
+from app.models.student_directory import StudentDirectory
 from app.models.email_log import EmailLog
 from app.models.audit_log import AuditAction
 from app.services.audit import create_audit_log
 from app.services.mail import send_email
+from app.services.school_scope import school_scope
+from app.services.student_directory import branch_column
+from app.services.pagination import Keyset, paginate
 from app.config import settings
 from app.schemas.mail import SendMailRequest, EmailLogResponse, EmailLogListResponse
 
@@ -23,43 +26,34 @@ router = APIRouter()
 @router.post("/send")
 async def send_mail(
     data: SendMailRequest,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    # Build student query based on filters
-    query = select(Student).options(
-        selectinload(Student.user),
-        selectinload(Student.progress),
-    ).join(Student.user).where(User.status == "ACTIVE")
+    # Alicilar student_directory'den tek sorguda secilir
+    query = select(StudentDirectory.email).where(
+        StudentDirectory.user_status == UserStatus.ACTIVE.value
+    )
 
     # MANAGER: restrict to own school
     if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(Student.school_id.in_(school_ids_q))
+        query = school_scope(current_user).apply(query, StudentDirectory.school_id)
     elif data.school_ids:
-        query = query.where(Student.school_id.in_(data.school_ids))
-
-    result = await db.execute(query)
-    students = result.scalars().unique().all()
+        query = query.where(StudentDirectory.school_id.in_(data.school_ids))
 
     # Filter by branch and grade if specified
-    filtered_emails = []
-    for student in students:
-        if data.branch:
-            progress = next(
-                (p for p in student.progress if p.branch == data.branch), None
-            )
-            if not progress:
-                continue
-            if data.grade_min is not None and progress.current_grade < data.grade_min:
-                continue
-            if data.grade_max is not None and progress.current_grade > data.grade_max:
-                continue
+    if data.branch:
+        grade = branch_column(data.branch, "grade")
+        if grade is None:
+            query = query.where(false())
+        else:
+            query = query.where(grade.is_not(None))
+            if data.grade_min is not None:
+                query = query.where(grade >= data.grade_min)
+            if data.grade_max is not None:
+                query = query.where(grade <= data.grade_max)
 
-        if student.user and student.user.email:
-            filtered_emails.append(student.user.email)
+    result = await db.execute(query)
+    filtered_emails = [email for email in result.scalars().all() if email]
 
     filters_applied = json.dumps({
         "school_ids": data.school_ids,
@@ -121,23 +115,28 @@ async def send_mail(
 async def list_email_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(require_manager_or_above),
+    cursor: str | None = None,
+    include_total: bool = True,
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(EmailLog).options(selectinload(EmailLog.sender))
+    query = select(EmailLog).options(*load_plan("email_log_list"))
     count_query = select(func.count(EmailLog.id))
 
     if current_user.role == UserRole.MANAGER.value:
         query = query.where(EmailLog.sent_by == current_user.id)
         count_query = count_query.where(EmailLog.sent_by == current_user.id)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(EmailLog.created_at.desc()).offset(skip).limit(limit)
+    page = await paginate(
+        db,
+        query,
+        Keyset(EmailLog.created_at, EmailLog.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
     )
-    logs = result.scalars().all()
+    logs = page.rows
 
     return EmailLogListResponse(
         items=[
@@ -153,5 +152,6 @@ async def list_email_logs(
             )
             for l in logs
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
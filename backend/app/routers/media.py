@@ -8,8 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.auth import get_current_user
+from app.principal import Principal
 from app.config import settings
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.models.media import Media, MediaType
 from app.permissions import Permission, user_has_permission
 
@@ -24,7 +25,7 @@ async def upload_media(
     file: UploadFile = File(...),
     title: str | None = None,
     school_id: str | None = None,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     # Check permission
@@ -94,7 +95,7 @@ class YouTubeImportRequest(BaseModel):
 @router.post("/youtube")
 async def import_youtube(
     data: YouTubeImportRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """YouTube video linki ekle (dosya yuklemeden)."""
@@ -140,7 +141,7 @@ async def import_youtube(
 async def list_media(
     school_id: str | None = Query(None),
     media_type: str | None = Query(None),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     query = select(Media).order_by(Media.created_at.desc())
@@ -170,7 +171,7 @@ async def list_media(
 @router.delete("/{media_id}")
 async def delete_media(
     media_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Media).where(Media.id == media_id))
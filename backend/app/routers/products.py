@@ -4,8 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.auth import get_current_user, require_manage_products
-from app.models.user import User
+from app.principal import Principal
+from app.load_plans import load_plan
 from app.models.product import Product, ProductCategory
+from app.services.pagination import Keyset, paginate
 from app.schemas.product import (
     ProductCategoryCreate, ProductCategoryResponse,
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
@@ -18,7 +20,7 @@ router = APIRouter()
 
 @router.get("/categories", response_model=list[ProductCategoryResponse])
 async def list_categories(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(ProductCategory).order_by(ProductCategory.name))
@@ -37,7 +39,7 @@ async def list_categories(
 @router.post("/categories", response_model=ProductCategoryResponse)
 async def create_category(
     data: ProductCategoryCreate,
-    current_user: User = Depends(require_manage_products),
+    current_user: Principal = Depends(require_manage_products),
     db: AsyncSession = Depends(get_db),
 ):
     cat = ProductCategory(name=data.name, description=data.description)
@@ -61,10 +63,12 @@ async def list_products(
     is_active: bool | None = True,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    include_total: bool = True,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Product)
+    query = select(Product).options(*load_plan("product_list"))
     count_query = select(func.count(Product.id))
 
     if category_id:
@@ -77,13 +81,16 @@ async def list_products(
         query = query.where(Product.is_active == is_active)
         count_query = count_query.where(Product.is_active == is_active)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(Product.created_at.desc()).offset(skip).limit(limit)
+    page = await paginate(
+        db,
+        query,
+        Keyset(Product.created_at, Product.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
     )
-    products = result.scalars().all()
+    products = page.rows
 
     return ProductListResponse(
         items=[
@@ -101,14 +108,15 @@ async def list_products(
             )
             for p in products
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
 
 
 @router.post("/", response_model=ProductResponse)
 async def create_product(
     data: ProductCreate,
-    current_user: User = Depends(require_manage_products),
+    current_user: Principal = Depends(require_manage_products),
     db: AsyncSession = Depends(get_db),
 ):
     product = Product(
@@ -140,7 +148,7 @@ async def create_product(
 async def update_product(
     product_id: str,
     data: ProductUpdate,
-    current_user: User = Depends(require_manage_products),
+    current_user: Principal = Depends(require_manage_products),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -171,7 +179,7 @@ async def update_product(
 @router.delete("/{product_id}")
 async def delete_product(
     product_id: str,
-    current_user: User = Depends(require_manage_products),
+    current_user: Principal = Depends(require_manage_products),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, require_manager_or_above
-from app.models.user import User, UserRole
+from app.principal import Principal
+from app.load_plans import load_plan
+from app.models.user import UserRole
 from app.models.student import Student
-from app.models.school import SchoolManager
 from app.models.request import Request, RequestType, RequestStatus
 from app.models.product import Product
 from app.models.audit_log import AuditAction
 from app.services.audit import create_audit_log
+from app.services.school_scope import school_scope
+from app.services.pagination import Keyset, paginate
 from app.utils import utcnow_naive
 from app.schemas.request import (
     RequestCreate, RequestHandleAction, RequestResponse, RequestListResponse,
@@ -27,21 +29,17 @@ async def list_requests(
     school_id: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    include_total: bool = True,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Request).options(
-        selectinload(Request.student).selectinload(Student.user),
-        selectinload(Request.product),
-    )
+    query = select(Request).options(*load_plan("request_list"))
     count_query = select(func.count(Request.id))
 
     # MANAGER: only own school
     if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        student_ids_q = select(Student.id).where(Student.school_id.in_(school_ids_q))
+        student_ids_q = select(Student.id).where(school_scope(current_user).filter(Student.school_id))
         query = query.where(Request.student_id.in_(student_ids_q))
         count_query = count_query.where(Request.student_id.in_(student_ids_q))
     # USER: own requests only
@@ -61,13 +59,16 @@ async def list_requests(
         query = query.where(Request.student_id.in_(student_ids_q2))
         count_query = count_query.where(Request.student_id.in_(student_ids_q2))
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(Request.created_at.desc()).offset(skip).limit(limit)
+    page = await paginate(
+        db,
+        query,
+        Keyset(Request.created_at, Request.id),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
     )
-    requests = result.scalars().unique().all()
+    requests = page.rows
 
     return RequestListResponse(
         items=[
@@ -89,14 +90,15 @@ async def list_requests(
             )
             for r in requests
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
 
 
 @router.post("/", response_model=RequestResponse)
 async def create_request(
     data: RequestCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     student_result = await db.execute(
@@ -139,7 +141,7 @@ async def create_request(
 async def handle_request(
     request_id: str,
     data: RequestHandleAction,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
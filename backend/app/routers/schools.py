@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.auth import get_current_user, get_current_user_optional, require_manage_schools, require_manager_or_above
+from app.principal import Principal, clear_principal_cache, invalidate_principal
+from app.load_plans import load_plan
 from app.models.user import User, UserRole
 from app.models.school import School, SchoolManager
 from app.models.student import Student
@@ -21,11 +22,19 @@ from app.schemas.school import (
     LessonInfo,
     AssignManagerRequest,
 )
+from app.services.event_registration import release_student_registrations
+from app.services.projection import column_fields, parse_fields, project, projected_response
 from app.services.school_gallery import get_school_gallery_map
+from app.services.school_scope import school_scope
+from app.services.student_directory import refresh_student_directory, students_of_school
 
 router = APIRouter()
 
 
+# fields= ile secilebilen alanlar (bkz. app/services/projection.py)
+SCHOOL_FIELDS = column_fields(School, SchoolResponse)
+
+
 def _to_school_response(school: School, media: list[SchoolMediaItem] | None = None) -> SchoolResponse:
     return SchoolResponse(
         id=str(school.id),
@@ -45,7 +54,7 @@ def _to_school_response(school: School, media: list[SchoolMediaItem] | None = No
 
 @router.get("/my-school", response_model=SchoolDetailResponse)
 async def get_my_school(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Ogrencinin kayitli oldugu okul bilgilerini getirir."""
@@ -60,7 +69,7 @@ async def get_my_school(
     # Get the school with managers (selectinload ile N+1 önlendi)
     school_result = await db.execute(
         select(School)
-        .options(selectinload(School.managers).selectinload(SchoolManager.manager))
+        .options(*load_plan("school_instructors"))
         .where(School.id == student.school_id)
     )
     school = school_result.scalar_one_or_none()
@@ -139,19 +148,18 @@ async def list_schools(
     is_active: bool | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User | None = Depends(get_current_user_optional),
+    fields: str | None = None,
+    current_user: Principal | None = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db),
 ):
+    columns = parse_fields(fields, SCHOOL_FIELDS)
     query = select(School)
     count_query = select(func.count(School.id))
 
     # MANAGER only sees their own school
-    if current_user and current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(School.id.in_(school_ids_q))
-        count_query = count_query.where(School.id.in_(school_ids_q))
+    scope = school_scope(current_user)
+    query = scope.apply(query, School.id)
+    count_query = scope.apply(count_query, School.id)
 
     if is_active is not None:
         query = query.where(School.is_active == is_active)
@@ -163,6 +171,12 @@ async def list_schools(
     total_result = await db.execute(count_query)
     total = total_result.scalar()
 
+    if columns:
+        result = await db.execute(
+            project(query, columns).order_by(School.created_at.desc()).offset(skip).limit(limit)
+        )
+        return projected_response(result.mappings().all(), columns, total)
+
     result = await db.execute(
         query.order_by(School.created_at.desc()).offset(skip).limit(limit)
     )
@@ -177,7 +191,7 @@ async def list_schools(
 
 @router.get("/managers/available")
 async def list_available_managers(
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     """Egitmen atama modalinin kullandigi hafif liste — tam /api/users/ erisimi
@@ -194,7 +208,7 @@ async def list_available_managers(
 @router.post("/", response_model=SchoolResponse)
 async def create_school(
     data: SchoolCreate,
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     school = School(
@@ -217,7 +231,7 @@ async def create_school(
 @router.get("/{school_id}", response_model=SchoolResponse)
 async def get_school(
     school_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(School).where(School.id == school_id))
@@ -233,7 +247,7 @@ async def get_school(
 async def update_school(
     school_id: str,
     data: SchoolUpdate,
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(School).where(School.id == school_id))
@@ -241,9 +255,12 @@ async def update_school(
     if not school:
         raise HTTPException(status_code=404, detail="Okul bulunamadı")
 
-    for field, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(school, field, value)
 
+    if "name" in changes:
+        await refresh_student_directory(db, students_of_school(school.id))
     await db.commit()
     await db.refresh(school)
 
@@ -254,7 +271,7 @@ async def update_school(
 @router.delete("/{school_id}")
 async def delete_school(
     school_id: str,
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(School).where(School.id == school_id))
@@ -262,8 +279,11 @@ async def delete_school(
     if not school:
         raise HTTPException(status_code=404, detail="Okul bulunamadı")
 
+    await release_student_registrations(db, students_of_school(school.id))
     await db.delete(school)
     await db.commit()
+    # Okulun egitmenleri ve ogrencileri etkilenir; hepsini tek tek bulmak yerine onbellegi bosalt
+    clear_principal_cache()
     return {"message": "Okul silindi"}
 
 
@@ -271,7 +291,7 @@ async def delete_school(
 async def assign_manager(
     school_id: str,
     data: AssignManagerRequest,
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     # Check school exists
@@ -300,6 +320,7 @@ async def assign_manager(
     sm = SchoolManager(school_id=school_id, user_id=data.user_id)
     db.add(sm)
     await db.commit()
+    invalidate_principal(data.user_id)
     return {"message": "Eğitmen okula atandı"}
 
 
@@ -307,7 +328,7 @@ async def assign_manager(
 async def remove_manager(
     school_id: str,
     user_id: str,
-    current_user: User = Depends(require_manage_schools),
+    current_user: Principal = Depends(require_manage_schools),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -322,4 +343,5 @@ async def remove_manager(
 
     await db.delete(sm)
     await db.commit()
+    invalidate_principal(user_id)
     return {"message": "Eğitmen okuldan çıkarıldı"}
@@ -2,22 +2,25 @@ import os
 import uuid as uuid_mod
 import aiofiles
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.auth import get_current_user, require_manager_or_above, require_manage_users
+from app.auth import get_current_user, get_current_user_record, require_manager_or_above, require_manage_users
+from app.principal import Principal, invalidate_principal
 from app.config import settings
+from app.load_plans import load_plan
+from app.models.school import School
 from app.models.user import User, UserRole, UserStatus
 from app.models.student import Student, StudentProgress, Branch
-from app.models.school import SchoolManager
+from app.models.student_directory import StudentDirectory
 from app.models.audit_log import AuditAction
 from app.services.audit import create_audit_log
 from app.schemas.student import (
     StudentResponse,
-    StudentProgressResponse,
     StudentListResponse,
     ApproveStudentRequest,
     StudentProfileResponse,
@@ -26,48 +29,32 @@ from app.schemas.student import (
     StudentApplyRequest,
     StudentCreate,
     StudentUpdate,
+    StudentImportResponse,
 )
 from app.services.grade_hours import get_hours_for_grade, check_exam_eligibility
+from app.services.pagination import Keyset, paginate
+from app.services.projection import column_fields, parse_fields, project, projected_response
+from app.services.school_scope import school_scope
+from app.services.student_directory import (
+    directory_to_response,
+    get_directory_response,
+    refresh_student_directory,
+    students_of_user,
+)
+from app.services.student_export import EXPORT_FORMATS, stream_student_export
+from app.services.student_import import import_format, import_students, parse_import
+from app.services.user_search import apply_user_search
+from app.utils import utcnow_naive
 
 router = APIRouter()
 
 ALLOWED_AVATAR_TYPES = {"image/jpeg", "image/png", "image/webp"}
 
 
-def _student_to_response(student: Student) -> StudentResponse:
-    return StudentResponse(
-        id=str(student.id),
-        user_id=str(student.user_id),
-        school_id=str(student.school_id),
-        date_of_birth=student.date_of_birth,
-        emergency_contact=student.emergency_contact,
-        emergency_phone=student.emergency_phone,
-        notes=student.notes,
-        created_at=student.created_at,
-        user_name=student.user.full_name if student.user else None,
-        user_email=student.user.email if student.user else None,
-        school_name=student.school.name if student.school else None,
-        progress=[
-            StudentProgressResponse(
-                id=str(p.id),
-                branch=p.branch,
-                current_grade=p.current_grade,
-                completed_hours=float(p.completed_hours),
-                # DB degerine guyvenmek yerine her seferinde hesapla; bayat veri onlenir
-                remaining_hours=max(
-                    0.0,
-                    get_hours_for_grade(p.current_grade)["required"] - float(p.completed_hours),
-                ),
-            )
-            for p in (student.progress or [])
-        ],
-    )
-
-
 @router.post("/my-profile/avatar")
 async def upload_avatar(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
     if current_user.role == UserRole.MEMBER.value:
@@ -101,16 +88,12 @@ async def upload_avatar(
 
 @router.get("/my-profile", response_model=StudentProfileResponse)
 async def get_my_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
         select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
+        .options(*load_plan("student_detail"))
         .where(Student.user_id == current_user.id)
     )
     student = result.scalar_one_or_none()
@@ -120,10 +103,10 @@ async def get_my_profile(
     progress_details = []
     for p in (student.progress or []):
         grade = p.current_grade
-        hours = get_hours_for_grade(grade)
+        hours = get_hours_for_grade(grade, p.branch)
         completed = float(p.completed_hours)
         remaining = max(0, hours["required"] - completed)
-        eligibility = check_exam_eligibility(grade, completed)
+        eligibility = check_exam_eligibility(grade, completed, p.branch)
         progress_details.append(BranchProgressDetail(
             branch=p.branch,
             current_grade=grade,
@@ -150,7 +133,7 @@ async def get_my_profile(
 @router.put("/my-profile")
 async def update_my_profile(
     data: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
     if data.first_name is not None:
@@ -160,6 +143,7 @@ async def update_my_profile(
     if data.phone is not None:
         current_user.phone = data.phone.strip() or None
 
+    await refresh_student_directory(db, students_of_user(current_user.id))
     await db.commit()
     return {
         "first_name": current_user.first_name,
@@ -171,7 +155,7 @@ async def update_my_profile(
 @router.post("/apply", response_model=StudentResponse)
 async def apply_to_school(
     data: StudentApplyRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -180,8 +164,6 @@ async def apply_to_school(
     - School_id gecersizse 404 doner.
     - Basvuru sonrasi kullanici statusu PENDING olur; manager onayi bekler.
     """
-    from app.models.school import School
-
     existing_student = await db.execute(
         select(Student).where(Student.user_id == current_user.id)
     )
@@ -218,26 +200,17 @@ async def apply_to_school(
         details=f"Okul basvurusu yapildi: school_id={data.school_id}",
     )
 
+    await refresh_student_directory(db, students_of_user(current_user.id))
     await db.commit()
-    await db.refresh(student)
+    invalidate_principal(current_user.id)
 
-    result = await db.execute(
-        select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
-        .where(Student.id == student.id)
-    )
-    student = result.scalar_one()
-    return _student_to_response(student)
+    return await get_directory_response(db, student.id)
 
 
 @router.post("/", response_model=StudentResponse)
 async def create_student(
     data: StudentCreate,
-    current_user: User = Depends(require_manage_users),
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -246,8 +219,6 @@ async def create_student(
     atamasi. Kullanicinin kendi basvurusuna (POST /apply) ya da enrollment
     onayina gerek kalmadan tek adimda tamamlanir.
     """
-    from app.models.school import School
-
     user_result = await db.execute(select(User).where(User.id == data.user_id))
     user = user_result.scalar_one_or_none()
     if not user:
@@ -278,7 +249,7 @@ async def create_student(
     await db.flush()
 
     for branch in Branch:
-        initial_hours = get_hours_for_grade(1)
+        initial_hours = get_hours_for_grade(1, branch.value)
         db.add(StudentProgress(
             student_id=student.id,
             branch=branch.value,
@@ -301,19 +272,52 @@ async def create_student(
         details=f"Ogrenci admin tarafindan olusturuldu: {user.full_name}, okul_id={data.school_id}",
     )
 
+    await refresh_student_directory(db, [student.id])
     await db.commit()
+    invalidate_principal(user.id)
+
+    return await get_directory_response(db, student.id)
 
-    result = await db.execute(
-        select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
-        .where(Student.id == student.id)
-    )
-    student = result.scalar_one()
-    return _student_to_response(student)
+
+# fields= ile secilebilen alanlar (bkz. app/services/projection.py)
+STUDENT_FIELDS = {
+    "id": StudentDirectory.student_id,
+    **column_fields(StudentDirectory, StudentResponse),
+    "user_name": StudentDirectory.first_name + " " + StudentDirectory.last_name,
+    "user_email": StudentDirectory.email,
+}
+
+
+def _directory_query(
+    current_user: Principal,
+    db: AsyncSession,
+    school_id: str | None,
+    search: str | None,
+):
+    """list_students ve export icin ortak filtreler: (sorgu, sayim sorgusu, alaka siralamasi)."""
+    query = select(StudentDirectory)
+    count_query = select(func.count()).select_from(StudentDirectory)
+
+    if current_user.role == UserRole.MANAGER.value:
+        scope = school_scope(current_user)
+        query = scope.apply(query, StudentDirectory.school_id)
+        count_query = scope.apply(count_query, StudentDirectory.school_id)
+    elif current_user.role == UserRole.USER.value:
+        query = query.where(StudentDirectory.user_id == current_user.id)
+        count_query = count_query.where(StudentDirectory.user_id == current_user.id)
+
+    if school_id:
+        query = query.where(StudentDirectory.school_id == school_id)
+        count_query = count_query.where(StudentDirectory.school_id == school_id)
+
+    rank = None
+    if search:
+        dialect = db.get_bind().dialect.name
+        on_user = User.id == StudentDirectory.user_id
+        query, rank = apply_user_search(query.join(User, on_user), search, dialect)
+        count_query, _ = apply_user_search(count_query.join(User, on_user), search, dialect)
+
+    return query, count_query, rank
 
 
 @router.get("/", response_model=StudentListResponse)
@@ -323,107 +327,133 @@ async def list_students(
     branch: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: str | None = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Student).options(
-        selectinload(Student.user),
-        selectinload(Student.school),
-        selectinload(Student.progress),
-    )
-    count_query = select(func.count(Student.id))
+    query, count_query, rank = _directory_query(current_user, db, school_id, search)
+    keyset = Keyset(StudentDirectory.created_at, StudentDirectory.student_id)
+    columns = parse_fields(fields, STUDENT_FIELDS)
 
-    if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(Student.school_id.in_(school_ids_q))
-        count_query = count_query.where(Student.school_id.in_(school_ids_q))
-    elif current_user.role == UserRole.USER.value:
-        query = query.where(Student.user_id == current_user.id)
-        count_query = count_query.where(Student.user_id == current_user.id)
-
-    if school_id:
-        query = query.where(Student.school_id == school_id)
-        count_query = count_query.where(Student.school_id == school_id)
+    page = await paginate(
+        db,
+        project(query, columns, keyset) if columns else query,
+        keyset,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
+        mappings=bool(columns),
+        rank=rank,
+    )
+    if columns:
+        return projected_response(page.rows, columns, page.total, page.next_cursor)
 
-    if search:
-        query = query.join(Student.user).where(
-            User.first_name.ilike(f"%{search}%") | User.last_name.ilike(f"%{search}%")
-        )
+    return StudentListResponse(
+        items=[directory_to_response(row) for row in page.rows],
+        total=page.total,
+        next_cursor=page.next_cursor,
+    )
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
 
-    result = await db.execute(
-        query.order_by(Student.created_at.desc()).offset(skip).limit(limit)
+@router.get("/pending", response_model=StudentListResponse)
+async def list_pending_students(
+    current_user: Principal = Depends(require_manager_or_above),
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(StudentDirectory).where(
+        StudentDirectory.user_status == UserStatus.PENDING.value
     )
-    students = result.scalars().unique().all()
+    query = school_scope(current_user).apply(query, StudentDirectory.school_id)
+
+    result = await db.execute(query.order_by(StudentDirectory.created_at.desc()))
+    rows = result.scalars().all()
 
     return StudentListResponse(
-        items=[_student_to_response(s) for s in students],
-        total=total,
+        items=[directory_to_response(row) for row in rows],
+        total=len(rows),
     )
 
 
-@router.get("/pending", response_model=StudentListResponse)
-async def list_pending_students(
-    current_user: User = Depends(require_manager_or_above),
+@router.get("/export")
+async def export_students(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson|xlsx)$"),
+    school_id: str | None = None,
+    search: str | None = None,
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
-    query = (
-        select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
-        .join(Student.user)
-        .where(User.status == UserStatus.PENDING.value)
+    """list_students filtreleriyle tum ogrencileri dosya olarak akitir."""
+    query, _, rank = _directory_query(current_user, db, school_id, search)
+    order = (StudentDirectory.created_at.desc(), StudentDirectory.student_id.desc())
+    query = query.order_by(*((rank,) if rank is not None else ()), *order)
+
+    filename = f"ogrenciler-{utcnow_naive():%Y%m%d-%H%M}.{fmt}"
+    return StreamingResponse(
+        stream_student_export(db.bind, query, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
-    if current_user.role == UserRole.MANAGER.value:
-        school_ids_q = select(SchoolManager.school_id).where(
-            SchoolManager.user_id == current_user.id
-        )
-        query = query.where(Student.school_id.in_(school_ids_q))
 
-    result = await db.execute(query.order_by(Student.created_at.desc()))
-    students = result.scalars().unique().all()
+@router.post("/import", response_model=StudentImportResponse)
+async def import_students_file(
+    file: UploadFile = File(...),
+    school_id: str = Form(...),
+    default_password: str | None = Form(None),
+    dry_run: bool = Form(False),
+    current_user: Principal = Depends(require_manage_users),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    CSV/XLSX dosyasindaki her satir icin aktif bir kullanici ve school_id
+    okulunda ogrenci olusturur. Kolonlar: email, first_name, last_name
+    (zorunlu); phone, password, date_of_birth, emergency_contact,
+    emergency_phone, notes. password bos olan satirlar default_password'u
+    kullanir. Hatali satirlar atlanir ve raporda doner; dry_run ile sadece
+    dogrulama yapilir.
+    """
+    fmt = import_format(file.filename)
+    if default_password and len(default_password.encode()) > 72:
+        raise HTTPException(status_code=400, detail="Şifre 72 bayttan uzun olamaz")
+    if not school_scope(current_user).allows(school_id):
+        raise HTTPException(status_code=403, detail="Bu okula öğrenci ekleyemezsiniz")
+    school_result = await db.execute(select(School.id).where(School.id == school_id))
+    if school_result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Okul bulunamadi")
 
-    return StudentListResponse(
-        items=[_student_to_response(s) for s in students],
-        total=len(students),
+    # Dosya okuma/dogrulama senkron; event loop'u bekletmemek icin thread'de
+    parsed = await run_in_threadpool(parse_import, file.file, fmt)
+    return await import_students(
+        db,
+        parsed,
+        school_id=school_id,
+        performed_by=current_user.id,
+        default_password=default_password or None,
+        dry_run=dry_run,
     )
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
-        .where(Student.id == student_id)
-    )
-    student = result.scalar_one_or_none()
+    student = await get_directory_response(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Ogrenci bulunamadi")
 
-    return _student_to_response(student)
+    return student
 
 
 @router.put("/{student_id}", response_model=StudentResponse)
 async def update_student(
     student_id: str,
     data: StudentUpdate,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -432,19 +462,14 @@ async def update_student(
     MANAGER yalnizca kendi okulundaki ogrencileri, okul alani haric duzenleyebilir.
     """
     result = await db.execute(
-        select(Student).options(selectinload(Student.user)).where(Student.id == student_id)
+        select(Student).options(*load_plan("student_user")).where(Student.id == student_id)
     )
     student = result.scalar_one_or_none()
     if not student:
         raise HTTPException(status_code=404, detail="Ogrenci bulunamadi")
 
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if student.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
+    if not school_scope(current_user).allows(student.school_id):
+        raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
 
     old_school_id = student.school_id
     changed_fields = []
@@ -453,8 +478,6 @@ async def update_student(
         if current_user.role not in (UserRole.ADMIN.value, UserRole.SUPER_ADMIN.value):
             raise HTTPException(status_code=403, detail="Okul ataması yalnızca admin tarafından yapılabilir")
 
-        from app.models.school import School
-
         school_result = await db.execute(
             select(School).where(School.id == data.school_id)
         )
@@ -489,30 +512,21 @@ async def update_student(
             new_value=str(student.school_id) if "school_id" in changed_fields else None,
         )
 
+    await refresh_student_directory(db, [student.id])
     await db.commit()
 
-    result = await db.execute(
-        select(Student)
-        .options(
-            selectinload(Student.user),
-            selectinload(Student.school),
-            selectinload(Student.progress),
-        )
-        .where(Student.id == student.id)
-    )
-    student = result.scalar_one()
-    return _student_to_response(student)
+    return await get_directory_response(db, student.id)
 
 
 @router.post("/{student_id}/approve")
 async def approve_student(
     student_id: str,
     data: ApproveStudentRequest,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(Student).options(selectinload(Student.user)).where(Student.id == student_id)
+        select(Student).options(*load_plan("student_user")).where(Student.id == student_id)
     )
     student = result.scalar_one_or_none()
     if not student:
@@ -521,13 +535,8 @@ async def approve_student(
     if student.user.status != UserStatus.PENDING.value:
         raise HTTPException(status_code=400, detail="Bu ogrenci zaten islenmis")
 
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if student.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
+    if not school_scope(current_user).allows(student.school_id):
+        raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
 
     if data.approved:
         student.user.status = UserStatus.ACTIVE.value
@@ -540,7 +549,7 @@ async def approve_student(
                 )
             )
             if not existing.scalar_one_or_none():
-                initial_hours = get_hours_for_grade(1)
+                initial_hours = get_hours_for_grade(1, branch.value)
                 progress = StudentProgress(
                     student_id=student.id,
                     branch=branch.value,
@@ -569,13 +578,15 @@ async def approve_student(
             details=f"Ogrenci reddedildi: {student.user.full_name}",
         )
 
+    await refresh_student_directory(db, [student.id])
     await db.commit()
+    invalidate_principal(student.user_id)
     return {"message": "Ogrenci onaylandi" if data.approved else "Ogrenci reddedildi"}
 
 @router.post("/{student_id}/suspend")
 async def suspend_student(
     student_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -584,7 +595,7 @@ async def suspend_student(
     MANAGER yalnizca kendi okul ogrencisini askiya alabilir.
     """
     result = await db.execute(
-        select(Student).options(selectinload(Student.user)).where(Student.id == student_id)
+        select(Student).options(*load_plan("student_user")).where(Student.id == student_id)
     )
     student = result.scalar_one_or_none()
     if not student:
@@ -596,13 +607,8 @@ async def suspend_student(
     if student.user.role == UserRole.MEMBER.value:
         raise HTTPException(status_code=400, detail="Ogrenci zaten askiya alinmis")
 
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if student.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
+    if not school_scope(current_user).allows(student.school_id):
+        raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
 
     student.user.role = UserRole.MEMBER.value
 
@@ -617,7 +623,9 @@ async def suspend_student(
         new_value=UserRole.MEMBER.value,
     )
 
+    await refresh_student_directory(db, [student.id])
     await db.commit()
+    invalidate_principal(student.user_id)
     return {
         "message": f"{student.user.full_name} askiya alindi. Giris yapabilir ama okul icerigi erisimi kaldirildi.",
         "student_id": student_id,
@@ -628,7 +636,7 @@ async def suspend_student(
 @router.post("/{student_id}/reactivate")
 async def reactivate_student(
     student_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -636,7 +644,7 @@ async def reactivate_student(
     MANAGER yalnizca kendi okul ogrencisini aktiflestirebilir.
     """
     result = await db.execute(
-        select(Student).options(selectinload(Student.user)).where(Student.id == student_id)
+        select(Student).options(*load_plan("student_user")).where(Student.id == student_id)
     )
     student = result.scalar_one_or_none()
     if not student:
@@ -648,13 +656,8 @@ async def reactivate_student(
     if student.user.status != UserStatus.ACTIVE.value:
         raise HTTPException(status_code=400, detail="Kullanici aktif degil, once aktifleştirin")
 
-    if current_user.role == UserRole.MANAGER.value:
-        manager_schools = await db.execute(
-            select(SchoolManager.school_id).where(SchoolManager.user_id == current_user.id)
-        )
-        school_ids = [row[0] for row in manager_schools.all()]
-        if student.school_id not in school_ids:
-            raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
+    if not school_scope(current_user).allows(student.school_id):
+        raise HTTPException(status_code=403, detail="Bu ogrenci sizin okulunuzda degil")
 
     student.user.role = UserRole.USER.value
 
@@ -669,7 +672,9 @@ async def reactivate_student(
         new_value=UserRole.USER.value,
     )
 
+    await refresh_student_directory(db, [student.id])
     await db.commit()
+    invalidate_principal(student.user_id)
     return {
         "message": f"{student.user.full_name} yeniden aktiflestirildi.",
         "student_id": student_id,
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.auth import get_current_user, require_manage_users, require_manager_or_above, get_password_hash
+from app.auth import get_current_user, require_manage_users, require_manager_or_above, hash_password
+from app.principal import Principal, invalidate_principal
+from app.load_plans import load_plan
 from app.models.user import User, UserRole, UserStatus, InstructorTitle
+from app.models.school import School
 from app.models.student import Student
+from app.services.event_registration import release_student_registrations
+from app.services.pagination import Keyset, paginate
+from app.services.projection import column_fields, parse_fields, project, projected_response
+from app.services.student_directory import refresh_student_directory, students_of_user
+from app.services.user_search import apply_user_search
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
 
 router = APIRouter()
@@ -36,11 +43,32 @@ def _user_to_response(user: User, student: Student | None = None) -> UserRespons
     )
 
 
+def _student_column(column):
+    return (
+        select(column)
+        .select_from(Student)
+        .outerjoin(School, School.id == Student.school_id)
+        .where(Student.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+
+# fields= ile secilebilen alanlar (bkz. app/services/projection.py); ogrenci
+# bilgileri ilisik alt sorgularla okunur
+USER_FIELDS = {
+    **column_fields(User, UserResponse),
+    "student_id": _student_column(Student.id),
+    "school_id": _student_column(Student.school_id),
+    "school_name": _student_column(School.name),
+}
+
+
 async def _load_students_by_user_id(db: AsyncSession, user_ids: list[str]) -> dict[str, Student]:
     if not user_ids:
         return {}
     result = await db.execute(
-        select(Student).options(selectinload(Student.school)).where(Student.user_id.in_(user_ids))
+        select(Student).options(*load_plan("user_student")).where(Student.user_id.in_(user_ids))
     )
     return {str(s.user_id): s for s in result.scalars().all()}
 
@@ -52,9 +80,13 @@ async def list_users(
     search: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(require_manage_users),
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: str | None = None,
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
+    columns = parse_fields(fields, USER_FIELDS)
     query = select(User)
     count_query = select(func.count(User.id))
 
@@ -64,23 +96,33 @@ async def list_users(
     if status:
         query = query.where(User.status == status)
         count_query = count_query.where(User.status == status)
+    rank = None
     if search:
-        search_filter = User.first_name.ilike(f"%{search}%") | User.last_name.ilike(f"%{search}%") | User.email.ilike(f"%{search}%")
-        query = query.where(search_filter)
-        count_query = count_query.where(search_filter)
-
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-
-    result = await db.execute(
-        query.order_by(User.created_at.desc()).offset(skip).limit(limit)
+        dialect = db.get_bind().dialect.name
+        query, rank = apply_user_search(query, search, dialect)
+        count_query, _ = apply_user_search(count_query, search, dialect)
+
+    keyset = Keyset(User.created_at, User.id)
+    page = await paginate(
+        db,
+        project(query, columns, keyset) if columns else query,
+        keyset,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        count_query=count_query if include_total else None,
+        mappings=bool(columns),
+        rank=rank,
     )
-    users = result.scalars().all()
+    if columns:
+        return projected_response(page.rows, columns, page.total, page.next_cursor)
+    users = page.rows
     students_by_user = await _load_students_by_user_id(db, [u.id for u in users])
 
     return UserListResponse(
         items=[_user_to_response(u, students_by_user.get(str(u.id))) for u in users],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -88,7 +130,7 @@ async def list_users(
 async def list_pending_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     """Tanitim sitesinden 'Kayit Ol' ile gelen, henuz onaylanmamis kullanicilar."""
@@ -112,7 +154,7 @@ async def list_pending_users(
 @router.post("/{user_id}/approve", response_model=UserResponse)
 async def approve_user(
     user_id: str,
-    current_user: User = Depends(require_manager_or_above),
+    current_user: Principal = Depends(require_manager_or_above),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -123,7 +165,9 @@ async def approve_user(
         raise HTTPException(status_code=400, detail="Kullanıcı onay bekleyen durumda değil")
 
     user.status = UserStatus.ACTIVE.value
+    await refresh_student_directory(db, students_of_user(user.id))
     await db.commit()
+    invalidate_principal(user.id)
     await db.refresh(user)
 
     return _user_to_response(user)
@@ -132,7 +176,7 @@ async def approve_user(
 @router.post("/", response_model=UserResponse)
 async def create_user(
     data: UserCreate,
-    current_user: User = Depends(require_manage_users),
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
     existing = await db.execute(select(User).where(User.email == data.email))
@@ -144,7 +188,7 @@ async def create_user(
 
     user = User(
         email=data.email,
-        password_hash=get_password_hash(data.password),
+        password_hash=await hash_password(data.password),
         first_name=data.first_name,
         last_name=data.last_name,
         phone=data.phone,
@@ -163,7 +207,7 @@ async def create_user(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    current_user: User = Depends(require_manage_users),
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -179,7 +223,7 @@ async def get_user(
 async def update_user(
     user_id: str,
     data: UserUpdate,
-    current_user: User = Depends(require_manage_users),
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -221,7 +265,9 @@ async def update_user(
     if data.extra_permissions is not None:
         user.extra_permissions = data.extra_permissions
 
+    await refresh_student_directory(db, students_of_user(user.id))
     await db.commit()
+    invalidate_principal(user.id)
     await db.refresh(user)
 
     return _user_to_response(user)
@@ -230,7 +276,7 @@ async def update_user(
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: str,
-    current_user: User = Depends(require_manage_users),
+    current_user: Principal = Depends(require_manage_users),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(User).where(User.id == user_id))
@@ -241,6 +287,9 @@ async def delete_user(
     if current_user.role == UserRole.MANAGER.value and user.role in (UserRole.ADMIN.value, UserRole.SUPER_ADMIN.value):
         raise HTTPException(status_code=403, detail="Bu kullaniciyi silemezsiniz")
 
+    await release_student_registrations(db, students_of_user(user_id))
     await db.delete(user)
+    await refresh_student_directory(db, students_of_user(user_id))
     await db.commit()
+    invalidate_principal(user_id)
     return {"message": "Kullanıcı silindi"}
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -7,6 +9,10 @@ class AttendanceCreate(BaseModel):
     student_ids: list[str]
 
 
+class AttendanceRosterReplace(BaseModel):
+    student_ids: list[str]
+
+
 class AttendanceResponse(BaseModel):
     id: str
     lesson_id: str
@@ -21,3 +27,31 @@ class AttendanceResponse(BaseModel):
 class AttendanceListResponse(BaseModel):
     items: list[AttendanceResponse]
     total: int
+
+
+class AttendanceRosterResponse(BaseModel):
+    added: list[AttendanceResponse]
+    removed_student_ids: list[str]
+    unchanged: int
+
+
+class AttendanceSyncOperationIn(BaseModel):
+    op_id: str = Field(min_length=1, max_length=64)
+    operation: Literal["ADD", "REMOVE"]
+    lesson_id: str
+    student_id: str
+
+
+class AttendanceSyncRequest(BaseModel):
+    operations: list[AttendanceSyncOperationIn] = Field(max_length=2000)
+
+
+class AttendanceSyncResult(BaseModel):
+    op_id: str
+    status: str
+    detail: str | None = None
+
+
+class AttendanceSyncResponse(BaseModel):
+    results: list[AttendanceSyncResult]
+    applied: int
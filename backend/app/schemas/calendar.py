@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class CalendarItem(BaseModel):
+    kind: str  # LESSON | EVENT
+    id: str
+    title: str
+    start: datetime
+    end: datetime | None = None
+    school_id: str | None = None
+    school_name: str | None = None
+    branch: str | None = None
+    lesson_type: str | None = None
+    event_type: str | None = None
+    schedule_id: str | None = None
+    is_virtual: bool = False
@@ -24,4 +24,5 @@ class EnrollmentResponse(BaseModel):
 
 class EnrollmentListResponse(BaseModel):
     items: list[EnrollmentResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
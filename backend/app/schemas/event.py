@@ -46,7 +46,8 @@ class EventResponse(BaseModel):
     is_completed: bool
     created_by: str
     created_at: datetime
-    registration_count: int = 0
+    registration_count: int = 0  # CONFIRMED kayitlar
+    waitlist_count: int = 0
     selected_school_ids: list[str] = []
 
     model_config = {"from_attributes": True}
@@ -54,7 +55,8 @@ class EventResponse(BaseModel):
 
 class EventListResponse(BaseModel):
     items: list[EventResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
 
 
 class EventRegistrationCreate(BaseModel):
@@ -76,6 +78,7 @@ class EventRegistrationResponse(BaseModel):
     exam_branch_escrima: bool
     needs_manager_approval: bool = False
     manager_approved: bool = False
+    status: str = "CONFIRMED"  # CONFIRMED, WAITLISTED
     created_at: datetime
     student_name: str | None = None
 
@@ -86,13 +89,51 @@ class ExamEligibilityResponse(BaseModel):
     wt_eligibility: str = "NOT_ELIGIBLE"  # ELIGIBLE, NEEDS_APPROVAL, NOT_ELIGIBLE
     escrima_eligibility: str = "NOT_ELIGIBLE"
     wt_completed_hours: float = 0
-    wt_required_hours: int = 0
-    wt_minimum_hours: int = 0
+    wt_required_hours: float = 0
+    wt_minimum_hours: float = 0
     escrima_completed_hours: float = 0
-    escrima_required_hours: int = 0
-    escrima_minimum_hours: int = 0
+    escrima_required_hours: float = 0
+    escrima_minimum_hours: float = 0
 
 
+class EligibilityReportStudent(BaseModel):
+    student_id: str
+    first_name: str
+    last_name: str
+    school_id: str
+    school_name: str | None = None
+    grade: int
+    completed_hours: float
+    required_hours: float
+
+
+class EligibilityReportBranch(BaseModel):
+    counts: dict[str, int]  # ELIGIBLE, NEEDS_APPROVAL, NOT_ELIGIBLE
+    groups: dict[str, list[EligibilityReportStudent]]
+
+
+class EligibilityReportResponse(BaseModel):
+    event_id: str
+    total_students: int
+    branches: dict[str, EligibilityReportBranch]  # WING_TSUN, ESCRIMA
+
 class SeminarEvaluateRequest(BaseModel):
     passed_student_ids: list[str]
     failed_student_ids: list[str] = []
+
+
+class SeminarEvaluationResult(BaseModel):
+    student_id: str
+    branch: str
+    passed: bool
+    grade_before: int
+    grade_after: int
+
+
+class SeminarEvaluateResponse(BaseModel):
+    message: str
+    passed: int  # gecilen brans sinavi sayisi
+    failed: int
+    results: list[SeminarEvaluationResult] = []
+    # Sinav kaydi (ya da gecti ise ilerleme kaydi) olmadigi icin degerlendirilmeyenler
+    skipped_student_ids: list[str] = []
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -19,6 +21,8 @@ class GradeRequirementResponse(BaseModel):
     grade: int
     grade_name: str
     required_hours: float
+    # Gereken saat degistiyse kalan saatleri yeniden hesaplayan arka plan isi
+    recompute_job_id: str | None = None
 
     model_config = {"from_attributes": True}
 
@@ -28,3 +32,40 @@ class ManualGradeChangeRequest(BaseModel):
     branch: str
     new_grade: int
     note: str
+
+
+class HoursDiscrepancy(BaseModel):
+    progress_id: str
+    student_id: str
+    branch: str
+    current_grade: int
+    recorded_completed_hours: float
+    expected_completed_hours: float
+    recorded_remaining_hours: float
+    expected_remaining_hours: float
+
+
+class HoursReconciliationResponse(BaseModel):
+    run_id: str
+    since: datetime | None = None
+    fix: bool
+    checked: int
+    mismatched: int
+    fixed: int
+    discrepancies: list[HoursDiscrepancy]
+    truncated: bool = False
+
+
+class HoursRecomputeJobResponse(BaseModel):
+    id: str
+    branch: str
+    grade: int
+    status: str  # PENDING, RUNNING, COMPLETED, FAILED
+    total: int
+    processed: int
+    updated: int
+    progress: float  # 0-1 arasi
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -33,10 +33,12 @@ class LessonResponse(BaseModel):
     school_name: str | None = None
     attendance_count: int = 0
     schedule_id: str | None = None
+    is_virtual: bool = False
 
     model_config = {"from_attributes": True}
 
 
 class LessonListResponse(BaseModel):
     items: list[LessonResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
@@ -12,6 +12,7 @@ class LessonScheduleCreate(BaseModel):
     end_date: str  # "2026-12-31"
     duration_hours: float | None = None  # None → LESSON_DURATION sabiti kullanılır
     notes: str | None = None
+    is_virtual: bool = False  # True -> dersler onceden olusturulmaz
 
 
 class LessonScheduleResponse(BaseModel):
@@ -25,6 +26,7 @@ class LessonScheduleResponse(BaseModel):
     start_date: datetime
     end_date: datetime
     is_active: bool
+    is_virtual: bool = False
     notes: str | None
     created_by: str
     created_at: datetime
@@ -26,4 +26,5 @@ class EmailLogResponse(BaseModel):
 
 class EmailLogListResponse(BaseModel):
     items: list[EmailLogResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
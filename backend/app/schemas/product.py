@@ -52,4 +52,5 @@ class ProductResponse(BaseModel):
 
 class ProductListResponse(BaseModel):
     items: list[ProductResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
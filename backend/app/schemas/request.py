@@ -38,4 +38,5 @@ class RequestResponse(BaseModel):
 
 class RequestListResponse(BaseModel):
     items: list[RequestResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
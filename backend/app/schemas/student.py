@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime, date
 
 
@@ -25,6 +25,7 @@ class StudentProgressResponse(BaseModel):
     current_grade: int
     completed_hours: float
     remaining_hours: float
+    exam_eligibility: str | None = None  # ELIGIBLE, NEEDS_APPROVAL, NOT_ELIGIBLE
 
     model_config = {"from_attributes": True}
 
@@ -33,8 +34,8 @@ class BranchProgressDetail(BaseModel):
     branch: str
     current_grade: int
     completed_hours: float
-    required_hours: int
-    minimum_hours: int
+    required_hours: float
+    minimum_hours: float
     remaining_hours: float
     exam_eligibility: str  # ELIGIBLE, NEEDS_APPROVAL, NOT_ELIGIBLE
 
@@ -72,7 +73,8 @@ class StudentResponse(BaseModel):
 
 class StudentListResponse(BaseModel):
     items: list[StudentResponse]
-    total: int
+    total: int | None = None  # include_total=false ise hesaplanmaz
+    next_cursor: str | None = None
 
 
 class ApproveStudentRequest(BaseModel):
@@ -93,3 +95,46 @@ class StudentApplyRequest(BaseModel):
     emergency_contact: str | None = None
     emergency_phone: str | None = None
     notes: str | None = None
+
+
+class StudentImportRow(BaseModel):
+    """Toplu ice aktarim dosyasinin bir satiri (kolon adlari alan adlaridir)."""
+    email: EmailStr
+    first_name: str = Field(min_length=1, max_length=100)
+    last_name: str = Field(min_length=1, max_length=100)
+    phone: str | None = Field(default=None, max_length=20)
+    password: str | None = None
+    date_of_birth: date | None = None
+    emergency_contact: str | None = Field(default=None, max_length=200)
+    emergency_phone: str | None = Field(default=None, max_length=20)
+    notes: str | None = None
+
+    model_config = {"str_strip_whitespace": True}
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _empty_to_none(cls, value):
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+    @field_validator("password")
+    @classmethod
+    def _bcrypt_limit(cls, value):
+        # bcrypt 72 bayttan sonrasini dikkate almaz
+        if value is not None and len(value.encode()) > 72:
+            raise ValueError("Şifre 72 bayttan uzun olamaz")
+        return value
+
+
+class StudentImportError(BaseModel):
+    row: int  # dosyadaki satir numarasi (baslik 1. satir)
+    email: str | None = None
+    message: str
+
+
+class StudentImportResponse(BaseModel):
+    total_rows: int
+    created: int
+    dry_run: bool = False
+    errors: list[StudentImportError] = []
@@ -0,0 +1,343 @@
+"""Toplu yoklama kaydi.
+
+Bir dersin yoklamasi tek seferde alinir: ogrenci/okul dogrulamasi ve mevcut
+yoklama kontrolu tek sorguda yapilir, yoklamalar tek INSERT ile eklenir ve
+StudentProgress saatleri tek atomik UPDATE ile artirilir. Response icin gereken
+her sey bu adimlarda elde oldugundan commit sonrasi tekrar sorgu atilmaz.
+"""
+import uuid
+
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.models.attendance_sync import (
+    AttendanceSyncOperation,
+    SyncOperationStatus,
+    SyncOperationType,
+)
+from app.models.audit_log import AuditAction
+from app.models.lesson import Lesson
+from app.models.student import Student, StudentProgress
+from app.models.user import User
+from app.principal import Principal
+from app.schemas.attendance import (
+    AttendanceResponse,
+    AttendanceRosterResponse,
+    AttendanceSyncOperationIn,
+    AttendanceSyncResult,
+)
+from app.services.audit import create_audit_logs
+from app.services.grade_hours import apply_progress_hours
+from app.services.lesson_schedules import materialize_occurrence, resolve_occurrence
+from app.services.school_scope import school_scope
+from app.services.student_directory import refresh_student_directory
+from app.utils import utcnow_naive
+
+
+async def record_attendance(
+    db: AsyncSession,
+    lesson: Lesson,
+    student_ids: list[str],
+    performed_by: str,
+) -> list[AttendanceResponse]:
+    """Derse yoklama ekler; commit cagirana aittir.
+
+    Dersin okulunda olmayan, bulunamayan ya da zaten yoklamasi alinmis
+    ogrenciler sessizce atlanir. Eklenen kayitlar istek sirasiyla dondurulur.
+    """
+    requested = list(dict.fromkeys(student_ids))
+    if not requested:
+        return []
+
+    # Tek dogrulama sorgusu: okul uyeligi + ad + mevcut yoklama
+    result = await db.execute(
+        select(Student.id, User.first_name, User.last_name, Attendance.id)
+        .join(User, User.id == Student.user_id)
+        .outerjoin(
+            Attendance,
+            and_(Attendance.student_id == Student.id, Attendance.lesson_id == lesson.id),
+        )
+        .where(Student.id.in_(requested), Student.school_id == lesson.school_id)
+    )
+    names: dict[str, str] = {}
+    for student_id, first_name, last_name, existing_id in result.all():
+        if existing_id is None:
+            names[student_id] = f"{first_name} {last_name}"
+
+    new_ids = [sid for sid in requested if sid in names]
+    if not new_ids:
+        return []
+
+    hours = float(lesson.duration_hours)
+    now = utcnow_naive()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "lesson_id": lesson.id,
+            "student_id": sid,
+            "hours_credited": hours,
+            "created_at": now,
+        }
+        for sid in new_ids
+    ]
+    await db.execute(insert(Attendance), rows)
+
+    # Tek atomik UPDATE: completed + remaining ayni ifadede hesaplanir
+    await apply_progress_hours(db, new_ids, lesson.branch, hours)
+    await refresh_student_directory(db, new_ids)
+
+    await create_audit_logs(db, [
+        {
+            "action": AuditAction.ATTENDANCE_CREATED,
+            "entity_type": "Attendance",
+            "entity_id": sid,
+            "performed_by": performed_by,
+            "details": f"Yoklama: {names[sid]}, {lesson.branch}, {hours} saat",
+        }
+        for sid in new_ids
+    ])
+
+    return [
+        AttendanceResponse(
+            id=row["id"],
+            lesson_id=str(lesson.id),
+            student_id=row["student_id"],
+            hours_credited=hours,
+            created_at=now,
+            student_name=names[row["student_id"]],
+        )
+        for row in rows
+    ]
+
+
+async def revert_attendance_hours(
+    db: AsyncSession,
+    lesson: Lesson,
+    student_ids: list[str] | None = None,
+) -> None:
+    """Dersin yoklamalarinin kazandirdigi saatleri tek UPDATE ile geri alir.
+
+    Her ogrenciye kendi yoklama satirindaki hours_credited kadar dusulur.
+    student_ids verilmezse dersin tum yoklamalari icin calisir. Yoklama
+    satirlarini silmek cagirana aittir.
+    """
+    credited_hours = (
+        select(Attendance.hours_credited)
+        .where(
+            Attendance.lesson_id == lesson.id,
+            Attendance.student_id == StudentProgress.student_id,
+        )
+        .scalar_subquery()
+    )
+    attended = select(Attendance.student_id).where(Attendance.lesson_id == lesson.id)
+    if student_ids is not None:
+        attended = attended.where(Attendance.student_id.in_(student_ids))
+    await apply_progress_hours(db, attended, lesson.branch, -credited_hours)
+    await refresh_student_directory(db, attended)
+
+
+async def remove_attendance(
+    db: AsyncSession,
+    lesson: Lesson,
+    rows: dict[str, tuple[str, float]],
+    performed_by: str,
+) -> None:
+    """Verilen yoklamalari siler ve saatlerini geri alir; commit cagirana aittir.
+
+    rows: {student_id: (attendance_id, hours_credited)}
+    """
+    student_ids = list(rows)
+    await revert_attendance_hours(db, lesson, student_ids)
+    await db.execute(
+        delete(Attendance)
+        .where(Attendance.lesson_id == lesson.id, Attendance.student_id.in_(student_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await create_audit_logs(db, [
+        {
+            "action": AuditAction.ATTENDANCE_DELETED,
+            "entity_type": "Attendance",
+            "entity_id": att_id,
+            "performed_by": performed_by,
+            "details": f"Yoklama silindi: {hours} saat",
+        }
+        for att_id, hours in rows.values()
+    ])
+
+
+async def replace_roster(
+    db: AsyncSession,
+    lesson: Lesson,
+    student_ids: list[str],
+    performed_by: str,
+) -> AttendanceRosterResponse:
+    """Dersin yoklamasini verilen ogrenci listesine esitler; commit cagirana aittir.
+
+    Mevcut yoklamalar tek sorguda okunur, fark hesaplanir; cikarilanlar tek
+    DELETE ve tek saat UPDATE'i ile, eklenenler record_attendance ile islenir.
+    """
+    result = await db.execute(
+        select(Attendance.id, Attendance.student_id, Attendance.hours_credited)
+        .where(Attendance.lesson_id == lesson.id)
+    )
+    existing = {sid: (att_id, float(hours)) for att_id, sid, hours in result.all()}
+
+    desired = list(dict.fromkeys(student_ids))
+    desired_set = set(desired)
+    to_remove = [sid for sid in existing if sid not in desired_set]
+    to_add = [sid for sid in desired if sid not in existing]
+
+    if to_remove:
+        await remove_attendance(db, lesson, {sid: existing[sid] for sid in to_remove}, performed_by)
+
+    added = await record_attendance(db, lesson, to_add, performed_by)
+
+    return AttendanceRosterResponse(
+        added=added,
+        removed_student_ids=to_remove,
+        unchanged=len(existing) - len(to_remove),
+    )
+
+
+async def sync_attendance(
+    db: AsyncSession,
+    principal: Principal,
+    operations: list[AttendanceSyncOperationIn],
+) -> list[AttendanceSyncResult]:
+    """Cevrimdisi toplanan yoklama islemlerini toplu ve idempotent uygular.
+
+    Ayni kullanicinin daha once isledigi op_id'ler yeniden uygulanmaz, kayitli
+    sonuclari dondurulur; farkli kullanicilarin op_id'leri birbirine karismaz. Ayni ders/ogrenci icin batch'teki son islem gecerlidir.
+    Yeni islemler ders basina tek record_attendance / remove_attendance
+    cagrisiyla uygulanir ve sonuclari attendance_sync_operations'a yazilir.
+    Commit cagirana aittir; eszamanli bir sync ile cakisma olursa
+    uq_lesson_student ya da (performed_by, op_id) birincil anahtari
+    IntegrityError verir.
+    """
+    results: dict[str, AttendanceSyncResult | None] = {}
+    ops: list[AttendanceSyncOperationIn] = []
+    for op in operations:
+        if op.op_id not in results:
+            results[op.op_id] = None
+            ops.append(op)
+    if not ops:
+        return []
+
+    # Daha once islenmis islemler: kayitli sonucu tekrar dondur
+    prior = await db.execute(
+        select(
+            AttendanceSyncOperation.op_id,
+            AttendanceSyncOperation.status,
+            AttendanceSyncOperation.detail,
+        ).where(
+            AttendanceSyncOperation.performed_by == principal.id,
+            AttendanceSyncOperation.op_id.in_(list(results)),
+        )
+    )
+    for op_id, status, detail in prior.all():
+        results[op_id] = AttendanceSyncResult(op_id=op_id, status=status, detail=detail)
+    pending = [op for op in ops if results[op.op_id] is None]
+
+    def _set(op, status: SyncOperationStatus, detail: str | None = None):
+        results[op.op_id] = AttendanceSyncResult(op_id=op.op_id, status=status.value, detail=detail)
+
+    lesson_result = await db.execute(
+        select(Lesson).where(Lesson.id.in_({op.lesson_id for op in pending}))
+    )
+    lessons = {lesson.id: lesson for lesson in lesson_result.scalars().all()}
+    scope = school_scope(principal)
+
+    # Sanal program dersleri: yetkili olunan tekrarlar olusturulur ve islem
+    # gercek ders kimligine cevrilir
+    for lesson_id in {op.lesson_id for op in pending} - set(lessons):
+        occurrence = await resolve_occurrence(db, lesson_id)
+        if occurrence is not None and scope.allows(occurrence[0].school_id):
+            lesson = await materialize_occurrence(db, *occurrence, principal.id)
+            lessons[lesson_id] = lessons[lesson.id] = lesson
+    pending = [
+        op.model_copy(update={"lesson_id": lessons[op.lesson_id].id}) if op.lesson_id in lessons else op
+        for op in pending
+    ]
+
+    # Ders/ogrenci basina son islem gecerli
+    effective: dict[tuple[str, str], AttendanceSyncOperationIn] = {}
+    for op in pending:
+        lesson = lessons.get(op.lesson_id)
+        if lesson is None:
+            _set(op, SyncOperationStatus.REJECTED, "Ders bulunamadı")
+            continue
+        if not scope.allows(lesson.school_id):
+            _set(op, SyncOperationStatus.REJECTED, "Bu ders sizin okulunuzda değil")
+            continue
+        key = (op.lesson_id, op.student_id)
+        if key in effective:
+            _set(effective[key], SyncOperationStatus.SUPERSEDED)
+        effective[key] = op
+
+    if effective:
+        existing_result = await db.execute(
+            select(
+                Attendance.lesson_id,
+                Attendance.student_id,
+                Attendance.id,
+                Attendance.hours_credited,
+            ).where(
+                Attendance.lesson_id.in_({lesson_id for lesson_id, _ in effective}),
+                Attendance.student_id.in_({student_id for _, student_id in effective}),
+            )
+        )
+        existing = {
+            (lesson_id, student_id): (att_id, float(hours))
+            for lesson_id, student_id, att_id, hours in existing_result.all()
+        }
+
+        by_lesson: dict[str, list[AttendanceSyncOperationIn]] = {}
+        for op in effective.values():
+            by_lesson.setdefault(op.lesson_id, []).append(op)
+
+        for lesson_id, lesson_ops in by_lesson.items():
+            lesson = lessons[lesson_id]
+            adds, removes = [], {}
+            for op in lesson_ops:
+                present = (lesson_id, op.student_id) in existing
+                if op.operation == SyncOperationType.ADD.value:
+                    if present:
+                        _set(op, SyncOperationStatus.ALREADY_APPLIED)
+                    else:
+                        adds.append(op)
+                else:
+                    if present:
+                        removes[op.student_id] = existing[(lesson_id, op.student_id)]
+                        _set(op, SyncOperationStatus.APPLIED)
+                    else:
+                        _set(op, SyncOperationStatus.ALREADY_APPLIED)
+
+            if removes:
+                await remove_attendance(db, lesson, removes, principal.id)
+            if adds:
+                added = await record_attendance(
+                    db, lesson, [op.student_id for op in adds], principal.id
+                )
+                added_ids = {item.student_id for item in added}
+                for op in adds:
+                    if op.student_id in added_ids:
+                        _set(op, SyncOperationStatus.APPLIED)
+                    else:
+                        _set(op, SyncOperationStatus.REJECTED, "Öğrenci bulunamadı veya bu okulda değil")
+
+    if pending:
+        await db.execute(insert(AttendanceSyncOperation), [
+            {
+                "op_id": op.op_id,
+                "operation": op.operation,
+                "lesson_id": op.lesson_id,
+                "student_id": op.student_id,
+                "status": results[op.op_id].status,
+                "detail": results[op.op_id].detail,
+                "performed_by": principal.id,
+            }
+            for op in pending
+        ])
+
+    return [results[op.op_id] for op in ops]
@@ -24,3 +24,26 @@ async def create_audit_log(
     db.add(log)
     await db.flush()
     return log
+
+
+async def create_audit_logs(db: AsyncSession, entries: list[dict]) -> None:
+    """Birden cok audit kaydini tek flush ile ekler.
+
+    entries: create_audit_log ile ayni anahtarlari tasiyan dict'ler
+    (action bir AuditAction olmali).
+    """
+    if not entries:
+        return
+    db.add_all([
+        AuditLog(
+            action=entry["action"].value,
+            entity_type=entry["entity_type"],
+            entity_id=entry["entity_id"],
+            performed_by=entry["performed_by"],
+            details=entry.get("details"),
+            old_value=entry.get("old_value"),
+            new_value=entry.get("new_value"),
+        )
+        for entry in entries
+    ])
+    await db.flush()
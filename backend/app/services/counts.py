@@ -0,0 +1,57 @@
+"""Liste response'larindaki cocuk satir sayilari.
+
+Sayilar ana SELECT'e iliskili scalar alt sorgu olarak eklenir; cocuk satirlar
+yuklenmez ve sayfa boyutundan bagimsiz tek sorgu calisir:
+
+    result = await db.execute(select(Lesson, lesson_attendance_count()))
+    for lesson, attendance_count in result.all(): ...
+
+Alt sorgular uq_lesson_student (lesson_id, ...), ix_event_registrations_status
+(event_id, status, ...) ve uq_schedule_occurrence (schedule_id, ...) indekslerini
+kullanir.
+"""
+from sqlalchemy import func, select
+
+from app.models.attendance import Attendance
+from app.models.event import Event, EventRegistration, RegistrationStatus
+from app.models.lesson import Lesson
+from app.models.lesson_schedule import LessonSchedule
+
+
+def lesson_attendance_count():
+    return (
+        select(func.count(Attendance.id))
+        .where(Attendance.lesson_id == Lesson.id)
+        .correlate(Lesson)
+        .scalar_subquery()
+        .label("attendance_count")
+    )
+
+
+def _event_registrations_with_status(status: RegistrationStatus, label: str):
+    return (
+        select(func.count(EventRegistration.id))
+        .where(EventRegistration.event_id == Event.id, EventRegistration.status == status.value)
+        .correlate(Event)
+        .scalar_subquery()
+        .label(label)
+    )
+
+
+def event_registration_count():
+    """Kesinlesmis (CONFIRMED) kayit sayisi."""
+    return _event_registrations_with_status(RegistrationStatus.CONFIRMED, "registration_count")
+
+
+def event_waitlist_count():
+    return _event_registrations_with_status(RegistrationStatus.WAITLISTED, "waitlist_count")
+
+
+def schedule_lesson_count():
+    return (
+        select(func.count(Lesson.id))
+        .where(Lesson.schedule_id == LessonSchedule.id)
+        .correlate(LessonSchedule)
+        .scalar_subquery()
+        .label("generated_lesson_count")
+    )
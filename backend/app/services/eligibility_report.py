@@ -0,0 +1,102 @@
+"""Seminer oncesi toplu sinav uygunluk raporu.
+
+Kapsamdaki (EventScope / EventSchool ve yoneticinin okullari) tum aktif
+ogrenciler student_directory'den tek sorguyla okunur. Uygunluk ve gereken
+saat her satir icin Python'da ayrica hesaplanmaz: ayni sorgu icinde
+etkin kural tablosunun SQL karsiligiyla (exam_eligibility_expr,
+required_hours_expr) hesaplanir. Python tarafinda sadece satirlar brans ve
+uygunluk durumuna gore gruplanir.
+
+Cok sayida satirda Pydantic nesnesi uretmemek icin sonuc duz dict olarak
+doner; endpoint bunu dogrudan JSON'a yazar.
+"""
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.event import Event, EventSchool, EventScope
+from app.models.student import Branch
+from app.models.student_directory import StudentDirectory
+from app.models.user import UserStatus
+from app.services.grade_hours import exam_eligibility_expr, required_hours_expr
+from app.services.school_scope import SchoolScope
+from app.services.student_directory import branch_column
+
+ELIGIBILITY_STATUSES = ("ELIGIBLE", "NEEDS_APPROVAL", "NOT_ELIGIBLE")
+
+# Ilerleme kaydi olmayan ogrenci my-eligibility'deki gibi 1. derece, 0 saat sayilir
+_DEFAULT_GRADE = 1
+
+
+def _report_query(event: Event, scope: SchoolScope, school_id: str | None, branches: list[str]):
+    columns = [
+        StudentDirectory.student_id,
+        StudentDirectory.first_name,
+        StudentDirectory.last_name,
+        StudentDirectory.school_id,
+        StudentDirectory.school_name,
+    ]
+    for branch in branches:
+        grade = func.coalesce(branch_column(branch, "grade"), _DEFAULT_GRADE)
+        completed = func.coalesce(branch_column(branch, "completed_hours"), 0)
+        columns += [
+            grade.label(f"{branch}_grade"),
+            completed.label(f"{branch}_completed_hours"),
+            required_hours_expr(grade, literal(branch)).label(f"{branch}_required_hours"),
+            exam_eligibility_expr(grade, completed, literal(branch)).label(f"{branch}_eligibility"),
+        ]
+    query = select(*columns).where(StudentDirectory.user_status == UserStatus.ACTIVE.value)
+    if event.scope == EventScope.SELECTED_SCHOOLS.value:
+        query = query.where(
+            StudentDirectory.school_id.in_(
+                select(EventSchool.school_id).where(EventSchool.event_id == event.id)
+            )
+        )
+    if school_id:
+        query = query.where(StudentDirectory.school_id == school_id)
+    query = scope.apply(query, StudentDirectory.school_id)
+    return query.order_by(
+        StudentDirectory.school_name, StudentDirectory.last_name,
+        StudentDirectory.first_name, StudentDirectory.student_id,
+    )
+
+
+async def build_eligibility_report(
+    db: AsyncSession,
+    event: Event,
+    scope: SchoolScope,
+    school_id: str | None = None,
+    branch: str | None = None,
+) -> dict:
+    """{event_id, total_students, branches: {brans: {counts, groups}}}.
+
+    groups her uygunluk durumu icin (okul, soyad, ad) sirasinda ogrenci
+    listesidir; counts ayni gruplarin boyutlari.
+    """
+    branches = [branch] if branch else [b.value for b in Branch]
+    result = await db.execute(_report_query(event, scope, school_id, branches))
+    rows = result.mappings().all()
+
+    report = {}
+    for name in branches:
+        groups: dict[str, list[dict]] = {status: [] for status in ELIGIBILITY_STATUSES}
+        grade_key = f"{name}_grade"
+        hours_key = f"{name}_completed_hours"
+        required_key = f"{name}_required_hours"
+        eligibility_key = f"{name}_eligibility"
+        for row in rows:
+            groups[row[eligibility_key]].append({
+                "student_id": row["student_id"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "school_id": row["school_id"],
+                "school_name": row["school_name"],
+                "grade": row[grade_key],
+                "completed_hours": float(row[hours_key]),
+                "required_hours": row[required_key],
+            })
+        report[name] = {
+            "counts": {status: len(students) for status, students in groups.items()},
+            "groups": groups,
+        }
+
+    return {"event_id": event.id, "total_students": len(rows), "branches": report}
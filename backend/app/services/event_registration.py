@@ -0,0 +1,121 @@
+"""Etkinlik kontenjani ve bekleme listesi.
+
+Kontenjan Event.seats_taken sayaci ile tutulur. Kayit, koltugu tek bir
+kosullu UPDATE ile alir:
+
+    UPDATE events SET seats_taken = seats_taken + 1
+    WHERE id = :id AND is_completed = false
+      AND (capacity IS NULL OR seats_taken < capacity)
+
+Satir donerse kayit CONFIRMED, donmezse (etkinlik doluysa) WAITLISTED olur.
+Sayma + ekleme yarisi olmaz; es zamanli kayitlar yalnizca bu UPDATE'ten
+commit'e kadar (tek INSERT) event satirini sirayla tutar. Bu yuzden
+register_for_event koltugu transaction'in en sonunda alir.
+
+Koltuk bosaldiginda (kayit iptali, kontenjan artisi) fill_from_waitlist
+bekleme listesini kayit sirasina gore CONFIRMED'a terfi ettirir ve sayaci
+gercek CONFIRMED sayisina esitler. Kayitlari FK cascade ile silen islemler
+(kullanici / okul silme) once release_student_registrations cagirir; aksi
+halde silinen kaydin koltugu sayacta kalir.
+"""
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.event import Event, EventRegistration, RegistrationStatus
+
+
+async def claim_seat(db: AsyncSession, event_id: str) -> str | None:
+    """Bos koltuk varsa alir ve etkinlik tipini dondurur; yoksa None.
+
+    None: etkinlik dolu, tamamlanmis ya da yok (ayirt etmek cagirana kalir).
+    """
+    result = await db.execute(
+        update(Event)
+        .where(
+            Event.id == event_id,
+            Event.is_completed == False,
+            or_(Event.capacity.is_(None), Event.seats_taken < Event.capacity),
+        )
+        .values(seats_taken=Event.seats_taken + 1)
+        .returning(Event.event_type)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+async def fill_from_waitlist(db: AsyncSession, event_id: str) -> list[str]:
+    """Bos koltuklari bekleme listesinden doldurur; terfi eden kayit id'leri.
+
+    Event satiri kilitlenir; sayac CONFIRMED satirlarindan yeniden
+    hesaplandigi icin baska yoldan silinen kayitlar da (or. ogrenci silme)
+    koltugu geri verir. Commit cagirana aittir.
+    """
+    await db.flush()
+    capacity = (
+        await db.execute(select(Event.capacity).where(Event.id == event_id).with_for_update())
+    ).scalar_one()
+    confirmed = (
+        await db.execute(
+            select(func.count(EventRegistration.id)).where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status == RegistrationStatus.CONFIRMED.value,
+            )
+        )
+    ).scalar_one()
+
+    waitlist = (
+        select(EventRegistration.id)
+        .where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.status == RegistrationStatus.WAITLISTED.value,
+        )
+        .order_by(EventRegistration.created_at, EventRegistration.id)
+    )
+    promoted: list[str] = []
+    if capacity is None or capacity > confirmed:
+        if capacity is not None:
+            waitlist = waitlist.limit(capacity - confirmed)
+        promoted = list((await db.execute(waitlist)).scalars().all())
+
+    if promoted:
+        await db.execute(
+            update(EventRegistration)
+            .where(EventRegistration.id.in_(promoted))
+            .values(status=RegistrationStatus.CONFIRMED.value)
+            .execution_options(synchronize_session=False)
+        )
+    await db.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(seats_taken=confirmed + len(promoted))
+        .execution_options(synchronize_session=False)
+    )
+    return promoted
+
+
+async def release_student_registrations(db: AsyncSession, student_ids) -> list[str]:
+    """Ogrencilerin etkinlik kayitlarini siler ve bosalan koltuklari doldurur.
+
+    student_ids bir liste ya da alt sorgu olabilir; ogrenci satirlari
+    silinmeden once cagrilmalidir. Koltugu bosalan tamamlanmamis
+    etkinliklerin id'lerini dondurur. Commit cagirana aittir.
+    """
+    result = await db.execute(
+        select(EventRegistration.event_id)
+        .join(Event, Event.id == EventRegistration.event_id)
+        .where(
+            EventRegistration.student_id.in_(student_ids),
+            EventRegistration.status == RegistrationStatus.CONFIRMED.value,
+            Event.is_completed == False,
+        )
+        .distinct()
+    )
+    event_ids = sorted(result.scalars().all())
+    await db.execute(
+        delete(EventRegistration)
+        .where(EventRegistration.student_id.in_(student_ids))
+        .execution_options(synchronize_session=False)
+    )
+    for event_id in event_ids:
+        await fill_from_waitlist(db, event_id)
+    return event_ids
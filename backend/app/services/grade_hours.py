@@ -1,4 +1,24 @@
-"""Derece bazli saat gereksinimleri ve sinav uygunluk kontrolu."""
+"""Derece bazli saat gereksinimleri ve sinav uygunluk kontrolu.
+
+Kurallar brans basina, dereceyle indekslenen derlenmis bir tablodan okunur
+(GradeRules). Tablo GRADE_HOURS_MAP varsayilanlari uzerine GradeRequirement
+satirlarinin gereken saatleri yazilarak derlenir; alt sinir tabloda
+tutulmadigi icin varsayilandan gelir ve gereken saati gecemez.
+
+Derlenmis tablo degistirilemez; load_grade_rules yenisini derleyip modul
+degiskenini tek atamayla degistirir. Okuyanlar tabloyu bir kez alip
+kullandigi icin bir hesap yarim guncellenmis kural gormez. Tablo surec
+icidir: uygulama acilisinda yuklenir, gereksinim ekleyen/guncelleyen
+endpoint commit sonrasi yeniden yukler, diger worker'lar en gec
+GRADE_RULES_REFRESH_SECONDS icinde yeniler (bkz. app/main.py).
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import and_, case, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.grade import GradeRequirement
+from app.models.student import Branch, StudentProgress
 
 # (min_grade, max_grade): {"required": tam saat, "minimum": alt sinir}
 GRADE_HOURS_MAP = {
@@ -8,34 +28,191 @@ GRADE_HOURS_MAP = {
     (11, 12): {"required": 128, "minimum": 110},
 }
 
+_NO_HOURS = {"required": 0, "minimum": 0}
+
+
+def _hours_value(value):
+    """Numeric saatleri tam sayiysa int olarak tutar (54.00 -> 54)."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _runs(grades: tuple[dict, ...], key: str) -> tuple[tuple[int, int, float], ...]:
+    """[(ilk derece, son derece, deger)]; ardisik esit degerler birlesir, 0'lar atlanir."""
+    runs: list[tuple[int, int, float]] = []
+    for grade, hours in enumerate(grades):
+        value = hours[key]
+        if runs and runs[-1][1] == grade - 1 and runs[-1][2] == value:
+            runs[-1] = (runs[-1][0], grade, value)
+        elif value:
+            runs.append((grade, grade, value))
+    return tuple(runs)
+
+
+@dataclass(frozen=True)
+class GradeRules:
+    """Derlenmis kural tablosu.
+
+    table: {brans: (derece 0, derece 1, ...)} -> {"required", "minimum"}
+    runs: {"required"/"minimum": {brans: derece araliklari}} (SQL CASE icin)
+    """
+    table: dict[str, tuple[dict, ...]]
+    runs: dict[str, dict[str, tuple[tuple[int, int, float], ...]]]
+
+    def hours(self, grade: int, branch: str) -> dict:
+        grades = self.table.get(branch, ())
+        if 0 <= grade < len(grades):
+            return grades[grade]
+        return _NO_HOURS
+
+
+def compile_grade_rules(requirements=()) -> GradeRules:
+    """(brans, derece, gereken saat) uclulerinden kural tablosu derler."""
+    defaults = {
+        grade: hours
+        for (min_g, max_g), hours in GRADE_HOURS_MAP.items()
+        for grade in range(min_g, max_g + 1)
+    }
+    overrides = {branch.value: {} for branch in Branch}
+    for branch, grade, required in requirements:
+        if branch in overrides and grade >= 0:
+            overrides[branch][grade] = _hours_value(required)
+
+    table = {}
+    for branch, required_by_grade in overrides.items():
+        max_grade = max([*defaults, *required_by_grade])
+        grades = []
+        for grade in range(max_grade + 1):
+            default = defaults.get(grade, _NO_HOURS)
+            required = required_by_grade.get(grade, default["required"])
+            grades.append({"required": required, "minimum": min(default["minimum"], required)})
+        table[branch] = tuple(grades)
+    runs = {
+        key: {branch: _runs(grades, key) for branch, grades in table.items()}
+        for key in ("required", "minimum")
+    }
+    return GradeRules(table=table, runs=runs)
+
+
+DEFAULT_GRADE_RULES = compile_grade_rules()
+_rules = DEFAULT_GRADE_RULES
+
+
+def current_grade_rules() -> GradeRules:
+    return _rules
+
 
-def get_hours_for_grade(grade: int) -> dict:
-    """Derecenin gereken saat ve alt sinir bilgisini dondurur.
+async def load_grade_rules(db: AsyncSession) -> GradeRules:
+    """GradeRequirement tablosundan kurallari derler ve etkin tabloyla degistirir."""
+    global _rules
+    result = await db.execute(
+        select(GradeRequirement.branch, GradeRequirement.grade, GradeRequirement.required_hours)
+    )
+    _rules = compile_grade_rules(result.all())
+    return _rules
+
+
+def reset_grade_rules() -> None:
+    """Varsayilan kurallara doner (testler)."""
+    global _rules
+    _rules = DEFAULT_GRADE_RULES
+
+
+def get_hours_for_grade(grade: int, branch: str) -> dict:
+    """Bransta derecenin gereken saat ve alt sinir bilgisini dondurur.
 
     Returns:
-        {"required": int, "minimum": int} veya grade tanimli degilse {"required": 0, "minimum": 0}
+        {"required": sayi, "minimum": sayi} veya grade tanimli degilse {"required": 0, "minimum": 0}
+    """
+    return _rules.hours(grade, branch)
+
+
+def non_negative(expr):
+    """SQL ifadesini alttan 0'a sabitler (max(0, expr))."""
+    return case((expr < 0, literal(0)), else_=expr)
+
+
+def _grade_hours_expr(rules: GradeRules, key: str, grade_column, branch_column):
+    """Kural tablosunun SQL CASE karsiligi; branslar ayniysa brans kosulu eklenmez."""
+    ranges = rules.runs[key]
+    per_branch = list(ranges.values())
+    if all(runs == per_branch[0] for runs in per_branch):
+        whens = [
+            (grade_column.between(min_g, max_g), literal(value))
+            for min_g, max_g, value in per_branch[0]
+        ]
+    else:
+        whens = [
+            (and_(branch_column == branch, grade_column.between(min_g, max_g)), literal(value))
+            for branch, runs in ranges.items()
+            for min_g, max_g, value in runs
+        ]
+    if not whens:
+        return literal(0)
+    return case(*whens, else_=literal(0))
+
+
+def required_hours_expr(grade_column=StudentProgress.current_grade, branch_column=StudentProgress.branch):
+    """get_hours_for_grade(...)["required"] degerinin SQL CASE karsiligi."""
+    return _grade_hours_expr(_rules, "required", grade_column, branch_column)
+
+
+def exam_eligibility_expr(grade_column, completed_column, branch_column):
+    """check_exam_eligibility'nin SQL CASE karsiligi."""
+    rules = _rules
+    required = _grade_hours_expr(rules, "required", grade_column, branch_column)
+    minimum = _grade_hours_expr(rules, "minimum", grade_column, branch_column)
+    return case(
+        (required == 0, literal("ELIGIBLE")),
+        (completed_column >= required, literal("ELIGIBLE")),
+        (completed_column >= minimum, literal("NEEDS_APPROVAL")),
+        else_=literal("NOT_ELIGIBLE"),
+    )
+
+
+def progress_hours_set(completed_hours) -> dict:
+    """completed_hours'u verilen degere esitleyen update(StudentProgress).values(...).
+
+    remaining_hours ayni UPDATE icinde satirin derecesinden hesaplanir.
+    completed_hours sabit bir sayi ya da satir bazli bir SQL ifadesi olabilir.
+    """
+    new_completed = non_negative(completed_hours)
+    return {
+        "completed_hours": new_completed,
+        "remaining_hours": non_negative(required_hours_expr() - new_completed),
+    }
+
+
+def progress_hours_increment(added_hours) -> dict:
+    """completed_hours'a saat ekleyen/dusen update(StudentProgress).values(...).
+
+    completed_hours ve remaining_hours ayni UPDATE icinde, satirin o anki
+    degerinden hesaplanir; once okuyup sonra yazmaya gerek kalmaz.
+    added_hours sabit bir sayi ya da satir bazli bir SQL ifadesi olabilir.
     """
-    for (min_g, max_g), hours in GRADE_HOURS_MAP.items():
-        if min_g <= grade <= max_g:
-            return hours
-    return {"required": 0, "minimum": 0}
+    return progress_hours_set(StudentProgress.completed_hours + added_hours)
 
 
-def update_progress_hours(progress, added_hours: float) -> None:
-    """StudentProgress nesnesinin completed_hours ve remaining_hours alanlarını günceller.
+async def apply_progress_hours(
+    db: AsyncSession,
+    student_ids,
+    branch: str,
+    added_hours,
+) -> None:
+    """Ogrencilerin ilgili brans ilerlemesine tek atomik UPDATE ile saat ekler/duser.
 
-    Args:
-        progress: StudentProgress ORM nesnesi
-        added_hours: Eklenecek saat (negatif değer saati düşürür)
+    student_ids bir liste ya da alt sorgu olabilir. Satirlar ORM'e yuklenmez;
+    ayni anda calisan iki yoklama islemi birbirinin guncellemesini ezmez.
     """
-    new_completed = max(0, float(progress.completed_hours) + added_hours)
-    hours_info = get_hours_for_grade(progress.current_grade)
-    new_remaining = max(0, hours_info["required"] - new_completed)
-    progress.completed_hours = new_completed
-    progress.remaining_hours = new_remaining
+    await db.execute(
+        update(StudentProgress)
+        .where(StudentProgress.student_id.in_(student_ids), StudentProgress.branch == branch)
+        .values(**progress_hours_increment(added_hours))
+        .execution_options(synchronize_session=False)
+    )
 
 
-def check_exam_eligibility(grade: int, completed_hours: float) -> str:
+def check_exam_eligibility(grade: int, completed_hours: float, branch: str) -> str:
     """Ogrencinin sinava girme uygunlugunu kontrol eder.
 
     Returns:
@@ -43,7 +220,7 @@ def check_exam_eligibility(grade: int, completed_hours: float) -> str:
         "NEEDS_APPROVAL" - Alt siniri gecmis ama gereken saati tamamlamamis, egitmen onayi gerekir
         "NOT_ELIGIBLE" - Alt sinirin altinda, sinava giremez
     """
-    hours = get_hours_for_grade(grade)
+    hours = get_hours_for_grade(grade, branch)
     if hours["required"] == 0:
         return "ELIGIBLE"
 
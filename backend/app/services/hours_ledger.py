@@ -0,0 +1,247 @@
+"""Saat defteri mutabakati.
+
+StudentProgress.completed_hours yoklama eklendikce/silindikce artimli
+guncellenir. Bu modul beklenen degeri Attendance satirlarindan yeniden
+hesaplar: ogrencinin o branstaki son basarili seminer degerlendirmesinden
+(derece atlama; saatler sifirlanir, bkz. seminar_evaluation) sonra alinan
+yoklamalarin hours_credited toplami. Elle yapilan derece degisikligi saatleri
+sifirlamadigi icin defteri baslatmaz; remaining_hours'u yeni dereceye gore
+ayni guncellemede yazar.
+
+Tum hesap tek GROUP BY sorgusuyla yapilir, farklar tek UPDATE ile duzeltilir.
+Artimli calistirmada yalnizca watermark'tan beri dokunulan ogrenciler
+(yoklama, ilerleme guncellemesi ya da seminer degerlendirmesi) taranir.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.models.audit_log import AuditAction
+from app.models.event import SeminarEvaluation
+from app.models.hours_reconciliation import HoursReconciliationRun
+from app.models.lesson import Lesson
+from app.models.student import StudentProgress
+from app.schemas.grade import HoursDiscrepancy, HoursReconciliationResponse
+from app.services.audit import create_audit_logs
+from app.services.grade_hours import non_negative, progress_hours_set, required_hours_expr
+from app.services.student_directory import refresh_student_directory
+from app.utils import utcnow_naive
+
+# Numeric(8, 2) alanlar icin karsilastirma toleransi
+HOURS_TOLERANCE = 0.005
+# Watermark'tan once baslayip sonra commit edilen islemler kacmasin diye
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Response'ta dondurulen en fazla fark satiri; sayaclar her zaman tam
+DISCREPANCY_REPORT_LIMIT = 1000
+# Duzeltme UPDATE'inde IN listesi basina en fazla satir
+FIX_CHUNK_SIZE = 1000
+
+
+def _touched_students(since: datetime):
+    """since'ten beri saatini etkileyebilecek bir degisiklik gormus ogrenciler."""
+    return union(
+        select(Attendance.student_id).where(Attendance.created_at >= since),
+        select(StudentProgress.student_id).where(StudentProgress.updated_at >= since),
+        select(SeminarEvaluation.student_id).where(SeminarEvaluation.evaluated_at >= since),
+    )
+
+
+def _ledger_hours(student_ids=None):
+    """(student_id, branch, hours): son derece atlamadan beri kazanilan saatler."""
+    last_promotion = (
+        select(
+            SeminarEvaluation.student_id,
+            SeminarEvaluation.branch,
+            func.max(SeminarEvaluation.evaluated_at).label("promoted_at"),
+        )
+        .where(SeminarEvaluation.passed.is_(True))
+        .group_by(SeminarEvaluation.student_id, SeminarEvaluation.branch)
+        .subquery("last_promotion")
+    )
+    query = (
+        select(
+            Attendance.student_id,
+            Lesson.branch,
+            func.sum(Attendance.hours_credited).label("hours"),
+        )
+        .join(Lesson, Lesson.id == Attendance.lesson_id)
+        .outerjoin(
+            last_promotion,
+            and_(
+                last_promotion.c.student_id == Attendance.student_id,
+                last_promotion.c.branch == Lesson.branch,
+            ),
+        )
+        .where(
+            or_(
+                last_promotion.c.promoted_at.is_(None),
+                Attendance.created_at > last_promotion.c.promoted_at,
+            )
+        )
+        .group_by(Attendance.student_id, Lesson.branch)
+    )
+    if student_ids is not None:
+        query = query.where(Attendance.student_id.in_(student_ids))
+    return query.subquery("ledger")
+
+
+def _expected_completed_for_row():
+    """Guncellenen StudentProgress satiri icin _ledger_hours'un iliskili karsiligi.
+
+    Duzeltme UPDATE'i rapordaki degeri degil bu ifadeyi yazar; rapor ile
+    duzeltme arasinda gelen bir yoklama ezilmez.
+    """
+    promoted_at = (
+        select(func.max(SeminarEvaluation.evaluated_at))
+        .where(
+            SeminarEvaluation.student_id == StudentProgress.student_id,
+            SeminarEvaluation.branch == StudentProgress.branch,
+            SeminarEvaluation.passed.is_(True),
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(func.coalesce(func.sum(Attendance.hours_credited), 0))
+        .join(Lesson, Lesson.id == Attendance.lesson_id)
+        .where(
+            Attendance.student_id == StudentProgress.student_id,
+            Lesson.branch == StudentProgress.branch,
+            or_(promoted_at.is_(None), Attendance.created_at > promoted_at),
+        )
+        .scalar_subquery()
+    )
+
+
+async def last_watermark(db: AsyncSession) -> datetime | None:
+    """Son tamamlanan calistirmanin baslangici (ortusme payi dusulmus)."""
+    result = await db.execute(
+        select(func.max(HoursReconciliationRun.started_at))
+        .where(HoursReconciliationRun.finished_at.is_not(None))
+    )
+    started_at = result.scalar_one_or_none()
+    return started_at - WATERMARK_OVERLAP if started_at else None
+
+
+async def reconcile_hours(
+    db: AsyncSession,
+    *,
+    fix: bool = False,
+    since: datetime | None = None,
+    incremental: bool = False,
+    performed_by: str | None = None,
+) -> HoursReconciliationResponse:
+    """Saat defterini Attendance'tan yeniden hesaplar, farklari raporlar.
+
+    fix=True ise farkli satirlar toplu UPDATE ile duzeltilir. since verilirse
+    ya da incremental=True ise (son calistirmanin watermark'i) yalnizca o
+    zamandan beri dokunulan ogrenciler taranir. Calistirma
+    hours_reconciliation_runs'a yazilir; commit cagirana aittir.
+    """
+    started_at = utcnow_naive()
+    if since is None and incremental:
+        since = await last_watermark(db)
+
+    touched = _touched_students(since) if since is not None else None
+    ledger = _ledger_hours(touched)
+    expected_completed = func.coalesce(ledger.c.hours, 0)
+    expected_remaining = non_negative(required_hours_expr() - expected_completed)
+
+    base = select(StudentProgress.id).outerjoin(
+        ledger,
+        and_(
+            ledger.c.student_id == StudentProgress.student_id,
+            ledger.c.branch == StudentProgress.branch,
+        ),
+    )
+    if touched is not None:
+        base = base.where(StudentProgress.student_id.in_(touched))
+
+    checked = (
+        await db.execute(select(func.count()).select_from(base.subquery()))
+    ).scalar_one()
+
+    result = await db.execute(
+        base.add_columns(
+            StudentProgress.student_id,
+            StudentProgress.branch,
+            StudentProgress.current_grade,
+            StudentProgress.completed_hours,
+            StudentProgress.remaining_hours,
+            expected_completed.label("expected_completed"),
+            expected_remaining.label("expected_remaining"),
+        )
+        .where(
+            or_(
+                func.abs(StudentProgress.completed_hours - expected_completed) > HOURS_TOLERANCE,
+                func.abs(StudentProgress.remaining_hours - expected_remaining) > HOURS_TOLERANCE,
+            )
+        )
+        .order_by(StudentProgress.student_id, StudentProgress.branch)
+    )
+    discrepancies = [
+        HoursDiscrepancy(
+            progress_id=row.id,
+            student_id=row.student_id,
+            branch=row.branch,
+            current_grade=row.current_grade,
+            recorded_completed_hours=float(row.completed_hours),
+            expected_completed_hours=float(row.expected_completed),
+            recorded_remaining_hours=float(row.remaining_hours),
+            expected_remaining_hours=float(row.expected_remaining),
+        )
+        for row in result.all()
+    ]
+
+    fixed = 0
+    if fix and discrepancies:
+        ids = [d.progress_id for d in discrepancies]
+        values = progress_hours_set(_expected_completed_for_row())
+        for start in range(0, len(ids), FIX_CHUNK_SIZE):
+            chunk = await db.execute(
+                update(StudentProgress)
+                .where(StudentProgress.id.in_(ids[start:start + FIX_CHUNK_SIZE]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            fixed += chunk.rowcount
+        await refresh_student_directory(
+            db, select(StudentProgress.student_id).where(StudentProgress.id.in_(ids))
+        )
+        if performed_by:
+            await create_audit_logs(db, [
+                {
+                    "action": AuditAction.HOURS_RECONCILED,
+                    "entity_type": "StudentProgress",
+                    "entity_id": d.progress_id,
+                    "performed_by": performed_by,
+                    "details": f"Saat mutabakati: {d.branch}",
+                    "old_value": str(d.recorded_completed_hours),
+                    "new_value": str(d.expected_completed_hours),
+                }
+                for d in discrepancies
+            ])
+
+    run = HoursReconciliationRun(
+        started_at=started_at,
+        finished_at=utcnow_naive(),
+        since=since,
+        fix=fix,
+        checked=checked,
+        mismatched=len(discrepancies),
+        fixed=fixed,
+    )
+    db.add(run)
+    await db.flush()
+
+    return HoursReconciliationResponse(
+        run_id=run.id,
+        since=since,
+        fix=fix,
+        checked=checked,
+        mismatched=len(discrepancies),
+        fixed=fixed,
+        discrepancies=discrepancies[:DISCREPANCY_REPORT_LIMIT],
+        truncated=len(discrepancies) > DISCREPANCY_REPORT_LIMIT,
+    )
@@ -0,0 +1,119 @@
+"""Derece gereksinimi degisince kalan saatlerin toplu yeniden hesaplanmasi.
+
+StudentProgress.remaining_hours saklanan bir kolondur (dashboard, disa
+aktarim, filtre ve siralama bunu okur). Bir (brans, derece) icin gereken
+saat degistiginde o derecedeki tum satirlar eskir; bu modul onlari etkin
+kural tablosundan (bkz. grade_hours) yeniden hesaplar:
+
+    UPDATE student_progress
+    SET remaining_hours = max(0, required - completed_hours)
+    WHERE branch = :branch AND current_grade = :grade AND id IN (...parca...)
+
+Satirlar id sirasiyla RECOMPUTE_CHUNK_SIZE'lik parcalarda guncellenir; her
+parca kendi transaction'inda commit edilir ve is kaydinin processed sayaci
+ilerler. Boylece buyuk kurumlarda satir kilitleri kisa tutulur ve ilerleme
+GET /api/grades/recompute-jobs/{id} ile izlenebilir. Degeri zaten dogru
+olan satirlar yazilmaz. Ogrenci dizini ayni parcada yenilenir.
+
+Is, istegi karsilayan worker'da arka plan gorevi olarak calisir ve o
+worker'in (az once yeniden yuklenmis) kural tablosunu kullanir.
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.hours_recompute import HoursRecomputeJob, HoursRecomputeStatus
+from app.models.student import StudentProgress
+from app.services.grade_hours import non_negative, required_hours_expr
+from app.services.student_directory import refresh_student_directory
+from app.utils import utcnow_naive
+
+# Parca basina en fazla ilerleme satiri
+RECOMPUTE_CHUNK_SIZE = 1000
+
+
+async def create_recompute_job(
+    db: AsyncSession, branch: str, grade: int, performed_by: str | None
+) -> HoursRecomputeJob:
+    """(brans, derece) icin PENDING bir is kaydi olusturur; commit cagirana aittir."""
+    total = (
+        await db.execute(
+            select(func.count(StudentProgress.id)).where(
+                StudentProgress.branch == branch, StudentProgress.current_grade == grade
+            )
+        )
+    ).scalar_one()
+    job = HoursRecomputeJob(
+        branch=branch,
+        grade=grade,
+        total=total,
+        requested_by=performed_by,
+        created_at=utcnow_naive(),
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def _recompute_chunk(db: AsyncSession, job: HoursRecomputeJob, after_id: str | None) -> str | None:
+    """Bir parcayi gunceller; son islenen id'yi ya da is bittiyse None dondurur."""
+    query = (
+        select(StudentProgress.id)
+        .where(StudentProgress.branch == job.branch, StudentProgress.current_grade == job.grade)
+        .order_by(StudentProgress.id)
+        .limit(RECOMPUTE_CHUNK_SIZE)
+    )
+    if after_id is not None:
+        query = query.where(StudentProgress.id > after_id)
+    ids = list((await db.execute(query)).scalars().all())
+    if not ids:
+        return None
+
+    remaining = non_negative(required_hours_expr() - StudentProgress.completed_hours)
+    result = await db.execute(
+        update(StudentProgress)
+        .where(
+            StudentProgress.id.in_(ids),
+            # Bu arada derecesi degisen satir yeni derecesinin isine aittir
+            StudentProgress.current_grade == job.grade,
+            StudentProgress.remaining_hours != remaining,
+        )
+        .values(remaining_hours=remaining)
+        .returning(StudentProgress.student_id)
+        .execution_options(synchronize_session=False)
+    )
+    student_ids = list(result.scalars().all())
+    if student_ids:
+        await refresh_student_directory(db, student_ids)
+
+    job.processed += len(ids)
+    job.updated += len(student_ids)
+    return ids[-1] if len(ids) == RECOMPUTE_CHUNK_SIZE else None
+
+
+async def run_recompute_job(session_factory: async_sessionmaker, job_id: str) -> None:
+    """Isi sonuna kadar calistirir; hata olursa is FAILED olarak isaretlenir."""
+    async with session_factory() as db:
+        job = await db.get(HoursRecomputeJob, job_id)
+        if job is None or job.status != HoursRecomputeStatus.PENDING.value:
+            return
+        job.status = HoursRecomputeStatus.RUNNING.value
+        job.started_at = utcnow_naive()
+        await db.commit()
+
+        try:
+            after_id = None
+            while True:
+                after_id = await _recompute_chunk(db, job, after_id)
+                await db.commit()
+                if after_id is None:
+                    break
+            job.status = HoursRecomputeStatus.COMPLETED.value
+        except Exception as exc:
+            await db.rollback()
+            await db.refresh(job)
+            job.status = HoursRecomputeStatus.FAILED.value
+            job.error = str(exc)[:1000]
+        job.finished_at = utcnow_naive()
+        # Toplam is sirasinda eklenen/derecesi degisen satirlarla kayabilir
+        job.total = max(job.total, job.processed)
+        await db.commit()
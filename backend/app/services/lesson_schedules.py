@@ -0,0 +1,385 @@
+"""Haftalik ders programlarindan Lesson satiri uretimi.
+
+Normal programlarda tum dersler olusturulurken tek INSERT ile yazilir.
+is_virtual programlarda ise dersler okuma aninda tekrar kuralindan uretilir
+(virtual_occurrences) ve "<schedule_id>@<YYYY-MM-DD>" kimligi tasir; gercek
+Lesson satiri yalnizca ilk yoklamada ya da duzenlemede olusturulur
+(materialize_occurrence). Olusan satir occurrence_date ile tekrara baglanir,
+boylece tarihi degisse de sanal kopyasi tekrar listelenmez.
+"""
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.models.lesson import Lesson
+from app.models.lesson_schedule import LessonSchedule
+from app.models.school import School
+from app.schemas.lesson import LessonResponse
+from app.services.school_scope import UNRESTRICTED, SchoolScope
+from app.utils import utcnow_naive
+
+VIRTUAL_ID_SEPARATOR = "@"
+
+
+def generate_lesson_dates(day_of_week: int, start_dt: date, end_dt: date) -> list[date]:
+    """Generate all dates matching the given day_of_week between start and end."""
+    dates = []
+    current = start_dt
+    # Find the first occurrence of the target day
+    while current.weekday() != day_of_week:
+        current += timedelta(days=1)
+    # Iterate weekly
+    while current <= end_dt:
+        dates.append(current)
+        current += timedelta(days=7)
+    return dates
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def occurrence_datetime(schedule: LessonSchedule, d: date) -> datetime:
+    """Programin d gunundeki dersinin baslangic zamani."""
+    hour, minute = schedule.start_time.split(":")
+    return datetime(d.year, d.month, d.day, int(hour), int(minute))
+
+
+async def existing_lesson_dates(db: AsyncSession, schedule_id: str) -> set[date]:
+    """Program icin zaten olusturulmus tekrarlarin gunleri (tek SELECT).
+
+    Tasinan ders kendi tekrar gununu (occurrence_date) tutar; tarihi degisse
+    de o gun tekrar uretilmez. occurrence_date'i olmayan eski satirlarda
+    lesson_date kullanilir.
+    """
+    result = await db.execute(
+        select(func.coalesce(Lesson.occurrence_date, Lesson.lesson_date))
+        .where(Lesson.schedule_id == schedule_id)
+    )
+    return {_as_date(day) for day in result.scalars().all()}
+
+
+async def insert_schedule_lessons(
+    db: AsyncSession,
+    schedule: LessonSchedule,
+    dates: list[date],
+    created_by: str,
+) -> int:
+    """Verilen gunler icin programin derslerini tek cok satirli INSERT ile ekler.
+
+    ORM nesnesi olusturulmaz; eklenen ders sayisini dondurur. Commit
+    cagirana aittir.
+    """
+    if not dates:
+        return 0
+    now = utcnow_naive()
+    duration = float(schedule.duration_hours)
+    await db.execute(insert(Lesson), [
+        {
+            "id": str(uuid.uuid4()),
+            "school_id": schedule.school_id,
+            "branch": schedule.branch,
+            "lesson_type": schedule.lesson_type,
+            "lesson_date": occurrence_datetime(schedule, d),
+            "duration_hours": duration,
+            "created_by": created_by,
+            "notes": schedule.notes,
+            "schedule_id": schedule.id,
+            "occurrence_date": occurrence_datetime(schedule, d),
+            "created_at": now,
+        }
+        for d in dates
+    ])
+    return len(dates)
+
+
+async def delete_future_unattended_lessons(db: AsyncSession, schedule_id: str) -> int:
+    """Programin yoklamasi alinmamis gelecek derslerini tek DELETE ile siler.
+
+    Dersler yuklenmez; silinen satir sayisini dondurur. Commit cagirana aittir.
+    """
+    result = await db.execute(
+        delete(Lesson)
+        .where(
+            Lesson.schedule_id == schedule_id,
+            Lesson.lesson_date > utcnow_naive(),
+            ~exists().where(Attendance.lesson_id == Lesson.id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def virtual_lesson_id(schedule_id: str, d: date) -> str:
+    return f"{schedule_id}{VIRTUAL_ID_SEPARATOR}{d.isoformat()}"
+
+
+def parse_virtual_lesson_id(lesson_id: str) -> tuple[str, date] | None:
+    schedule_id, sep, day = lesson_id.rpartition(VIRTUAL_ID_SEPARATOR)
+    if not sep or not schedule_id:
+        return None
+    try:
+        return schedule_id, date.fromisoformat(day)
+    except ValueError:
+        return None
+
+
+def _dates_newest_first(day_of_week: int, start_dt: date, end_dt: date):
+    """generate_lesson_dates'in tersi; liste kurmadan en yeni tarihten baslar."""
+    current = end_dt - timedelta(days=(end_dt.weekday() - day_of_week) % 7)
+    while current >= start_dt:
+        yield current
+        current -= timedelta(days=7)
+
+
+def _count_lesson_dates(day_of_week: int, start_dt: date, end_dt: date) -> int:
+    """generate_lesson_dates(...) uzunlugu, tarihler uretilmeden."""
+    first = start_dt + timedelta(days=(day_of_week - start_dt.weekday()) % 7)
+    if first > end_dt:
+        return 0
+    return (end_dt - first).days // 7 + 1
+
+
+def _virtual_schedule_query(
+    scope: SchoolScope,
+    school_id: str | None,
+    school_ids: list[str] | None,
+    branch: str | None,
+    lesson_type: str | None,
+    schedule_id: str | None,
+):
+    query = (
+        select(LessonSchedule, School.name)
+        .outerjoin(School, School.id == LessonSchedule.school_id)
+        .where(LessonSchedule.is_virtual.is_(True), LessonSchedule.is_active.is_(True))
+    )
+    query = scope.apply(query, LessonSchedule.school_id)
+    if school_id:
+        query = query.where(LessonSchedule.school_id == school_id)
+    if school_ids is not None:
+        query = query.where(LessonSchedule.school_id.in_(school_ids))
+    if branch:
+        query = query.where(LessonSchedule.branch == branch)
+    if lesson_type:
+        query = query.where(LessonSchedule.lesson_type == lesson_type)
+    if schedule_id:
+        query = query.where(LessonSchedule.id == schedule_id)
+    return query
+
+
+async def virtual_occurrences(
+    db: AsyncSession,
+    *,
+    scope: SchoolScope = UNRESTRICTED,
+    school_id: str | None = None,
+    school_ids: list[str] | None = None,
+    branch: str | None = None,
+    lesson_type: str | None = None,
+    schedule_id: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    before: tuple[datetime, str] | None = None,
+    per_schedule_limit: int | None = None,
+) -> list[LessonResponse]:
+    """Aktif sanal programlarin henuz Lesson satiri olmayan dersleri, tarih sirali.
+
+    Iki sorgu atilir: filtreye uyan sanal programlar ve bu programlarin
+    olusturulmus tekrar tarihleri. Gerisi bellekte uretilir.
+
+    Sayfali liste icin before (lesson_date, id) siralamasinda imlecten
+    onceki dersleri birakir; per_schedule_limit verilirse her programin
+    yalnizca en yeni o kadar dersi uretilir (tarihler yeniden eskiye
+    taranir), boylece uzun programlarda sayfa maliyeti sayfa boyutuyla
+    sinirli kalir.
+    """
+    if before is not None:
+        date_to = before[0] if date_to is None else min(date_to, before[0])
+    query = _virtual_schedule_query(scope, school_id, school_ids, branch, lesson_type, schedule_id)
+    if date_from is not None:
+        query = query.where(LessonSchedule.end_date >= datetime.combine(date_from.date(), datetime.min.time()))
+    if date_to is not None:
+        query = query.where(LessonSchedule.start_date <= date_to)
+    schedules = (await db.execute(query)).all()
+    if not schedules:
+        return []
+
+    materialized_query = select(Lesson.schedule_id, Lesson.occurrence_date).where(
+        Lesson.schedule_id.in_([schedule.id for schedule, _ in schedules]),
+        Lesson.occurrence_date.is_not(None),
+    )
+    if date_from is not None:
+        materialized_query = materialized_query.where(Lesson.occurrence_date >= date_from)
+    if date_to is not None:
+        materialized_query = materialized_query.where(Lesson.occurrence_date <= date_to)
+    materialized = set((await db.execute(materialized_query)).all())
+
+    items = []
+    for schedule, school_name in schedules:
+        start = _as_date(schedule.start_date)
+        end = _as_date(schedule.end_date)
+        if date_from is not None:
+            start = max(start, date_from.date())
+        if date_to is not None:
+            end = min(end, date_to.date())
+        produced = 0
+        for d in _dates_newest_first(schedule.day_of_week, start, end):
+            if per_schedule_limit is not None and produced >= per_schedule_limit:
+                break
+            lesson_date = occurrence_datetime(schedule, d)
+            if (date_from is not None and lesson_date < date_from) or (
+                date_to is not None and lesson_date > date_to
+            ):
+                continue
+            if (schedule.id, lesson_date) in materialized:
+                continue
+            lesson_id = virtual_lesson_id(schedule.id, d)
+            if before is not None and (lesson_date, lesson_id) >= before:
+                continue
+            produced += 1
+            items.append(LessonResponse(
+                id=lesson_id,
+                school_id=str(schedule.school_id),
+                branch=schedule.branch,
+                lesson_type=schedule.lesson_type,
+                lesson_date=lesson_date,
+                duration_hours=float(schedule.duration_hours),
+                created_by=str(schedule.created_by),
+                notes=schedule.notes,
+                created_at=schedule.created_at,
+                school_name=school_name,
+                schedule_id=str(schedule.id),
+                is_virtual=True,
+            ))
+    items.sort(key=lambda item: item.lesson_date)
+    return items
+
+
+async def count_virtual_occurrences(
+    db: AsyncSession,
+    *,
+    scope: SchoolScope = UNRESTRICTED,
+    school_id: str | None = None,
+    branch: str | None = None,
+    lesson_type: str | None = None,
+    schedule_id: str | None = None,
+) -> int:
+    """virtual_occurrences(...) ile ayni filtrede sanal ders sayisi.
+
+    Dersler uretilmez: her program icin tekrar sayisi tarih araligindan
+    hesaplanir, olusturulmus tekrarlar (yalnizca gercek Lesson satirlari
+    okunur) bundan dusulur.
+    """
+    query = _virtual_schedule_query(scope, school_id, None, branch, lesson_type, schedule_id)
+    schedules = [schedule for schedule, _ in (await db.execute(query)).all()]
+    if not schedules:
+        return 0
+
+    result = await db.execute(
+        select(Lesson.schedule_id, Lesson.occurrence_date).where(
+            Lesson.schedule_id.in_([schedule.id for schedule in schedules]),
+            Lesson.occurrence_date.is_not(None),
+        )
+    )
+    materialized: dict[str, set[datetime]] = {}
+    for sid, occurrence in result.all():
+        materialized.setdefault(sid, set()).add(occurrence)
+
+    total = 0
+    for schedule in schedules:
+        start = _as_date(schedule.start_date)
+        end = _as_date(schedule.end_date)
+        total += _count_lesson_dates(schedule.day_of_week, start, end)
+        # Yalnizca programin hala urettigi bir tekrara denk gelen satirlar dusulur
+        total -= sum(
+            1
+            for occurrence in materialized.get(schedule.id, ())
+            if start <= occurrence.date() <= end
+            and occurrence.weekday() == schedule.day_of_week
+            and occurrence == occurrence_datetime(schedule, occurrence.date())
+        )
+    return total
+
+
+async def resolve_occurrence(db: AsyncSession, lesson_id: str) -> tuple[LessonSchedule, datetime] | None:
+    """Sanal ders kimligini (program, ders zamani) ikilisine cevirir.
+
+    Kimlik gecersizse, program sanal/aktif degilse ya da tarih programin bir
+    tekrari degilse None dondurur.
+    """
+    parsed = parse_virtual_lesson_id(lesson_id)
+    if parsed is None:
+        return None
+    schedule_id, d = parsed
+    result = await db.execute(
+        select(LessonSchedule).where(
+            LessonSchedule.id == schedule_id,
+            LessonSchedule.is_virtual.is_(True),
+            LessonSchedule.is_active.is_(True),
+        )
+    )
+    schedule = result.scalar_one_or_none()
+    if schedule is None:
+        return None
+    if d.weekday() != schedule.day_of_week or not (
+        _as_date(schedule.start_date) <= d <= _as_date(schedule.end_date)
+    ):
+        return None
+    return schedule, occurrence_datetime(schedule, d)
+
+
+def _insert_ignoring_conflicts(db: AsyncSession):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(Lesson).on_conflict_do_nothing(
+        index_elements=[Lesson.schedule_id, Lesson.occurrence_date]
+    )
+
+
+async def materialize_occurrence(
+    db: AsyncSession,
+    schedule: LessonSchedule,
+    occurrence: datetime,
+    created_by: str,
+) -> Lesson:
+    """Sanal dersin Lesson satirini olusturur ya da zaten varsa onu dondurur.
+
+    Ayni tekrari ayni anda olusturan iki istek uq_schedule_occurrence
+    sayesinde tek satirda bulusur. Commit cagirana aittir.
+    """
+    await db.execute(
+        _insert_ignoring_conflicts(db).values(
+            id=str(uuid.uuid4()),
+            school_id=schedule.school_id,
+            branch=schedule.branch,
+            lesson_type=schedule.lesson_type,
+            lesson_date=occurrence,
+            duration_hours=float(schedule.duration_hours),
+            created_by=created_by,
+            notes=schedule.notes,
+            schedule_id=schedule.id,
+            occurrence_date=occurrence,
+            created_at=utcnow_naive(),
+        )
+    )
+    result = await db.execute(
+        select(Lesson).where(
+            Lesson.schedule_id == schedule.id,
+            Lesson.occurrence_date == occurrence,
+        )
+    )
+    return result.scalar_one()
+
+
+async def get_or_materialize_lesson(db: AsyncSession, lesson_id: str, created_by: str) -> Lesson | None:
+    """lesson_id gercek bir dersse onu, gecerli bir sanal dersse olusturulmus halini dondurur."""
+    result = await db.execute(select(Lesson).where(Lesson.id == lesson_id))
+    lesson = result.scalar_one_or_none()
+    if lesson is not None:
+        return lesson
+    occurrence = await resolve_occurrence(db, lesson_id)
+    if occurrence is None:
+        return None
+    return await materialize_occurrence(db, *occurrence, created_by)
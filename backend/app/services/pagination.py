@@ -0,0 +1,126 @@
+"""Liste endpoint'leri icin keyset (cursor) sayfalama.
+
+offset/limit derin sayfalarda atlanan tum satirlari tarar; cursor ise son
+gorulen (siralama degeri, id) ikilisinden devam eder ve her sayfa ayni
+maliyettedir. Cursor istemci icin opak bir base64 metindir:
+
+    keyset = Keyset(Student.created_at, Student.id)
+    page = await paginate(db, query, keyset, skip=skip, limit=limit, cursor=cursor)
+    ...StudentListResponse(items=..., total=..., next_cursor=page.next_cursor)
+
+skip (offset) geriye uyumluluk icin calismaya devam eder; cursor verildiginde
+yok sayilir. Toplam sayi include_total=false ile atlanabilir. Alaka sirali
+aramalar (rank) skip/limit ile sayfalanir, cursor uretmez.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Mapping, NamedTuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True)
+class Keyset:
+    sort_column: Any
+    id_column: Any
+    descending: bool = True
+
+    def _sort(self, value, dialect: str | None):
+        # SQLite tarihleri metin saklar: server_default ile yazilanlarda kesirli
+        # saniye yok, bagli parametrede var. julianday iki bicimi esitler.
+        if dialect == "sqlite" and self.sort_column.type.python_type is datetime:
+            return func.julianday(value)
+        return value
+
+    def order_by(self, dialect: str | None = None) -> tuple:
+        sort = self._sort(self.sort_column, dialect)
+        if self.descending:
+            return sort.desc(), self.id_column.desc()
+        return sort.asc(), self.id_column.asc()
+
+    def encode(self, sort_value, id_value) -> str:
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        raw = json.dumps([sort_value, str(id_value)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            sort_value, id_value = json.loads(base64.urlsafe_b64decode(padded))
+            if self.sort_column.type.python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci")
+        return sort_value, id_value
+
+    def after(self, sort_value, id_value, dialect: str | None = None):
+        """(sort, id) siralamasinda verilen degerlerden sonra gelen satirlar."""
+        column = self._sort(self.sort_column, dialect)
+        value = self._sort(sort_value, dialect)
+        if self.descending:
+            return or_(column < value, and_(column == value, self.id_column < id_value))
+        return or_(column > value, and_(column == value, self.id_column > id_value))
+
+    def cursor_for(self, obj) -> str:
+        if isinstance(obj, Mapping):
+            return self.encode(obj[self.sort_column.key], obj[self.id_column.key])
+        return self.encode(getattr(obj, self.sort_column.key), getattr(obj, self.id_column.key))
+
+
+class Page(NamedTuple):
+    rows: list
+    total: int | None
+    next_cursor: str | None
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keyset: Keyset,
+    *,
+    skip: int = 0,
+    limit: int,
+    cursor: str | None = None,
+    count_query: Select | None = None,
+    scalars: bool = True,
+    mappings: bool = False,
+    rank=None,
+) -> Page:
+    """query'nin bir sayfasini dondurur.
+
+    limit+1 satir okunarak sonraki sayfanin varligi ek sorgu olmadan anlasilir.
+    count_query verilmezse toplam hesaplanmaz (None). scalars=False ise satirlar
+    (entity, ...) tuple'lari olarak dondurulur; cursor ilk elemandan uretilir.
+    mappings=True projeksiyon sorgulari icindir (bkz. projection.project):
+    satirlar kolon adiyla erisilen RowMapping'lerdir.
+    rank verilirse satirlar once ona gore siralanir.
+    """
+    dialect = db.get_bind().dialect.name
+    if rank is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Arama sonuçlarında sayfa imleci kullanılamaz")
+        query = query.order_by(rank)
+    if cursor:
+        query = query.where(keyset.after(*keyset.decode(cursor), dialect))
+    elif skip:
+        query = query.offset(skip)
+    result = await db.execute(query.order_by(*keyset.order_by(dialect)).limit(limit + 1))
+    if mappings:
+        rows = result.mappings().all()
+    else:
+        rows = result.scalars().unique().all() if scalars else result.unique().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1] if scalars or mappings else rows[-1][0]
+        if rank is None:
+            next_cursor = keyset.cursor_for(last)
+
+    total = (await db.execute(count_query)).scalar() if count_query is not None else None
+    return Page(rows=list(rows), total=total, next_cursor=next_cursor)
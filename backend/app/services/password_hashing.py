@@ -0,0 +1,86 @@
+"""Bcrypt islemleri icin sinirli thread havuzu.
+
+bcrypt hash/verify cagrisi maliyet faktorune gore yuzlerce milisaniye surer;
+async handler icinde dogrudan cagrilirsa worker'in event loop'unu kilitler ve
+ayni worker'daki diger tum istekler (ornegin yoklama alma) bekler. bcrypt
+hesaplama sirasinda GIL'i biraktigi icin islemler ayri thread'lerde paralel
+calisir.
+
+Ayni anda en fazla PASSWORD_HASH_WORKERS islem calisir; PASSWORD_HASH_MAX_QUEUE
+kadar islem sirada bekleyebilir, fazlasi 503 ile reddedilir. Sira derinligi
+ve sayaclar hashing_stats() ile okunur (bkz. GET /api/dashboard/password-hashing,
+yalnizca admin).
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_in_flight = 0
+_stats = {
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "max_in_flight_seen": 0,
+}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt",
+        )
+    return _executor
+
+
+async def run_hashing(func: Callable[..., T], *args) -> T:
+    """func(*args)'i bcrypt havuzunda calistirir; sira doluysa 503 firlatir."""
+    global _in_flight
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+    if _in_flight >= capacity:
+        _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin",
+            headers={"Retry-After": "1"},
+        )
+
+    _in_flight += 1
+    _stats["max_in_flight_seen"] = max(_stats["max_in_flight_seen"], _in_flight)
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(_get_executor(), func, *args)
+        _stats["completed"] += 1
+        return result
+    except BaseException:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _in_flight -= 1
+
+
+def hashing_stats() -> dict:
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "workers": workers,
+        "in_flight": _in_flight,
+        "queued": max(0, _in_flight - workers),
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        **_stats,
+    }
+
+
+def shutdown_hashing_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
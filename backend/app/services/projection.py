@@ -0,0 +1,73 @@
+"""Liste endpoint'leri icin seyrek alan secimi (fields=).
+
+Secim kutulari gibi istemciler cogu zaman sadece id ve ad ister; tam liste
+ise her satir icin ORM nesnesi, iliski yuklemesi ve Pydantic response
+uretir. fields=id,name verildiginde endpoint ayni filtrelerle sadece bu
+kolonlari Core select() ile okur ve satirlari dogrudan JSON'a yazar:
+
+    columns = parse_fields(fields, STUDENT_FIELDS)
+    if columns:
+        page = await paginate(db, project(query, columns, keyset), keyset, ..., mappings=True)
+        return projected_response(page.rows, columns, page.total, page.next_cursor)
+
+Alan adlari tam response'taki adlardir; iliskili veri (or. school_name)
+ilisik alt sorguyla okunur. Liste tipindeki alanlar (progress, media)
+secilemez.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, inspect
+
+
+def column_fields(model, schema: type[BaseModel]) -> dict[str, Any]:
+    """schema'daki alanlardan model'de ayni adli kolonu olanlar: {ad: kolon}."""
+    columns = inspect(model).columns
+    return {name: getattr(model, name) for name in schema.model_fields if name in columns}
+
+
+def parse_fields(fields: str | None, available: dict[str, Any]) -> dict[str, Any] | None:
+    """fields parametresini {alan: SQL ifadesi}'ne cevirir; verilmemisse None."""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not names:
+        raise HTTPException(status_code=400, detail="fields en az bir alan içermeli")
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Seçilemeyen alan: {', '.join(unknown)}")
+    return {name: available[name] for name in names}
+
+
+def project(query: Select, columns: dict[str, Any], keyset=None) -> Select:
+    """query'nin filtreleri korunarak sadece secilen kolonlarini okuyan hali.
+
+    Keyset verilirse siralama ve cursor icin gereken kolonlar (istenmemisse)
+    kendi adlariyla eklenir; projected_response bunlari yazmaz.
+    """
+    selected = [expression.label(name) for name, expression in columns.items()]
+    if keyset is not None:
+        for column in (keyset.sort_column, keyset.id_column):
+            if column.key not in columns:
+                selected.append(column.label(column.key))
+    return query.with_only_columns(*selected)
+
+
+def plain_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def projected_response(rows, columns: dict[str, Any], total: int | None, next_cursor: str | None = None):
+    return JSONResponse({
+        "items": [{name: plain_value(row[name]) for name in columns} for row in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    })
@@ -0,0 +1,50 @@
+"""Istegi yapan kullanicinin erisebildigi okullar.
+
+MANAGER yalnizca SchoolManager ile atandigi okullari gorebilir; diger roller
+okul bazinda kisitlanmaz (USER/MEMBER kisitlari endpoint'lerin kendi isidir).
+Okul kimlikleri principal ile birlikte onbellege alinir (bkz. app/principal.py),
+bu yuzden scope kurmak veritabanina gitmez:
+
+    scope = school_scope(current_user)
+    if not scope.allows(lesson.school_id):
+        raise HTTPException(status_code=403, ...)
+    query = scope.apply(query, Student.school_id)
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import Select, true
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.user import UserRole
+from app.principal import Principal
+
+
+@dataclass(frozen=True)
+class SchoolScope:
+    restricted: bool
+    school_ids: frozenset[str] = frozenset()
+
+    def allows(self, school_id: str | None) -> bool:
+        if not self.restricted:
+            return True
+        return school_id is not None and str(school_id) in self.school_ids
+
+    def filter(self, column) -> ColumnElement:
+        """column icin WHERE kosulu; kisitsiz scope'ta her zaman dogru."""
+        if not self.restricted:
+            return true()
+        return column.in_(sorted(self.school_ids))
+
+    def apply(self, query: Select, column) -> Select:
+        if not self.restricted:
+            return query
+        return query.where(self.filter(column))
+
+
+UNRESTRICTED = SchoolScope(restricted=False)
+
+
+def school_scope(principal: Principal | None) -> SchoolScope:
+    if principal is None or principal.role != UserRole.MANAGER.value:
+        return UNRESTRICTED
+    return SchoolScope(restricted=True, school_ids=principal.managed_school_ids)
@@ -0,0 +1,159 @@
+"""Seminer sinav sonuclarinin toplu uygulanmasi.
+
+Degerlendirme ogrenci sayisindan bagimsiz sabit sayida sorguyla yapilir:
+etkinligin sinav kayitlari ve ilgili StudentProgress satirlari iki sorguda
+okunur, derece gecisleri bellekte hesaplanir; ilerleme guncellemeleri,
+SeminarEvaluation ve audit satirlari toplu ifadelerle yazilir.
+
+Ilerleme satirlari FOR UPDATE ile okunur (PostgreSQL); okuma ile yazma
+arasinda ayni satira yapilan bir derece degisikligi ezilmez, beklenir.
+"""
+import uuid
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit_log import AuditAction
+from app.models.event import EventRegistration, RegistrationStatus, SeminarEvaluation
+from app.models.student import Branch, StudentProgress
+from app.schemas.event import SeminarEvaluationResult
+from app.services.audit import create_audit_logs
+from app.services.grade_hours import get_hours_for_grade
+from app.services.student_directory import refresh_student_directory
+from app.utils import utcnow_naive
+
+
+async def _exam_branches(db: AsyncSession, event_id: str, student_ids: set[str]) -> dict[str, list[str]]:
+    """{ogrenci: sinava girdigi branslar} (kesinlesmis will_take_exam kayitlari)."""
+    result = await db.execute(
+        select(
+            EventRegistration.student_id,
+            EventRegistration.exam_branch_wt,
+            EventRegistration.exam_branch_escrima,
+        ).where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.will_take_exam == True,
+            EventRegistration.status == RegistrationStatus.CONFIRMED.value,
+            EventRegistration.student_id.in_(student_ids),
+        )
+    )
+    return {
+        student_id: [
+            branch.value
+            for flag, branch in ((wt, Branch.WING_TSUN), (escrima, Branch.ESCRIMA))
+            if flag
+        ]
+        for student_id, wt, escrima in result.all()
+    }
+
+
+async def _progress_rows(db: AsyncSession, student_ids) -> dict[tuple[str, str], tuple[str, int]]:
+    """{(ogrenci, brans): (progress_id, derece)}; satirlar kilitlenir."""
+    result = await db.execute(
+        select(
+            StudentProgress.id,
+            StudentProgress.student_id,
+            StudentProgress.branch,
+            StudentProgress.current_grade,
+        )
+        .where(StudentProgress.student_id.in_(student_ids))
+        .with_for_update()
+    )
+    return {
+        (student_id, branch): (progress_id, grade)
+        for progress_id, student_id, branch, grade in result.all()
+    }
+
+
+async def apply_seminar_results(
+    db: AsyncSession,
+    event_id: str,
+    passed_student_ids: list[str],
+    failed_student_ids: list[str],
+    performed_by: str,
+) -> list[SeminarEvaluationResult]:
+    """Sinav sonuclarini uygular; her (ogrenci, brans) icin sonucu dondurur.
+
+    Gecen ogrencinin derecesi bir artar ve saatleri yeni derece icin
+    sifirlanir; ilerleme kaydi yoksa atlanir. Kalan ogrencinin derecesi
+    degismez, sadece degerlendirme kaydi olusur. Sinav kaydi olmayan
+    ogrenciler yok sayilir. Commit cagirana aittir.
+    """
+    passed = set(passed_student_ids)
+    branches = await _exam_branches(db, event_id, passed | set(failed_student_ids))
+    progress = await _progress_rows(db, list(branches)) if branches else {}
+
+    results: list[SeminarEvaluationResult] = []
+    progress_ids: dict[tuple[str, str], str | None] = {}
+    for student_id in dict.fromkeys([*passed_student_ids, *failed_student_ids]):
+        for branch in branches.get(student_id, []):
+            progress_id, grade = progress.get((student_id, branch), (None, 0))
+            if student_id in passed:
+                if progress_id is None:
+                    continue
+                grade_after = grade + 1
+            else:
+                grade_after = grade
+            progress_ids[(student_id, branch)] = progress_id
+            results.append(SeminarEvaluationResult(
+                student_id=student_id,
+                branch=branch,
+                passed=student_id in passed,
+                grade_before=grade,
+                grade_after=grade_after,
+            ))
+    if not results:
+        return results
+
+    promotions = [
+        {
+            "id": progress_ids[(r.student_id, r.branch)],
+            "current_grade": r.grade_after,
+            "completed_hours": 0,
+            "remaining_hours": get_hours_for_grade(r.grade_after, r.branch)["required"],
+        }
+        for r in results
+        if r.passed
+    ]
+    if promotions:
+        # Birincil anahtara gore toplu UPDATE (executemany)
+        await db.execute(update(StudentProgress), promotions)
+
+    now = utcnow_naive()
+    await db.execute(insert(SeminarEvaluation), [
+        {
+            "id": str(uuid.uuid4()),
+            "event_id": event_id,
+            "student_id": r.student_id,
+            "branch": r.branch,
+            "passed": r.passed,
+            "grade_before": r.grade_before,
+            "grade_after": r.grade_after,
+            "evaluated_by": performed_by,
+            "evaluated_at": now,
+            "created_at": now,
+        }
+        for r in results
+    ])
+
+    await create_audit_logs(db, [
+        {
+            "action": AuditAction.SEMINAR_EVALUATED,
+            "entity_type": "StudentProgress",
+            "entity_id": progress_ids[(r.student_id, r.branch)] or r.student_id,
+            "performed_by": performed_by,
+            "details": (
+                f"Seminer sinavi gecti: {r.branch} {r.grade_before} -> {r.grade_after}"
+                if r.passed
+                else f"Seminer sinavi kaldi: {r.branch} derece {r.grade_before}"
+            ),
+            "old_value": str(r.grade_before),
+            "new_value": str(r.grade_after),
+        }
+        for r in results
+    ])
+
+    promoted = list({r.student_id for r in results if r.passed})
+    if promoted:
+        await refresh_student_directory(db, promoted)
+    return results
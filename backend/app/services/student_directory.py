@@ -0,0 +1,175 @@
+"""student_directory okuma modelinin bakimi.
+
+Ogrenci listeleri (list_students, list_pending_students) ve mail alici
+cozumlemesi Student + User + School + iki StudentProgress satirini tek
+tablodan okur. Bu tablodaki satir kaynak tablolardan tek INSERT ... SELECT
+ile yeniden hesaplanir; kalan saat ve sinav uygunlugu da ayni sorguda
+derece tablosundan uretilir.
+
+Ogrenciyi, kullanicisini, okulunu ya da ilerlemesini degistiren her islem
+commit'ten once refresh_student_directory cagirir; boylece okuma modeli ayni
+transaction'da guncellenir:
+
+    student.school_id = data.school_id
+    await refresh_student_directory(db, [student.id])
+    await db.commit()
+"""
+from sqlalchemy import and_, delete, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.school import School
+from app.models.student import Branch, Student, StudentProgress
+from app.models.student_directory import StudentDirectory
+from app.models.user import User
+from app.schemas.student import StudentProgressResponse, StudentResponse
+from app.services.grade_hours import exam_eligibility_expr, non_negative, required_hours_expr
+
+# Brans -> student_directory kolon oneki
+BRANCH_COLUMN_PREFIXES = {
+    Branch.WING_TSUN.value: "wt",
+    Branch.ESCRIMA.value: "escrima",
+}
+
+
+def branch_column(branch: str, field: str):
+    """Bransin student_directory kolonu (or. ESCRIMA, "grade" -> escrima_grade); bilinmeyen bransta None."""
+    prefix = BRANCH_COLUMN_PREFIXES.get(branch)
+    return getattr(StudentDirectory, f"{prefix}_{field}") if prefix else None
+
+
+def directory_rows():
+    """student_directory satirlarini kaynak tablolardan ureten SELECT.
+
+    Kolon adlari StudentDirectory ile aynidir; kullanicisi olmayan ogrenci
+    satir uretmez.
+    """
+    columns = [
+        Student.id.label("student_id"),
+        Student.user_id,
+        Student.school_id,
+        Student.created_at,
+        User.first_name,
+        User.last_name,
+        User.email,
+        User.status.label("user_status"),
+        User.role.label("user_role"),
+        School.name.label("school_name"),
+        Student.date_of_birth,
+        Student.emergency_contact,
+        Student.emergency_phone,
+        Student.notes,
+    ]
+    progress_joins = []
+    for branch, prefix in BRANCH_COLUMN_PREFIXES.items():
+        progress = aliased(StudentProgress, name=f"{prefix}_progress")
+        remaining = required_hours_expr(progress.current_grade, progress.branch) - progress.completed_hours
+        columns += [
+            progress.id.label(f"{prefix}_progress_id"),
+            progress.current_grade.label(f"{prefix}_grade"),
+            progress.completed_hours.label(f"{prefix}_completed_hours"),
+            non_negative(remaining).label(f"{prefix}_remaining_hours"),
+            exam_eligibility_expr(progress.current_grade, progress.completed_hours, progress.branch).label(
+                f"{prefix}_exam_eligibility"
+            ),
+        ]
+        progress_joins.append(
+            (progress, and_(progress.student_id == Student.id, progress.branch == branch))
+        )
+
+    query = (
+        select(*columns)
+        .join(User, User.id == Student.user_id)
+        .outerjoin(School, School.id == Student.school_id)
+    )
+    for progress, onclause in progress_joins:
+        query = query.outerjoin(progress, onclause)
+    return query
+
+
+def _upsert(db: AsyncSession, rows):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    names = [column.name for column in rows.selected_columns]
+    stmt = dialect.insert(StudentDirectory).from_select(names, rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[StudentDirectory.student_id],
+        set_={name: stmt.excluded[name] for name in names if name != "student_id"},
+    )
+
+
+def students_of_user(user_id: str):
+    return select(Student.id).where(Student.user_id == user_id)
+
+
+def students_of_school(school_id: str):
+    return select(Student.id).where(Student.school_id == school_id)
+
+
+async def refresh_student_directory(db: AsyncSession, student_ids) -> None:
+    """Verilen ogrencilerin student_directory satirlarini yeniden hesaplar.
+
+    student_ids bir liste ya da Student.id donduren bir alt sorgu olabilir.
+    Bekleyen ORM degisiklikleri once flush edilir. Kaynak satiri kalmayan
+    (silinmis) ogrencilerin satiri silinir. Commit cagirana aittir.
+    """
+    await db.flush()
+    await db.execute(_upsert(db, directory_rows().where(Student.id.in_(student_ids))))
+    await db.execute(
+        delete(StudentDirectory)
+        .where(
+            StudentDirectory.student_id.in_(student_ids),
+            ~exists().where(Student.id == StudentDirectory.student_id, User.id == Student.user_id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rebuild_student_directory(db: AsyncSession | AsyncConnection) -> int:
+    """Tum tabloyu bastan doldurur (ilk kurulum / onarim). Satir sayisini dondurur."""
+    await db.execute(delete(StudentDirectory).execution_options(synchronize_session=False))
+    rows = directory_rows()
+    await db.execute(insert(StudentDirectory).from_select(
+        [column.name for column in rows.selected_columns], rows
+    ))
+    return (await db.execute(select(func.count()).select_from(StudentDirectory))).scalar_one()
+
+
+def directory_to_response(row: StudentDirectory) -> StudentResponse:
+    progress = []
+    for branch, prefix in BRANCH_COLUMN_PREFIXES.items():
+        progress_id = getattr(row, f"{prefix}_progress_id")
+        if progress_id is None:
+            continue
+        progress.append(StudentProgressResponse(
+            id=str(progress_id),
+            branch=branch,
+            current_grade=getattr(row, f"{prefix}_grade"),
+            completed_hours=float(getattr(row, f"{prefix}_completed_hours")),
+            remaining_hours=float(getattr(row, f"{prefix}_remaining_hours")),
+            exam_eligibility=getattr(row, f"{prefix}_exam_eligibility"),
+        ))
+    return StudentResponse(
+        id=str(row.student_id),
+        user_id=str(row.user_id),
+        school_id=str(row.school_id),
+        date_of_birth=row.date_of_birth,
+        emergency_contact=row.emergency_contact,
+        emergency_phone=row.emergency_phone,
+        notes=row.notes,
+        created_at=row.created_at,
+        user_name=f"{row.first_name} {row.last_name}",
+        user_email=row.email,
+        school_name=row.school_name,
+        progress=progress,
+    )
+
+
+async def get_directory_response(db: AsyncSession, student_id: str) -> StudentResponse | None:
+    result = await db.execute(
+        select(StudentDirectory)
+        .where(StudentDirectory.student_id == student_id)
+        .execution_options(populate_existing=True)
+    )
+    row = result.scalar_one_or_none()
+    return directory_to_response(row) if row is not None else None
@@ -0,0 +1,208 @@
+"""Ogrenci listesinin CSV / NDJSON / XLSX olarak akitilmasi.
+
+Satirlar student_directory'den server-side cursor ile (stream + yield_per)
+EXPORT_BATCH_SIZE'lik parcalar halinde okunur ve her parca hemen
+serilestirilip yazilir; bellek kullanimi satir sayisindan bagimsizdir.
+
+FastAPI istek oturumunu (get_db) response govdesi akmaya baslamadan kapatir;
+bu yuzden akis ayni engine uzerinde kendi oturumunu acar. Tum export tek bir
+sorgu/snapshot'tan okunur, sayfalamadaki gibi arada degisen veriyle kaymaz.
+
+XLSX icin ek bagimlilik kullanilmaz: calisma kitabi zipfile ile, sayfa XML'i
+satir satir sikistirilarak yazilir (bkz. _xlsx).
+"""
+import csv
+import io
+import json
+import re
+import zipfile
+from typing import AsyncIterator
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.models.student_directory import StudentDirectory
+from app.services.projection import plain_value
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Export kolonlari (baslik = kolon adi)
+EXPORT_COLUMNS = [
+    StudentDirectory.student_id,
+    StudentDirectory.first_name,
+    StudentDirectory.last_name,
+    StudentDirectory.email,
+    StudentDirectory.user_status,
+    StudentDirectory.school_id,
+    StudentDirectory.school_name,
+    StudentDirectory.date_of_birth,
+    StudentDirectory.emergency_contact,
+    StudentDirectory.emergency_phone,
+    StudentDirectory.created_at,
+    StudentDirectory.wt_grade,
+    StudentDirectory.wt_completed_hours,
+    StudentDirectory.wt_remaining_hours,
+    StudentDirectory.wt_exam_eligibility,
+    StudentDirectory.escrima_grade,
+    StudentDirectory.escrima_completed_hours,
+    StudentDirectory.escrima_remaining_hours,
+    StudentDirectory.escrima_exam_eligibility,
+]
+EXPORT_HEADER = [column.key for column in EXPORT_COLUMNS]
+
+
+async def _row_batches(bind: AsyncEngine, query: Select) -> AsyncIterator[list]:
+    async with AsyncSession(bind) as session:
+        result = await session.stream(
+            query.with_only_columns(*EXPORT_COLUMNS)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield [[plain_value(value) for value in row] for row in rows]
+
+
+# Excel/LibreOffice bu karakterlerle baslayan hucreyi formul olarak calistirir
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    """Formul gibi baslayan metni basina ' ekleyerek duz metne cevirir (CSV injection)."""
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def _csv(batches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: Excel UTF-8 CSV'yi Turkce karakterlerle dogru acsin
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_HEADER)
+    async for rows in batches:
+        writer.writerows([_csv_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson(batches) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_HEADER, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """zipfile'in yazdigi baytlari biriktirir; tell/seek desteklemez.
+
+    zipfile seek edemeyen hedefte yerel basliklardan sonra data descriptor
+    yazar, boylece arsiv bastan sona akitilabilir.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Ogrenciler" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+# XML 1.0'in izin vermedigi kontrol karakterleri; tek bir hucrede bile
+# olsa Excel tum calisma kitabini acamaz
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_row(values) -> str:
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = escape(_XML_ILLEGAL_CHARS.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+async def _xlsx(batches) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(EXPORT_HEADER).encode())
+            async for rows in batches:
+                sheet.write("".join(_xlsx_row(row) for row in rows).encode())
+                yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+_WRITERS = {"csv": _csv, "ndjson": _ndjson, "xlsx": _xlsx}
+
+
+def stream_student_export(bind: AsyncEngine, query: Select, fmt: str) -> AsyncIterator[bytes]:
+    """query'nin (student_directory uzerinde, sirali) satirlarini fmt bicimde akitir."""
+    return _WRITERS[fmt](_row_batches(bind, query))
@@ -0,0 +1,346 @@
+"""CSV / XLSX dosyasindan toplu ogrenci olusturma.
+
+Akis:
+  1. Dosya satir satir okunur (csv modulu ya da sayfa XML'i uzerinde
+     iterparse) ve her satir StudentImportRow ile dogrulanir.
+  2. Dosya icindeki tekrarlar ve veritabaninda zaten kayitli e-postalar
+     tek sorguyla elenir.
+  3. Sifreler bcrypt havuzunda hash'lenir. Ayni sifre (or. okulun ortak ilk
+     sifresi) bir kez hash'lenir; her sifre ayri bir istir ve ice aktarim
+     ayni anda havuzdan bir eksik thread kullanir, boylece girisler uzun
+     bir ice aktarimin arkasinda beklemez.
+  4. User, Student ve iki StudentProgress satiri ORM nesnesi olusturmadan
+     cok satirli INSERT'lerle eklenir; student_directory ayni transaction'da
+     guncellenir.
+
+Hatali satirlar atlanir ve satir numarasiyla raporlanir; gecerli satirlar
+olusturulur. Export kolon adlari (first_name, last_name, email, ...) ayni
+oldugu icin export dosyasi dogrudan geri yuklenebilir.
+"""
+import asyncio
+import csv
+import io
+import re
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import BinaryIO, Iterator
+from xml.etree.ElementTree import iterparse
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import pwd_context
+from app.config import settings
+from app.models.audit_log import AuditAction
+from app.models.student import Branch, Student, StudentProgress
+from app.models.user import User, UserRole, UserStatus
+from app.schemas.student import StudentImportError, StudentImportResponse, StudentImportRow
+from app.services.audit import create_audit_log
+from app.services.grade_hours import get_hours_for_grade
+from app.services.password_hashing import run_hashing
+from app.services.student_directory import refresh_student_directory
+from app.utils import fold_search_text, utcnow_naive
+
+MAX_IMPORT_ROWS = 5000
+
+IMPORT_FORMATS = ("csv", "xlsx")
+REQUIRED_COLUMNS = ("email", "first_name", "last_name")
+IMPORT_COLUMNS = tuple(StudentImportRow.model_fields)
+
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+# Excel tarihleri 1899-12-30'dan itibaren gun sayisi olarak saklar
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+
+@dataclass
+class ParsedImport:
+    total_rows: int = 0
+    rows: list[tuple[int, StudentImportRow]] = field(default_factory=list)
+    errors: list[StudentImportError] = field(default_factory=list)
+
+
+def import_format(filename: str | None) -> str:
+    ext = (filename or "").rsplit(".", 1)[-1].lower()
+    if ext not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Sadece CSV veya XLSX dosyası yükleyebilirsiniz")
+    return ext
+
+
+# --- Okuma -------------------------------------------------------------------
+
+def _csv_records(file: BinaryIO) -> Iterator[tuple[int, list[str]]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    for values in reader:
+        yield reader.line_num, values
+    text.detach()
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _first_sheet(archive: zipfile.ZipFile) -> str:
+    """Calisma kitabindaki ilk sayfanin arsiv icindeki yolu."""
+    names = set(archive.namelist())
+    try:
+        with archive.open("xl/workbook.xml") as workbook:
+            sheet = next(elem for _, elem in iterparse(workbook) if elem.tag == f"{_SHEET_NS}sheet")
+        rel_id = sheet.get(f"{_REL_NS}id")
+        with archive.open("xl/_rels/workbook.xml.rels") as rels:
+            target = next(
+                elem.get("Target") for _, elem in iterparse(rels)
+                if elem.tag == f"{_PKG_REL_NS}Relationship" and elem.get("Id") == rel_id
+            )
+        path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    except (KeyError, StopIteration):
+        path = "xl/worksheets/sheet1.xml"
+    if path not in names:
+        raise HTTPException(status_code=400, detail="XLSX dosyasında çalışma sayfası bulunamadı")
+    return path
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as source:
+        for _, elem in iterparse(source):
+            if elem.tag == f"{_SHEET_NS}si":
+                # Zengin metin birden cok <t> parcasindan olusabilir
+                strings.append("".join(t.text or "" for t in elem.iter(f"{_SHEET_NS}t")))
+                elem.clear()
+    return strings
+
+
+def _cell_value(cell, shared: list[str]) -> str:
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{_SHEET_NS}t"))
+    value = cell.findtext(f"{_SHEET_NS}v") or ""
+    if kind == "s" and value:
+        return shared[int(value)]
+    if kind in (None, "n") and value.endswith(".0"):
+        # Sayi olarak girilmis telefon vb.
+        return value[:-2]
+    return value
+
+
+def _xlsx_records(file: BinaryIO) -> Iterator[tuple[int, list[str]]]:
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Geçersiz XLSX dosyası")
+    with archive:
+        shared = _shared_strings(archive)
+        with archive.open(_first_sheet(archive)) as sheet:
+            for _, elem in iterparse(sheet):
+                if elem.tag != f"{_SHEET_NS}row":
+                    continue
+                values: list[str] = []
+                for position, cell in enumerate(elem.iter(f"{_SHEET_NS}c")):
+                    match = _CELL_REF.fullmatch(cell.get("r") or "")
+                    index = _column_index(match.group(1)) if match else position
+                    values.extend([""] * (index + 1 - len(values)))
+                    values[index] = _cell_value(cell, shared)
+                yield int(elem.get("r") or 0), values
+                elem.clear()
+
+
+def _excel_date(value: str) -> str:
+    # Tarih hucresi bicimlendirilmisse deger gun sayisi olarak gelir
+    if value.isdigit():
+        return (_EXCEL_EPOCH + timedelta(days=int(value))).isoformat()
+    return value
+
+
+def _error_message(exc: ValidationError) -> str:
+    parts = []
+    for error in exc.errors():
+        location = ".".join(str(item) for item in error["loc"])
+        message = error["msg"].removeprefix("Value error, ")
+        parts.append(f"{location}: {message}" if location else message)
+    return "; ".join(parts)
+
+
+def parse_import(file: BinaryIO, fmt: str) -> ParsedImport:
+    """Dosyayi okuyup satirlari dogrular; bos satirlar sayilmaz."""
+    records = _csv_records(file) if fmt == "csv" else _xlsx_records(file)
+    parsed = ParsedImport()
+    try:
+        header = None
+        for line, values in records:
+            if not any(value.strip() for value in values):
+                continue
+            if header is None:
+                header = [value.strip().lower() for value in values]
+                missing = [name for name in REQUIRED_COLUMNS if name not in header]
+                if missing:
+                    raise HTTPException(
+                        status_code=400, detail=f"Eksik kolon: {', '.join(missing)}"
+                    )
+                continue
+
+            parsed.total_rows += 1
+            if parsed.total_rows > MAX_IMPORT_ROWS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Bir dosyada en fazla {MAX_IMPORT_ROWS} öğrenci içe aktarılabilir",
+                )
+            data = {
+                name: value for name, value in zip(header, values) if name in IMPORT_COLUMNS
+            }
+            if data.get("date_of_birth"):
+                data["date_of_birth"] = _excel_date(data["date_of_birth"].strip())
+            try:
+                parsed.rows.append((line, StudentImportRow.model_validate(data)))
+            except ValidationError as exc:
+                parsed.errors.append(StudentImportError(
+                    row=line, email=data.get("email") or None, message=_error_message(exc)
+                ))
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="Dosya okunamadı; CSV UTF-8 kodlamalı olmalı")
+    if header is None:
+        raise HTTPException(status_code=400, detail="Dosya boş")
+    return parsed
+
+
+# --- Yazma -------------------------------------------------------------------
+
+async def hash_passwords(passwords: set[str]) -> dict[str, str]:
+    """Her farkli sifreyi bir kez hash'ler; {sifre: hash}.
+
+    Her sifre havuzda ayri bir istir ve ice aktarim ayni anda en fazla
+    PASSWORD_HASH_WORKERS - 1 is calistirir. Boylece en az bir bcrypt thread'i
+    girislere acik kalir; girisler uzun bir ice aktarimin arkasinda beklemez.
+    """
+    concurrency = max(1, settings.PASSWORD_HASH_WORKERS - 1)
+    pending = iter(sorted(passwords))
+    hashes: dict[str, str] = {}
+
+    async def worker():
+        for password in pending:
+            hashes[password] = await run_hashing(pwd_context.hash, password)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return hashes
+
+
+async def import_students(
+    db: AsyncSession,
+    parsed: ParsedImport,
+    school_id: str,
+    performed_by: str,
+    default_password: str | None = None,
+    dry_run: bool = False,
+) -> StudentImportResponse:
+    """Dogrulanmis satirlardan kullanici + ogrenci olusturur ve commit eder.
+
+    dry_run ise hicbir sey yazilmaz; rapor olusturulacak satir sayisini verir.
+    """
+    errors = list(parsed.errors)
+    candidates: list[tuple[int, StudentImportRow]] = []
+    seen: set[str] = set()
+    for line, row in parsed.rows:
+        if row.email in seen:
+            errors.append(StudentImportError(row=line, email=row.email, message="Dosyada tekrar eden e-posta"))
+        elif not (row.password or default_password):
+            errors.append(StudentImportError(row=line, email=row.email, message="Şifre belirtilmemiş"))
+        else:
+            seen.add(row.email)
+            candidates.append((line, row))
+
+    existing: set[str] = set()
+    if seen:
+        result = await db.execute(select(User.email).where(User.email.in_(seen)))
+        existing = set(result.scalars().all())
+    accepted = []
+    for line, row in candidates:
+        if row.email in existing:
+            errors.append(StudentImportError(row=line, email=row.email, message="Bu e-posta zaten kayıtlı"))
+        else:
+            accepted.append(row)
+    errors.sort(key=lambda error: error.row)
+
+    report = StudentImportResponse(
+        total_rows=parsed.total_rows, created=len(accepted), dry_run=dry_run, errors=errors
+    )
+    if dry_run or not accepted:
+        return report
+
+    hashes = await hash_passwords({row.password or default_password for row in accepted})
+
+    now = utcnow_naive()
+    initial_hours = {branch.value: get_hours_for_grade(1, branch.value)["required"] for branch in Branch}
+    users, students, progress = [], [], []
+    for row in accepted:
+        user_id, student_id = str(uuid.uuid4()), str(uuid.uuid4())
+        users.append({
+            "id": user_id,
+            "email": row.email,
+            "password_hash": hashes[row.password or default_password],
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "phone": row.phone,
+            "role": UserRole.USER.value,
+            "status": UserStatus.ACTIVE.value,
+            # Cok satirli INSERT ORM olaylarini tetiklemez
+            "search_text": fold_search_text(row.first_name, row.last_name, row.email),
+            "created_at": now,
+        })
+        students.append({
+            "id": student_id,
+            "user_id": user_id,
+            "school_id": school_id,
+            "date_of_birth": row.date_of_birth,
+            "emergency_contact": row.emergency_contact,
+            "emergency_phone": row.emergency_phone,
+            "notes": row.notes,
+            "created_at": now,
+        })
+        progress += [
+            {
+                "id": str(uuid.uuid4()),
+                "student_id": student_id,
+                "branch": branch.value,
+                "current_grade": 1,
+                "completed_hours": 0,
+                "remaining_hours": initial_hours[branch.value],
+                "created_at": now,
+            }
+            for branch in Branch
+        ]
+
+    try:
+        await db.execute(insert(User), users)
+        await db.execute(insert(Student), students)
+        await db.execute(insert(StudentProgress), progress)
+        await refresh_student_directory(db, [student["id"] for student in students])
+        await create_audit_log(
+            db,
+            action=AuditAction.STUDENTS_IMPORTED,
+            entity_type="School",
+            entity_id=school_id,
+            performed_by=performed_by,
+            details=f"Toplu içe aktarım: {len(students)} öğrenci, {len(errors)} hatalı satır",
+        )
+        await db.commit()
+    except IntegrityError:
+        # Kontrol ile INSERT arasinda ayni e-posta baska bir istekle kaydedildi
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Bazı e-postalar içe aktarım sırasında kaydedildi, lütfen tekrar deneyin",
+        )
+    return report
@@ -0,0 +1,71 @@
+"""Kullanici ve ogrenci aramasi.
+
+users.search_text ad, soyad ve e-postanin fold_search_text ile katlanmis
+halidir ve her User insert/update'inde yazilir (bkz. app/models/user.py).
+Aranan metin de ayni sekilde katlanir; "isil gun" "Işıl Güneş"i bulur.
+
+PostgreSQL'de search_text pg_trgm GIN indeksiyle (LIKE '%parca%'), SQLite'ta
+FTS5 trigram dizini user_search ile (MATCH) aranir; sonuclar benzerlige gore
+siralanir. Trigram dizinleri 3 harften kisa parcalarda ise yaramaz; bu
+parcalar ayrica LIKE ile elenir. Okul kisitlamasi cagiranin sorgusundadir:
+
+    query, rank = apply_user_search(query, search, dialect)
+    page = await paginate(db, query, keyset, ..., rank=rank)
+"""
+from sqlalchemy import Select, column, func, literal_column, select, table
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.user import User
+from app.utils import fold_search_text
+
+# Trigram dizininin kullanilabildigi en kisa parca
+MIN_INDEXED_TOKEN = 3
+
+user_search_fts = table("user_search", column("rowid"), column("rank"))
+
+
+def search_tokens(term: str) -> list[str]:
+    return fold_search_text(term).split()
+
+
+def _contains(token: str) -> ColumnElement:
+    escaped = token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return User.search_text.like(f"%{escaped}%", escape="\\")
+
+
+def _fts_query(tokens: list[str]) -> str:
+    # Her parca ayri bir FTS5 ifadesi; bosluk AND anlamina gelir
+    return " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+
+
+def apply_user_search(query: Select, term: str, dialect: str) -> tuple[Select, ColumnElement | None]:
+    """query'yi (FROM'unda users bulunmali) arama terimine gore suzer.
+
+    (suzulmus sorgu, alaka siralamasi) dondurur; siralama en yakin sonucu
+    basa alir. Terim katlandiktan sonra bos kalirsa sorgu degismez. SQLite'ta
+    tum parcalar 3 harften kisaysa dizin kullanilamaz, siralama None olur.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return query, None
+
+    if dialect != "sqlite":
+        for token in tokens:
+            query = query.where(_contains(token))
+        return query, func.similarity(User.search_text, " ".join(tokens)).desc()
+
+    indexed = [token for token in tokens if len(token) >= MIN_INDEXED_TOKEN]
+    for token in tokens:
+        if len(token) < MIN_INDEXED_TOKEN:
+            query = query.where(_contains(token))
+    if not indexed:
+        return query, None
+
+    match = (
+        select(user_search_fts.c.rowid, user_search_fts.c.rank)
+        .where(literal_column("user_search").op("MATCH")(_fts_query(indexed)))
+        .subquery("user_match")
+    )
+    query = query.join(match, match.c.rowid == literal_column("users.rowid"))
+    # bm25 puani negatiftir; kucuk olan daha alakali
+    return query, match.c.rank.asc()
@@ -1,3 +1,4 @@
+import unicodedata
 from datetime import datetime, timezone
 from typing import Annotated
 
@@ -26,3 +27,21 @@ def _strip_tzinfo(value: datetime) -> datetime:
 # columns. This coerces such values to naive UTC at the API boundary. Must run
 # AFTER Pydantic's own str->datetime parsing (BeforeValidator sees the raw string).
 NaiveDatetime = Annotated[datetime, AfterValidator(_strip_tzinfo)]
+
+
+# Turkcede I/ı ve İ/i ayri harf ciftleridir; arama icin hepsi "i" sayilir
+_TURKISH_I_FOLD = str.maketrans({"I": "i", "İ": "i", "ı": "i"})
+
+
+def fold_search_text(*parts: str | None) -> str:
+    """Arama karsilastirmasi icin buyuk/kucuk harf ve aksan farklarini siler.
+
+    "Işıl Güneş" ve "ISIL gunes" ikisi de "isil gunes" olur: I/ı/İ "i"ye
+    indirgenir, ş/ğ/ç/ö/ü gibi harfler NFKD ile temel harfe ayrilip isaretleri
+    atilir. Bos parcalar yok sayilir, bosluklar tek bosluga indirilir.
+    """
+    text = " ".join(part for part in parts if part).translate(_TURKISH_I_FOLD)
+    text = "".join(
+        ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)
+    )
+    return " ".join(text.casefold().split())
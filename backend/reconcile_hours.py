@@ -0,0 +1,32 @@
+"""
+Saat defteri mutabakati (cron icin).
+Run: python reconcile_hours.py [--fix] [--incremental]
+"""
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.services.hours_ledger import reconcile_hours
+
+
+async def main(fix: bool, incremental: bool):
+    async with AsyncSessionLocal() as db:
+        report = await reconcile_hours(db, fix=fix, incremental=incremental)
+        await db.commit()
+
+    since = report.since.isoformat() if report.since else "tam tarama"
+    print(f"Taranan: {report.checked} ({since})")
+    print(f"Farkli: {report.mismatched}, duzeltilen: {report.fixed}")
+    for d in report.discrepancies:
+        print(
+            f"  {d.student_id} {d.branch}: {d.recorded_completed_hours} -> "
+            f"{d.expected_completed_hours} saat"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fix", action="store_true", help="Farklari duzelt")
+    parser.add_argument("--incremental", action="store_true", help="Son calistirmadan beri dokunulanlar")
+    args = parser.parse_args()
+    asyncio.run(main(args.fix, args.incremental))
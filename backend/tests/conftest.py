@@ -7,12 +7,15 @@ from sqlalchemy.pool import StaticPool
 from app.main import app
 from app.database import get_db
 from app.rate_limit import limiter
+from app.principal import clear_principal_cache
+from app.services.grade_hours import reset_grade_rules
 from app.models.base import Base
 from app.models.user import User, UserRole, UserStatus
 from app.models.school import School, SchoolManager
 from app.models.student import Student, StudentProgress, Branch
 from app.models.lesson import Lesson, LessonType
 from app.auth import get_password_hash, create_access_token
+from app.services.student_directory import refresh_student_directory
 
 
 @pytest.fixture(autouse=True)
@@ -21,6 +24,20 @@ def reset_rate_limiter():
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    clear_principal_cache()
+    yield
+    clear_principal_cache()
+
+
+@pytest.fixture(autouse=True)
+def reset_grade_rule_table():
+    reset_grade_rules()
+    yield
+    reset_grade_rules()
+
+
 @pytest.fixture
 async def db_session():
     engine = create_async_engine(
@@ -122,6 +139,8 @@ async def make_student(
             db_session.add(progress)
         await db_session.commit()
 
+    await refresh_student_directory(db_session, [student.id])
+    await db_session.commit()
     return student
 
 
@@ -1,6 +1,7 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import func, select
 
+from app.models.audit_log import AuditAction, AuditLog
 from app.models.user import UserRole
 from app.models.student import Branch, StudentProgress
 from tests.conftest import (
@@ -126,3 +127,180 @@ async def test_delete_nonexistent_attendance_returns_404(client, db_session):
     admin = await make_user(db_session, role=UserRole.ADMIN.value)
     resp = await client.delete("/api/attendance/does-not-exist", headers=auth_headers(admin))
     assert resp.status_code == 404
+
+
+async def test_bulk_attendance_mixed_roster(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    other_school = await make_school(db_session, name="Other School")
+    first = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 50)})
+    second = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (4, 0)})
+    outsider = await make_student(db_session, other_school)
+    lesson = await make_lesson(db_session, school, admin, branch=Branch.WING_TSUN.value, duration_hours=6.0)
+
+    await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson.id, "student_ids": [first.id]},
+        headers=auth_headers(admin),
+    )
+    resp = await client.post(
+        "/api/attendance/",
+        json={
+            "lesson_id": lesson.id,
+            "student_ids": [second.id, first.id, outsider.id, "missing", second.id],
+        },
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 1
+    assert body["items"][0]["student_id"] == second.id
+    assert body["items"][0]["student_name"] == "Test User"
+
+    rows = (
+        await db_session.execute(
+            select(StudentProgress.student_id, StudentProgress.completed_hours, StudentProgress.remaining_hours)
+        )
+    ).all()
+    hours = {sid: (float(c), float(r)) for sid, c, r in rows}
+    # Derece 1: 54 saat gerekli; 50 + 6 = 56 -> kalan 0 (negatife dusmez)
+    assert hours[first.id] == (56.0, 0.0)
+    # Derece 4: 60 saat gerekli
+    assert hours[second.id] == (6.0, 54.0)
+
+    audit_count = (
+        await db_session.execute(
+            select(func.count(AuditLog.id)).where(AuditLog.action == AuditAction.ATTENDANCE_CREATED.value)
+        )
+    ).scalar()
+    assert audit_count == 2
+
+
+async def test_replace_roster_applies_diff(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    keep = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+    drop = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+    add = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+    lesson = await make_lesson(db_session, school, admin, branch=Branch.WING_TSUN.value, duration_hours=2.0)
+
+    await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson.id, "student_ids": [keep.id, drop.id]},
+        headers=auth_headers(admin),
+    )
+    resp = await client.put(
+        f"/api/attendance/lesson/{lesson.id}",
+        json={"student_ids": [keep.id, add.id]},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [a["student_id"] for a in body["added"]] == [add.id]
+    assert body["removed_student_ids"] == [drop.id]
+    assert body["unchanged"] == 1
+
+    roster = await client.get(f"/api/attendance/lesson/{lesson.id}", headers=auth_headers(admin))
+    assert {a["student_id"] for a in roster.json()["items"]} == {keep.id, add.id}
+
+    rows = (
+        await db_session.execute(select(StudentProgress.student_id, StudentProgress.completed_hours))
+    ).all()
+    assert {sid: float(h) for sid, h in rows} == {keep.id: 12.0, drop.id: 10.0, add.id: 12.0}
+
+
+async def test_replace_roster_respects_manager_scope(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    other_school = await make_school(db_session, name="Other School")
+    lesson = await make_lesson(db_session, other_school, manager)
+
+    resp = await client.put(
+        f"/api/attendance/lesson/{lesson.id}",
+        json={"student_ids": []},
+        headers=auth_headers(manager),
+    )
+    assert resp.status_code == 403
+
+
+async def test_offline_sync_is_idempotent(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    first = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    second = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    lesson_a = await make_lesson(db_session, school, admin, duration_hours=2.0)
+    lesson_b = await make_lesson(db_session, school, admin, duration_hours=3.0)
+
+    payload = {
+        "operations": [
+            {"op_id": "op-1", "operation": "ADD", "lesson_id": lesson_a.id, "student_id": first.id},
+            {"op_id": "op-2", "operation": "ADD", "lesson_id": lesson_b.id, "student_id": first.id},
+            {"op_id": "op-3", "operation": "ADD", "lesson_id": lesson_a.id, "student_id": second.id},
+            {"op_id": "op-4", "operation": "REMOVE", "lesson_id": lesson_a.id, "student_id": second.id},
+            {"op_id": "op-5", "operation": "ADD", "lesson_id": "missing", "student_id": first.id},
+        ]
+    }
+    resp = await client.post("/api/attendance/sync", json=payload, headers=auth_headers(admin))
+    assert resp.status_code == 200
+    statuses = {r["op_id"]: r["status"] for r in resp.json()["results"]}
+    assert statuses == {
+        "op-1": "APPLIED",
+        "op-2": "APPLIED",
+        "op-3": "SUPERSEDED",
+        "op-4": "ALREADY_APPLIED",
+        "op-5": "REJECTED",
+    }
+    assert resp.json()["applied"] == 2
+
+    # Ayni batch yeniden gonderilirse hicbir sey tekrar uygulanmaz
+    again = await client.post("/api/attendance/sync", json=payload, headers=auth_headers(admin))
+    assert {r["op_id"]: r["status"] for r in again.json()["results"]} == statuses
+
+    rows = (
+        await db_session.execute(select(StudentProgress.student_id, StudentProgress.completed_hours))
+    ).all()
+    assert {sid: float(h) for sid, h in rows} == {first.id: 5.0, second.id: 0.0}
+
+    remove = await client.post(
+        "/api/attendance/sync",
+        json={"operations": [
+            {"op_id": "op-6", "operation": "REMOVE", "lesson_id": lesson_b.id, "student_id": first.id},
+        ]},
+        headers=auth_headers(admin),
+    )
+    assert remove.json()["results"][0]["status"] == "APPLIED"
+    hours = (
+        await db_session.execute(
+            select(StudentProgress.completed_hours).where(StudentProgress.student_id == first.id)
+        )
+    ).scalar_one()
+    assert float(hours) == 2.0
+
+
+async def test_offline_sync_op_ids_are_per_user(client, db_session):
+    school_a = await make_school(db_session, name="Okul A")
+    school_b = await make_school(db_session, name="Okul B")
+    manager_a = await make_user(db_session, role=UserRole.MANAGER.value)
+    manager_b = await make_user(db_session, role=UserRole.MANAGER.value)
+    await make_school_manager(db_session, school_a, manager_a)
+    await make_school_manager(db_session, school_b, manager_b)
+    student_a = await make_student(db_session, school_a, grades={Branch.WING_TSUN.value: (1, 0)})
+    student_b = await make_student(db_session, school_b, grades={Branch.WING_TSUN.value: (1, 0)})
+    lesson_a = await make_lesson(db_session, school_a, manager_a, duration_hours=2.0)
+    lesson_b = await make_lesson(db_session, school_b, manager_b, duration_hours=3.0)
+
+    # Iki cevrimdisi istemci ayni sayaci kullanir
+    for manager, lesson, student in ((manager_a, lesson_a, student_a), (manager_b, lesson_b, student_b)):
+        resp = await client.post(
+            "/api/attendance/sync",
+            json={"operations": [
+                {"op_id": "1", "operation": "ADD", "lesson_id": lesson.id, "student_id": student.id},
+            ]},
+            headers=auth_headers(manager),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["results"] == [{"op_id": "1", "status": "APPLIED", "detail": None}]
+
+    rows = (
+        await db_session.execute(select(StudentProgress.student_id, StudentProgress.completed_hours))
+    ).all()
+    assert {sid: float(h) for sid, h in rows} == {student_a.id: 2.0, student_b.id: 3.0}
@@ -1,8 +1,10 @@
 import pytest
 from jose import jwt
+from passlib.hash import bcrypt
 
 from app.config import settings
 from app.models.user import UserRole, UserStatus
+from app.services import password_hashing
 from tests.conftest import auth_headers, make_user
 
 
@@ -190,3 +192,54 @@ class TestMeExtraPermissions:
         resp = await client.get("/api/auth/me", headers=auth_headers(user))
         assert resp.status_code == 200
         assert resp.json()["extra_permissions"] == []
+
+
+class TestPasswordHashing:
+    async def test_login_rehashes_with_configured_cost(self, client, db_session):
+        user = await make_user(db_session, email="old@test.com")
+        user.password_hash = bcrypt.using(rounds=4).hash("secret123")
+        await db_session.commit()
+
+        resp = await client.post("/api/auth/login", json={"email": "old@test.com", "password": "secret123"})
+        assert resp.status_code == 200
+
+        await db_session.refresh(user)
+        stored = user.password_hash
+        assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+    async def test_full_hashing_queue_rejected(self, client, db_session, monkeypatch):
+        await make_user(db_session, email="busy@test.com", password="secret123")
+        capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+        monkeypatch.setattr(password_hashing, "_in_flight", capacity)
+
+        resp = await client.post("/api/auth/login", json={"email": "busy@test.com", "password": "secret123"})
+        assert resp.status_code == 503
+        assert password_hashing.hashing_stats()["queued"] == settings.PASSWORD_HASH_MAX_QUEUE
+
+    async def test_failed_hash_is_not_counted_as_completed(self):
+        before = password_hashing.hashing_stats()
+
+        def broken(_):
+            raise ValueError("bozuk hash")
+
+        with pytest.raises(ValueError):
+            await password_hashing.run_hashing(broken, "x")
+        after = password_hashing.hashing_stats()
+        assert after["completed"] == before["completed"]
+        assert after["failed"] == before["failed"] + 1
+        assert after["in_flight"] == before["in_flight"]
+
+    async def test_pool_stats_are_admin_only(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        manager = await make_user(db_session, role=UserRole.MANAGER.value)
+
+        health = await client.get("/api/health")
+        assert health.json() == {"status": "ok", "app": settings.APP_NAME}
+
+        resp = await client.get("/api/dashboard/password-hashing")
+        assert resp.status_code in (401, 403)
+        resp = await client.get("/api/dashboard/password-hashing", headers=auth_headers(manager))
+        assert resp.status_code == 403
+        resp = await client.get("/api/dashboard/password-hashing", headers=auth_headers(admin))
+        assert resp.status_code == 200
+        assert resp.json()["workers"] == settings.PASSWORD_HASH_WORKERS
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from app.models.event import Event, EventSchool, EventScope, EventType
+from app.models.lesson import Lesson, LessonType
+from app.models.user import UserRole
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager
+
+
+async def _lesson(db_session, school, creator, when):
+    lesson = Lesson(
+        school_id=school.id,
+        branch="WING_TSUN",
+        lesson_type=LessonType.GROUP.value,
+        lesson_date=when,
+        duration_hours=2.0,
+        created_by=creator.id,
+    )
+    db_session.add(lesson)
+    await db_session.commit()
+    return lesson
+
+
+async def _event(db_session, creator, when, scope=EventScope.ALL_SCHOOLS.value, schools=(), end=None):
+    event = Event(
+        name="Seminer",
+        event_type=EventType.SEMINAR.value,
+        start_datetime=when,
+        end_datetime=end,
+        location="Salon",
+        scope=scope,
+        created_by=creator.id,
+    )
+    db_session.add(event)
+    await db_session.flush()
+    for school in schools:
+        db_session.add(EventSchool(event_id=event.id, school_id=school.id))
+    await db_session.commit()
+    return event
+
+
+async def test_calendar_merges_sources_in_date_order(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    await _lesson(db_session, school, admin, datetime(2030, 1, 9, 18, 0))
+    await _lesson(db_session, school, admin, datetime(2030, 3, 1, 18, 0))  # aralik disi
+    await _event(db_session, admin, datetime(2030, 1, 10, 10, 0))
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json={
+            "school_id": school.id,
+            "branch": "ESCRIMA",
+            "lesson_type": "GROUP",
+            "day_of_week": 0,
+            "start_time": "19:00",
+            "start_date": "2030-01-01",
+            "end_date": "2030-12-31",
+            "is_virtual": True,
+        },
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+
+    resp = await client.get(
+        "/api/calendar/?from=2030-01-01T00:00:00&to=2030-01-15T00:00:00",
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    items = resp.json()
+    assert [(i["kind"], i["start"], i["is_virtual"]) for i in items] == [
+        ("LESSON", "2030-01-07T19:00:00", True),
+        ("LESSON", "2030-01-09T18:00:00", False),
+        ("EVENT", "2030-01-10T10:00:00", False),
+        ("LESSON", "2030-01-14T19:00:00", True),
+    ]
+    assert items[1]["end"] == "2030-01-09T20:00:00"
+
+
+async def test_calendar_filters_by_school_and_scope(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    own = await make_school(db_session, name="Own")
+    other = await make_school(db_session, name="Other")
+    await make_school_manager(db_session, own, manager)
+    when = datetime(2030, 1, 9, 18, 0)
+    await _lesson(db_session, own, admin, when)
+    await _lesson(db_session, other, admin, when)
+    await _event(db_session, admin, when, scope=EventScope.SELECTED_SCHOOLS.value, schools=[other])
+
+    params = "from=2030-01-01T00:00:00&to=2030-01-31T00:00:00"
+    resp = await client.get(f"/api/calendar/?{params}", headers=auth_headers(manager))
+    assert [i["school_name"] for i in resp.json()] == ["Own"]
+
+    resp = await client.get(f"/api/calendar/?{params}&school_ids={other.id}", headers=auth_headers(admin))
+    assert [i["kind"] for i in resp.json()] == ["LESSON", "EVENT"]
+
+    resp = await client.get(f"/api/calendar/?{params}&school_ids={own.id},{other.id}", headers=auth_headers(admin))
+    assert len(resp.json()) == 3
+
+    resp = await client.get("/api/calendar/?from=2030-01-01T00:00:00&to=2031-12-31T00:00:00", headers=auth_headers(admin))
+    assert resp.status_code == 400
+
+
+async def test_calendar_includes_events_overlapping_the_range(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    # Aralik oncesinde baslayip icine sarkan kamp
+    await _event(db_session, admin, datetime(2030, 1, 30, 10, 0), end=datetime(2030, 2, 2, 18, 0))
+    # Tamamen aralik oncesinde biten etkinlikler
+    await _event(db_session, admin, datetime(2030, 1, 20, 10, 0), end=datetime(2030, 1, 25, 18, 0))
+    await _event(db_session, admin, datetime(2030, 1, 31, 10, 0))
+
+    resp = await client.get(
+        "/api/calendar/?from=2030-02-01T00:00:00&to=2030-02-28T00:00:00",
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert [(i["start"], i["end"]) for i in resp.json()] == [
+        ("2030-01-30T10:00:00", "2030-02-02T18:00:00"),
+    ]
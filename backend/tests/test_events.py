@@ -1,11 +1,12 @@
 import pytest
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.models.user import UserRole
 from app.models.student import Branch, StudentProgress
-from app.models.event import Event, EventType, SeminarEvaluation
-from tests.conftest import auth_headers, make_user, make_school, make_student
+from app.models.event import Event, EventSchool, EventType, SeminarEvaluation
+from app.models.student_directory import StudentDirectory
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_school_manager
 
 
 async def make_event(db_session, creator, event_type=EventType.SEMINAR.value, is_completed=False):
@@ -278,3 +279,280 @@ class TestEvaluateSeminar:
         )
         assert resp.status_code == 200
         assert resp.json()["passed"] == 0
+
+    async def test_batch_evaluation_returns_per_student_results(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        event = await make_event(db_session, admin)
+        passed = [
+            (await self._setup_registered_student(db_session, admin, school, event, grade=3)).id
+            for _ in range(20)
+        ]
+        failed = [
+            (await self._setup_registered_student(db_session, admin, school, event, grade=5)).id
+            for _ in range(10)
+        ]
+        _, unregistered = await make_student_user(db_session, school)
+        unregistered_id = unregistered.id
+
+        resp = await client.post(
+            f"/api/events/{event.id}/evaluate",
+            json={"passed_student_ids": passed + [unregistered_id], "failed_student_ids": failed},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert (body["passed"], body["failed"]) == (20, 10)
+        assert body["skipped_student_ids"] == [unregistered_id]
+        assert [r["student_id"] for r in body["results"]] == passed + failed
+        assert {(r["grade_before"], r["grade_after"]) for r in body["results"][:20]} == {(3, 4)}
+        assert {(r["grade_before"], r["grade_after"]) for r in body["results"][20:]} == {(5, 5)}
+
+        progress = (
+            await db_session.execute(
+                select(StudentProgress.student_id, StudentProgress.current_grade, StudentProgress.remaining_hours)
+                .where(StudentProgress.student_id.in_(passed + failed))
+                .execution_options(populate_existing=True)
+            )
+        ).all()
+        grades = {sid: (grade, float(remaining)) for sid, grade, remaining in progress}
+        assert all(grades[sid] == (4, 60.0) for sid in passed)
+        assert all(grades[sid][0] == 5 for sid in failed)
+
+        evaluations = (
+            await db_session.execute(select(func.count()).select_from(SeminarEvaluation))
+        ).scalar_one()
+        assert evaluations == 30
+        directory = (
+            await db_session.execute(
+                select(StudentDirectory.wt_grade).where(StudentDirectory.student_id.in_(passed))
+            )
+        ).scalars().all()
+        assert set(directory) == {4}
+
+
+class TestEventCapacity:
+    async def _register(self, client, user, event_id):
+        resp = await client.post(f"/api/events/{event_id}/register", json={}, headers=auth_headers(user))
+        assert resp.status_code == 200
+        return resp.json()
+
+    async def _status_by_user(self, client, admin, event_id, users_by_student):
+        resp = await client.get(f"/api/events/{event_id}/registrations", headers=auth_headers(admin))
+        return {users_by_student[r["student_id"]]: r["status"] for r in resp.json()}
+
+    async def test_overflow_goes_to_waitlist_and_is_promoted(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        event = await make_event(db_session, admin)
+        event.capacity = 2
+        event.end_datetime = event.start_datetime + timedelta(hours=3)
+        await db_session.commit()
+        event_id = event.id
+        users = [await make_student_user(db_session, school) for _ in range(4)]
+
+        statuses = [(await self._register(client, user, event_id))["status"] for user, _ in users]
+        assert statuses == ["CONFIRMED", "CONFIRMED", "WAITLISTED", "WAITLISTED"]
+
+        resp = await client.get(f"/api/events/{event_id}", headers=auth_headers(admin))
+        assert (resp.json()["registration_count"], resp.json()["waitlist_count"]) == (2, 2)
+
+        # Koltuk bosalinca ilk bekleyen terfi eder
+        resp = await client.delete(f"/api/events/{event_id}/register", headers=auth_headers(users[0][0]))
+        assert resp.status_code == 200
+        assert resp.json()["promoted"] == 1
+        by_user = {student.id: i for i, (_, student) in enumerate(users)}
+        assert await self._status_by_user(client, admin, event_id, by_user) == {
+            1: "CONFIRMED", 2: "CONFIRMED", 3: "WAITLISTED",
+        }
+
+        # Kontenjan artinca kalan bekleyenler de terfi eder
+        resp = await client.put(f"/api/events/{event_id}", json={"capacity": 5}, headers=auth_headers(admin))
+        assert resp.status_code == 200
+        assert set((await self._status_by_user(client, admin, event_id, by_user)).values()) == {"CONFIRMED"}
+
+        # Yeni gelen kayit sayaca gore koltuk alir
+        late_user, _ = await make_student_user(db_session, school)
+        assert (await self._register(client, late_user, event_id))["status"] == "CONFIRMED"
+        seats = (
+            await db_session.execute(
+                select(Event.seats_taken).where(Event.id == event_id).execution_options(populate_existing=True)
+            )
+        ).scalar_one()
+        assert seats == 4
+
+    async def test_deleting_user_or_school_gives_seat_back(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        other_school = await make_school(db_session)
+        third_school = await make_school(db_session)
+        event = await make_event(db_session, admin)
+        event.capacity = 1
+        await db_session.commit()
+        event_id = event.id
+        first, _ = await make_student_user(db_session, school)
+        second, _ = await make_student_user(db_session, other_school)
+        third, third_student = await make_student_user(db_session, third_school)
+        first_id, third_student_id = first.id, third_student.id
+
+        assert (await self._register(client, first, event_id))["status"] == "CONFIRMED"
+        resp = await client.delete(f"/api/users/{first_id}", headers=auth_headers(admin))
+        assert resp.status_code == 200
+        assert (await self._register(client, second, event_id))["status"] == "CONFIRMED"
+
+        # Okul silinince onay bekleyen ogrenci terfi eder
+        assert (await self._register(client, third, event_id))["status"] == "WAITLISTED"
+        resp = await client.delete(f"/api/schools/{other_school.id}", headers=auth_headers(admin))
+        assert resp.status_code == 200
+        resp = await client.get(f"/api/events/{event_id}/registrations", headers=auth_headers(admin))
+        assert [(r["student_id"], r["status"]) for r in resp.json()] == [(third_student_id, "CONFIRMED")]
+        seats = (
+            await db_session.execute(
+                select(Event.seats_taken).where(Event.id == event_id).execution_options(populate_existing=True)
+            )
+        ).scalar_one()
+        assert seats == 1
+
+    async def test_waitlisted_examinee_is_not_evaluated(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        event = await make_event(db_session, admin)
+        event.capacity = 1
+        await db_session.commit()
+        event_id = event.id
+        registered = []
+        for _ in range(2):
+            user, student = await make_student_user(db_session, school)
+            db_session.add(StudentProgress(
+                student_id=student.id, branch=Branch.WING_TSUN.value,
+                current_grade=1, completed_hours=54, remaining_hours=0,
+            ))
+            await db_session.commit()
+            body = await client.post(
+                f"/api/events/{event_id}/register",
+                json={"will_take_exam": True, "exam_branch_wt": True},
+                headers=auth_headers(user),
+            )
+            registered.append((student.id, body.json()["status"]))
+        assert [status for _, status in registered] == ["CONFIRMED", "WAITLISTED"]
+
+        resp = await client.post(
+            f"/api/events/{event_id}/evaluate",
+            json={"passed_student_ids": [sid for sid, _ in registered]},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["passed"] == 1
+        assert resp.json()["skipped_student_ids"] == [registered[1][0]]
+
+    async def test_registration_for_missing_or_completed_event(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        user, _ = await make_student_user(db_session, school)
+        completed = await make_event(db_session, admin, is_completed=True)
+
+        resp = await client.post("/api/events/missing/register", json={}, headers=auth_headers(user))
+        assert resp.status_code == 404
+        resp = await client.post(f"/api/events/{completed.id}/register", json={}, headers=auth_headers(user))
+        assert resp.status_code == 400
+
+
+class TestEventListCounts:
+    async def test_registration_count_without_loading_registrations(self, client, db_session):
+        from app.models.event import EventRegistration
+
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        busy = await make_event(db_session, admin)
+        empty = await make_event(db_session, admin)
+        for event in (busy, empty):
+            event.end_datetime = event.start_datetime + timedelta(hours=3)
+        for _ in range(3):
+            _, student = await make_student_user(db_session, school)
+            db_session.add(EventRegistration(event_id=busy.id, student_id=student.id, register_wt=True))
+        await db_session.commit()
+
+        resp = await client.get("/api/events/", headers=auth_headers(admin))
+        counts = {item["id"]: item["registration_count"] for item in resp.json()["items"]}
+        assert counts == {busy.id: 3, empty.id: 0}
+
+        resp = await client.get(f"/api/events/{busy.id}", headers=auth_headers(admin))
+        assert resp.json()["registration_count"] == 3
+
+
+class TestEligibilityReport:
+    async def test_groups_in_scope_students_by_branch_status(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        selected = await make_school(db_session, name="Secili")
+        other = await make_school(db_session, name="Diger")
+        event = await make_event(db_session, admin)
+        event.scope = "SELECTED_SCHOOLS"
+        db_session.add(EventSchool(event_id=event.id, school_id=selected.id))
+        await db_session.commit()
+
+        ready = await make_student(db_session, selected, grades={"WING_TSUN": (2, 54), "ESCRIMA": (1, 10)})
+        close = await make_student(db_session, selected, grades={"WING_TSUN": (4, 55)})
+        await make_student(db_session, other, grades={"WING_TSUN": (2, 60)})
+
+        resp = await client.get(f"/api/events/{event.id}/eligibility-report", headers=auth_headers(admin))
+        assert resp.status_code == 200
+        report = resp.json()
+        assert report["total_students"] == 2
+        wt = report["branches"]["WING_TSUN"]
+        assert wt["counts"] == {"ELIGIBLE": 1, "NEEDS_APPROVAL": 1, "NOT_ELIGIBLE": 0}
+        assert [s["student_id"] for s in wt["groups"]["ELIGIBLE"]] == [ready.id]
+        assert wt["groups"]["NEEDS_APPROVAL"][0] == {
+            "student_id": close.id,
+            "first_name": "Test",
+            "last_name": "User",
+            "school_id": selected.id,
+            "school_name": "Secili",
+            "grade": 4,
+            "completed_hours": 55.0,
+            "required_hours": 60,
+        }
+        # Escrima ilerlemesi olmayan ogrenci 1. derece, 0 saat sayilir
+        escrima = report["branches"]["ESCRIMA"]
+        assert escrima["counts"] == {"ELIGIBLE": 0, "NEEDS_APPROVAL": 0, "NOT_ELIGIBLE": 2}
+
+        resp = await client.get(
+            f"/api/events/{event.id}/eligibility-report",
+            params={"branch": "ESCRIMA"},
+            headers=auth_headers(admin),
+        )
+        assert list(resp.json()["branches"]) == ["ESCRIMA"]
+
+    async def test_manager_sees_only_own_schools(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        manager = await make_user(db_session, role=UserRole.MANAGER.value)
+        manager.extra_permissions = ["manage_events"]
+        await db_session.commit()
+        own = await make_school(db_session, name="Own")
+        other = await make_school(db_session, name="Other")
+        await make_school_manager(db_session, own, manager)
+        event = await make_event(db_session, admin)
+        mine = await make_student(db_session, own)
+        await make_student(db_session, other)
+
+        resp = await client.get(f"/api/events/{event.id}/eligibility-report", headers=auth_headers(manager))
+        assert resp.status_code == 200
+        groups = resp.json()["branches"]["WING_TSUN"]["groups"]
+        assert [s["student_id"] for s in groups["NOT_ELIGIBLE"]] == [mine.id]
+
+        resp = await client.get(
+            f"/api/events/{event.id}/eligibility-report",
+            params={"school_id": other.id},
+            headers=auth_headers(manager),
+        )
+        assert resp.status_code == 403
+
+    async def test_student_cannot_read_report(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        user, _ = await make_student_user(db_session, school)
+        event = await make_event(db_session, admin)
+
+        resp = await client.get(f"/api/events/{event.id}/eligibility-report", headers=auth_headers(user))
+        assert resp.status_code == 403
+        resp = await client.get("/api/events/missing/eligibility-report", headers=auth_headers(admin))
+        assert resp.status_code == 404
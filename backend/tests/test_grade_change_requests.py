@@ -3,6 +3,7 @@ from sqlalchemy import select
 
 from app.models.user import UserRole
 from app.models.student import StudentProgress
+from app.models.student_directory import StudentDirectory
 from app.models.audit_log import AuditLog, AuditAction
 
 from tests.conftest import make_user, make_school, make_school_manager, make_student, auth_headers
@@ -144,6 +145,8 @@ class TestGradeChangeRequestApproveReject:
             )
         ).scalar_one()
         assert progress.current_grade == 6
+        # 6. derece 60 saat ister; tamamlanan 10 saat korunur
+        assert float(progress.remaining_hours) == 50
 
         audit = (
             await db_session.execute(
@@ -152,6 +155,36 @@ class TestGradeChangeRequestApproveReject:
         ).scalar_one_or_none()
         assert audit is not None
 
+    async def test_manual_change_recomputes_remaining_hours(self, client, db_session):
+        school = await make_school(db_session)
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        student = await make_student(db_session, school, grades={"WING_TSUN": (3, 50)})
+
+        resp = await client.post(
+            "/api/grades/manual-change",
+            json={"student_id": student.id, "branch": "WING_TSUN", "new_grade": 4, "note": "sinav gecti"},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+
+        progress = (
+            await db_session.execute(
+                select(StudentProgress).where(
+                    StudentProgress.student_id == student.id,
+                    StudentProgress.branch == "WING_TSUN",
+                )
+            )
+        ).scalar_one()
+        await db_session.refresh(progress)
+        assert progress.current_grade == 4
+        assert float(progress.completed_hours) == 50
+        assert float(progress.remaining_hours) == 10
+
+        directory = await db_session.get(StudentDirectory, student.id)
+        await db_session.refresh(directory)
+        assert directory.wt_grade == 4
+        assert float(directory.wt_remaining_hours) == 10
+
     async def test_admin_reject_leaves_grade_unchanged(self, client, db_session):
         school = await make_school(db_session)
         manager = await make_user(db_session, role=UserRole.MANAGER.value)
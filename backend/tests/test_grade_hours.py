@@ -1,11 +1,22 @@
+from datetime import datetime
+
 import pytest
-from types import SimpleNamespace
+from sqlalchemy import select
 
+from app.models.event import Event, EventRegistration, EventType
+from app.models.student import Branch, StudentProgress
+from app.models.user import UserRole
 from app.services.grade_hours import (
+    apply_progress_hours,
+    compile_grade_rules,
+    current_grade_rules,
     get_hours_for_grade,
-    update_progress_hours,
     check_exam_eligibility,
 )
+from app.services.seminar_evaluation import apply_seminar_results
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_lesson
+
+WT = Branch.WING_TSUN.value
 
 
 class TestGetHoursForGrade:
@@ -23,78 +34,184 @@ class TestGetHoursForGrade:
         ],
     )
     def test_known_grade_ranges(self, grade, expected):
-        assert get_hours_for_grade(grade) == expected
+        assert get_hours_for_grade(grade, WT) == expected
 
     @pytest.mark.parametrize("grade", [0, -1, 13, 100])
     def test_grade_outside_map_returns_zeros(self, grade):
-        assert get_hours_for_grade(grade) == {"required": 0, "minimum": 0}
+        assert get_hours_for_grade(grade, WT) == {"required": 0, "minimum": 0}
 
 
 class TestCheckExamEligibility:
     def test_exact_required_hours_is_eligible(self):
-        assert check_exam_eligibility(1, 54) == "ELIGIBLE"
+        assert check_exam_eligibility(1, 54, WT) == "ELIGIBLE"
 
     def test_above_required_hours_is_eligible(self):
-        assert check_exam_eligibility(1, 60) == "ELIGIBLE"
+        assert check_exam_eligibility(1, 60, WT) == "ELIGIBLE"
 
     def test_exact_minimum_hours_needs_approval(self):
-        assert check_exam_eligibility(1, 44) == "NEEDS_APPROVAL"
+        assert check_exam_eligibility(1, 44, WT) == "NEEDS_APPROVAL"
 
     def test_between_minimum_and_required_needs_approval(self):
-        assert check_exam_eligibility(1, 50) == "NEEDS_APPROVAL"
+        assert check_exam_eligibility(1, 50, WT) == "NEEDS_APPROVAL"
 
     def test_just_below_required_needs_approval(self):
-        assert check_exam_eligibility(1, 53.99) == "NEEDS_APPROVAL"
+        assert check_exam_eligibility(1, 53.99, WT) == "NEEDS_APPROVAL"
 
     def test_below_minimum_not_eligible(self):
-        assert check_exam_eligibility(1, 43) == "NOT_ELIGIBLE"
+        assert check_exam_eligibility(1, 43, WT) == "NOT_ELIGIBLE"
 
     def test_zero_hours_not_eligible(self):
-        assert check_exam_eligibility(1, 0) == "NOT_ELIGIBLE"
+        assert check_exam_eligibility(1, 0, WT) == "NOT_ELIGIBLE"
 
     @pytest.mark.parametrize("grade", [0, -1, 13, 100])
     def test_grade_outside_map_is_always_eligible(self, grade):
         # Surprising behavior: grade_hours.py treats any grade without a defined
         # required-hours bucket as automatically ELIGIBLE, regardless of hours.
-        assert check_exam_eligibility(grade, 0) == "ELIGIBLE"
-        assert check_exam_eligibility(grade, 1000) == "ELIGIBLE"
+        assert check_exam_eligibility(grade, 0, WT) == "ELIGIBLE"
+        assert check_exam_eligibility(grade, 1000, WT) == "ELIGIBLE"
 
     def test_boundary_between_grade_3_and_4_uses_different_requirements(self):
         # grade 3 needs 54h, grade 4 needs 60h at the same completed hours
-        assert check_exam_eligibility(3, 55) == "ELIGIBLE"
-        assert check_exam_eligibility(4, 55) == "NEEDS_APPROVAL"
-
-
-class TestUpdateProgressHours:
-    def _progress(self, current_grade=1, completed_hours=0.0):
-        return SimpleNamespace(current_grade=current_grade, completed_hours=completed_hours, remaining_hours=0)
-
-    def test_positive_hours_added(self):
-        progress = self._progress(current_grade=1, completed_hours=10)
-        update_progress_hours(progress, 5)
-        assert progress.completed_hours == 15
-        assert progress.remaining_hours == 54 - 15
-
-    def test_negative_hours_rolled_back(self):
-        progress = self._progress(current_grade=1, completed_hours=10)
-        update_progress_hours(progress, -4)
-        assert progress.completed_hours == 6
-        assert progress.remaining_hours == 54 - 6
-
-    def test_negative_hours_floor_at_zero(self):
-        progress = self._progress(current_grade=1, completed_hours=2)
-        update_progress_hours(progress, -10)
-        assert progress.completed_hours == 0
-        assert progress.remaining_hours == 54
-
-    def test_remaining_hours_floors_at_zero_when_overcomplete(self):
-        progress = self._progress(current_grade=1, completed_hours=50)
-        update_progress_hours(progress, 20)
-        assert progress.completed_hours == 70
-        assert progress.remaining_hours == 0
-
-    def test_grade_outside_map_remaining_hours_always_zero(self):
-        progress = self._progress(current_grade=0, completed_hours=5)
-        update_progress_hours(progress, 10)
-        assert progress.completed_hours == 15
-        assert progress.remaining_hours == 0
+        assert check_exam_eligibility(3, 55, WT) == "ELIGIBLE"
+        assert check_exam_eligibility(4, 55, WT) == "NEEDS_APPROVAL"
+
+
+async def _hours(db_session, student_id, branch=Branch.WING_TSUN.value):
+    row = (
+        await db_session.execute(
+            select(
+                StudentProgress.current_grade,
+                StudentProgress.completed_hours,
+                StudentProgress.remaining_hours,
+            ).where(StudentProgress.student_id == student_id, StudentProgress.branch == branch)
+        )
+    ).one()
+    return row[0], float(row[1]), float(row[2])
+
+
+class TestAtomicProgressUpdates:
+    async def test_increments_accumulate_without_loading_rows(self, db_session):
+        school = await make_school(db_session)
+        student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (4, 10)})
+
+        await apply_progress_hours(db_session, [student.id], Branch.WING_TSUN.value, 3)
+        await apply_progress_hours(db_session, [student.id], Branch.WING_TSUN.value, 2)
+        await db_session.commit()
+
+        assert await _hours(db_session, student.id) == (4, 15.0, 45.0)
+
+    async def test_decrement_clamps_at_zero(self, db_session):
+        school = await make_school(db_session)
+        student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 2)})
+
+        await apply_progress_hours(db_session, [student.id], Branch.WING_TSUN.value, -5)
+        await db_session.commit()
+
+        assert await _hours(db_session, student.id) == (1, 0.0, 54.0)
+
+    @pytest.mark.parametrize(
+        "grade,completed,added,expected",
+        [
+            (1, 10, -4, (1, 6.0, 48.0)),
+            (1, 50, 20, (1, 70.0, 0.0)),
+            (0, 5, 10, (0, 15.0, 0.0)),
+        ],
+    )
+    async def test_remaining_hours_follow_completed_hours(self, db_session, grade, completed, added, expected):
+        school = await make_school(db_session)
+        student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (grade, completed)})
+
+        await apply_progress_hours(db_session, [student.id], Branch.WING_TSUN.value, added)
+        await db_session.commit()
+
+        assert await _hours(db_session, student.id) == expected
+
+    async def test_passed_seminar_resets_hours_for_next_grade(self, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (3, 54)})
+        event = Event(
+            name="Seminer",
+            event_type=EventType.SEMINAR.value,
+            start_datetime=datetime(2030, 1, 1, 10, 0),
+            location="Salon",
+            created_by=admin.id,
+        )
+        db_session.add(event)
+        await db_session.flush()
+        db_session.add(EventRegistration(
+            event_id=event.id, student_id=student.id, will_take_exam=True,
+            exam_branch_wt=True, exam_branch_escrima=True,
+        ))
+        await db_session.commit()
+
+        results = await apply_seminar_results(db_session, event.id, [student.id], [], admin.id)
+        await db_session.commit()
+
+        # Escrima ilerleme kaydi olmadigi icin atlanir
+        assert [(r.branch, r.grade_before, r.grade_after) for r in results] == [(WT, 3, 4)]
+        assert await _hours(db_session, student.id) == (4, 0.0, 60.0)
+
+    async def test_delete_lesson_reverts_each_students_hours(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        first = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+        second = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+        lesson = await make_lesson(db_session, school, admin, duration_hours=2.0)
+
+        await client.post(
+            "/api/attendance/",
+            json={"lesson_id": lesson.id, "student_ids": [first.id, second.id]},
+            headers=auth_headers(admin),
+        )
+        assert await _hours(db_session, first.id) == (1, 12.0, 42.0)
+
+        resp = await client.delete(f"/api/lessons/{lesson.id}", headers=auth_headers(admin))
+        assert resp.status_code == 200
+        assert await _hours(db_session, first.id) == (1, 10.0, 44.0)
+        assert await _hours(db_session, second.id) == (1, 0.0, 54.0)
+
+
+class TestGradeRules:
+    def test_requirements_override_required_hours_per_branch(self):
+        rules = compile_grade_rules([
+            (Branch.ESCRIMA.value, 2, 40),
+            (Branch.ESCRIMA.value, 13, 150.5),
+        ])
+        assert rules.hours(2, Branch.ESCRIMA.value) == {"required": 40, "minimum": 40}
+        assert rules.hours(3, Branch.ESCRIMA.value) == {"required": 54, "minimum": 44}
+        assert rules.hours(13, Branch.ESCRIMA.value) == {"required": 150.5, "minimum": 0}
+        assert rules.hours(2, WT) == {"required": 54, "minimum": 44}
+        assert rules.hours(13, WT) == {"required": 0, "minimum": 0}
+
+    async def test_requirement_changes_are_applied_immediately(self, client, db_session):
+        admin = await make_user(db_session, role=UserRole.ADMIN.value)
+        school = await make_school(db_session)
+        student = await make_student(db_session, school, grades={
+            Branch.WING_TSUN.value: (1, 40), Branch.ESCRIMA.value: (1, 40),
+        })
+
+        resp = await client.post(
+            "/api/grades/requirements",
+            json={"branch": WT, "grade": 1, "grade_name": "1. Derece", "required_hours": 42},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+        assert get_hours_for_grade(1, WT) == {"required": 42, "minimum": 42}
+        assert check_exam_eligibility(1, 40, Branch.ESCRIMA.value) == "NOT_ELIGIBLE"
+
+        # SQL tarafi da ayni tabloyu kullanir; Escrima varsayilanda kalir
+        await apply_progress_hours(db_session, [student.id], WT, 1)
+        await apply_progress_hours(db_session, [student.id], Branch.ESCRIMA.value, 1)
+        await db_session.commit()
+        assert await _hours(db_session, student.id) == (1, 41.0, 1.0)
+        assert await _hours(db_session, student.id, Branch.ESCRIMA.value) == (1, 41.0, 13.0)
+
+        resp = await client.put(
+            f"/api/grades/requirements/{resp.json()['id']}",
+            json={"required_hours": 41},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+        assert current_grade_rules().hours(1, WT)["required"] == 41
+        assert check_exam_eligibility(1, 41, WT) == "ELIGIBLE"
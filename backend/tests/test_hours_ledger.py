@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.models.event import Event, EventRegistration, EventType
+from app.models.hours_reconciliation import HoursReconciliationRun
+from app.models.student import Branch, StudentProgress
+from app.models.user import UserRole
+from app.services.hours_ledger import reconcile_hours
+from app.services.seminar_evaluation import apply_seminar_results
+from app.utils import utcnow_naive
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_lesson
+
+
+async def _hours(db_session, student_id, branch=Branch.WING_TSUN.value):
+    db_session.expire_all()
+    result = await db_session.execute(
+        select(StudentProgress.completed_hours, StudentProgress.remaining_hours).where(
+            StudentProgress.student_id == student_id, StudentProgress.branch == branch
+        )
+    )
+    completed, remaining = result.one()
+    return float(completed), float(remaining)
+
+
+async def _attend(client, admin, lesson, *students):
+    resp = await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson.id, "student_ids": [s.id for s in students]},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+
+
+async def test_reports_and_fixes_drift(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    # make_student saatleri yoklama olmadan yazar: defterle uyusmaz
+    drifted = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+    drifted_id = drifted.id
+    lesson = await make_lesson(db_session, school, admin, duration_hours=2.0)
+    await _attend(client, admin, lesson, drifted)
+
+    report = await reconcile_hours(db_session)
+    await db_session.commit()
+    assert report.checked == 1
+    assert report.mismatched == 1
+    assert report.fixed == 0
+    item = report.discrepancies[0]
+    assert (item.recorded_completed_hours, item.expected_completed_hours) == (12.0, 2.0)
+    assert await _hours(db_session, drifted_id) == (12.0, 42.0)
+
+    report = await reconcile_hours(db_session, fix=True)
+    await db_session.commit()
+    assert report.fixed == 1
+    assert await _hours(db_session, drifted_id) == (2.0, 52.0)
+
+    report = await reconcile_hours(db_session)
+    assert report.mismatched == 0
+
+
+async def test_ledger_restarts_after_passed_seminar(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    student_id = student.id
+    lesson = await make_lesson(db_session, school, admin, duration_hours=2.0)
+    await _attend(client, admin, lesson, student)
+
+    event = Event(
+        name="Seminer",
+        event_type=EventType.SEMINAR.value,
+        start_datetime=utcnow_naive(),
+        location="Salon",
+        created_by=admin.id,
+    )
+    db_session.add(event)
+    await db_session.flush()
+    db_session.add(EventRegistration(
+        event_id=event.id, student_id=student_id, will_take_exam=True, exam_branch_wt=True,
+    ))
+    await db_session.commit()
+    await apply_seminar_results(db_session, event.id, [student_id], [], admin.id)
+    await db_session.commit()
+
+    report = await reconcile_hours(db_session)
+    assert report.mismatched == 0
+    assert await _hours(db_session, student_id) == (0.0, 54.0)
+
+
+async def test_incremental_run_uses_last_watermark(db_session):
+    school = await make_school(db_session)
+    await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+
+    first = await reconcile_hours(db_session, incremental=True)
+    await db_session.commit()
+    assert first.since is None
+    assert first.checked == 1
+
+    second = await reconcile_hours(db_session, incremental=True)
+    await db_session.commit()
+    assert second.since is not None
+    assert second.checked == 1
+
+    untouched = await reconcile_hours(db_session, since=datetime(2999, 1, 1))
+    assert untouched.checked == 0
+
+    runs = (await db_session.execute(select(HoursReconciliationRun))).scalars().all()
+    assert len(runs) == 3
+
+
+async def test_endpoint_requires_admin(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+
+    resp = await client.post("/api/grades/hours-reconciliation", headers=auth_headers(manager))
+    assert resp.status_code == 403
+
+    resp = await client.post("/api/grades/hours-reconciliation?fix=true", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert resp.json()["fix"] is True
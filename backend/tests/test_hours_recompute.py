@@ -0,0 +1,110 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.hours_recompute import HoursRecomputeJob, HoursRecomputeStatus
+from app.models.student import Branch, StudentProgress
+from app.models.student_directory import StudentDirectory
+from app.models.user import UserRole
+from app.services import hours_recompute
+from app.services.hours_recompute import create_recompute_job, run_recompute_job
+from tests.conftest import auth_headers, make_user, make_school, make_student
+
+WT = Branch.WING_TSUN.value
+
+
+async def _remaining(db_session, student_id, branch=WT):
+    db_session.expire_all()
+    result = await db_session.execute(
+        select(StudentProgress.remaining_hours).where(
+            StudentProgress.student_id == student_id, StudentProgress.branch == branch
+        )
+    )
+    return float(result.scalar_one())
+
+
+async def test_requirement_change_recomputes_stored_remaining_hours(client, db_session, monkeypatch):
+    monkeypatch.setattr(hours_recompute, "RECOMPUTE_CHUNK_SIZE", 2)
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    # make_student remaining_hours'u 0 yazar; yeniden hesaplama duzeltmeli
+    behind, close, done, other_grade = [
+        (await make_student(db_session, school, grades=grades)).id
+        for grades in (
+            {WT: (1, 10), Branch.ESCRIMA.value: (1, 10)},
+            {WT: (1, 30)},
+            {WT: (1, 60)},
+            {WT: (2, 10)},
+        )
+    ]
+
+    resp = await client.post(
+        "/api/grades/requirements",
+        json={"branch": WT, "grade": 1, "grade_name": "1. Derece", "required_hours": 40},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    job_id = resp.json()["recompute_job_id"]
+    assert job_id is not None
+
+    resp = await client.get(f"/api/grades/recompute-jobs/{job_id}", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    job = resp.json()
+    assert (job["status"], job["total"], job["processed"], job["updated"]) == ("COMPLETED", 3, 3, 2)
+    assert job["progress"] == 1.0
+
+    assert await _remaining(db_session, behind) == 30.0
+    assert await _remaining(db_session, close) == 10.0
+    assert await _remaining(db_session, done) == 0.0
+    assert await _remaining(db_session, other_grade) == 0.0
+    assert await _remaining(db_session, behind, Branch.ESCRIMA.value) == 0.0
+
+    row = await db_session.get(StudentDirectory, behind)
+    assert float(row.wt_remaining_hours) == 30.0
+    assert row.wt_exam_eligibility == "NOT_ELIGIBLE"
+
+
+async def test_only_required_hours_changes_queue_a_job(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+
+    # Varsayilanla ayni deger: kalan saatler degismez
+    resp = await client.post(
+        "/api/grades/requirements",
+        json={"branch": WT, "grade": 1, "grade_name": "1. Derece", "required_hours": 54},
+        headers=auth_headers(admin),
+    )
+    assert resp.json()["recompute_job_id"] is None
+
+    resp = await client.put(
+        f"/api/grades/requirements/{resp.json()['id']}",
+        json={"grade_name": "Birinci Derece"},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["recompute_job_id"] is None
+    jobs = (await db_session.execute(select(HoursRecomputeJob))).scalars().all()
+    assert jobs == []
+
+
+async def test_failed_job_is_marked_with_error(db_session, monkeypatch):
+    school = await make_school(db_session)
+    await make_student(db_session, school, grades={WT: (1, 10)})
+    job_id = (await create_recompute_job(db_session, WT, 1, None)).id
+    await db_session.commit()
+
+    async def fail(db, job, after_id):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(hours_recompute, "_recompute_chunk", fail)
+    await run_recompute_job(async_sessionmaker(db_session.bind, expire_on_commit=False), job_id)
+
+    db_session.expire_all()
+    job = await db_session.get(HoursRecomputeJob, job_id)
+    assert job.status == HoursRecomputeStatus.FAILED.value
+    assert job.error == "boom"
+    assert job.finished_at is not None
+
+
+async def test_student_cannot_read_job(client, db_session):
+    user = await make_user(db_session, role=UserRole.USER.value)
+    resp = await client.get("/api/grades/recompute-jobs/missing", headers=auth_headers(user))
+    assert resp.status_code == 403
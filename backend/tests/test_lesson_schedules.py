@@ -0,0 +1,295 @@
+from sqlalchemy import func, select
+
+from app.models.lesson import Lesson
+from app.models.student import Branch
+from app.models.user import UserRole
+from app.services.lesson_schedules import virtual_occurrences
+from tests.conftest import auth_headers, make_user, make_school, make_student
+
+
+def _payload(school_id, **overrides):
+    payload = {
+        "school_id": school_id,
+        "branch": "WING_TSUN",
+        "lesson_type": "GROUP",
+        "day_of_week": 0,
+        "start_time": "19:30",
+        "start_date": "2030-01-01",
+        "end_date": "2030-12-31",
+    }
+    payload.update(overrides)
+    return payload
+
+
+async def _lesson_count(db_session, schedule_id):
+    result = await db_session.execute(
+        select(func.count(Lesson.id)).where(Lesson.schedule_id == schedule_id)
+    )
+    return result.scalar_one()
+
+
+async def test_create_schedule_bulk_inserts_lessons(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Merkez")
+
+    resp = await client.post("/api/lesson-schedules/", json=_payload(school.id), headers=auth_headers(admin))
+    assert resp.status_code == 200
+    body = resp.json()
+    # 2030'da 52 pazartesi var
+    assert body["generated_count"] == 52
+    assert body["schedule"]["generated_lesson_count"] == 52
+    assert body["schedule"]["school_name"] == "Merkez"
+    assert await _lesson_count(db_session, body["schedule"]["id"]) == 52
+
+    result = await db_session.execute(
+        select(Lesson.lesson_date).where(Lesson.schedule_id == body["schedule"]["id"]).order_by(Lesson.lesson_date)
+    )
+    first = result.scalars().first()
+    assert (first.weekday(), first.hour, first.minute) == (0, 19, 30)
+
+
+async def test_extend_schedule_adds_only_missing_dates(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json=_payload(school.id, end_date="2030-01-31"),
+        headers=auth_headers(admin),
+    )
+    schedule_id = resp.json()["schedule"]["id"]
+    assert resp.json()["generated_count"] == 4
+
+    resp = await client.post(
+        f"/api/lesson-schedules/{schedule_id}/generate?new_end_date=2030-02-28",
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["generated"] == 4
+
+    resp = await client.post(f"/api/lesson-schedules/{schedule_id}/generate", headers=auth_headers(admin))
+    assert resp.json()["generated"] == 0
+    assert await _lesson_count(db_session, schedule_id) == 8
+
+
+async def test_extend_after_moving_a_lesson_does_not_regenerate_its_slot(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json=_payload(school.id, end_date="2030-01-31"),
+        headers=auth_headers(admin),
+    )
+    schedule_id = resp.json()["schedule"]["id"]
+    lesson_id = (
+        await db_session.execute(
+            select(Lesson.id).where(Lesson.schedule_id == schedule_id).order_by(Lesson.lesson_date)
+        )
+    ).scalars().first()
+
+    resp = await client.put(
+        f"/api/lessons/{lesson_id}",
+        json={"lesson_date": "2030-01-08T18:00:00"},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+
+    resp = await client.post(
+        f"/api/lesson-schedules/{schedule_id}/generate?new_end_date=2030-02-28",
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["generated"] == 4
+    assert await _lesson_count(db_session, schedule_id) == 8
+
+
+async def _virtual_schedule(client, admin, school, **overrides):
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json=_payload(school.id, end_date="2030-01-31", is_virtual=True, **overrides),
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["generated_count"] == 0
+    return resp.json()["schedule"]["id"]
+
+
+async def test_virtual_schedule_lists_occurrences_without_rows(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    schedule_id = await _virtual_schedule(client, admin, school)
+    assert await _lesson_count(db_session, schedule_id) == 0
+
+    resp = await client.get(f"/api/lessons/?schedule_id={schedule_id}", headers=auth_headers(admin))
+    body = resp.json()
+    assert body["total"] == 4
+    assert all(item["is_virtual"] for item in body["items"])
+    assert body["items"][0]["id"] == f"{schedule_id}@2030-01-28"
+
+    resp = await client.get(f"/api/lessons/{schedule_id}@2030-01-14", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert resp.json()["lesson_date"] == "2030-01-14T19:30:00"
+
+    # Programa uymayan tarih
+    resp = await client.get(f"/api/lessons/{schedule_id}@2030-01-15", headers=auth_headers(admin))
+    assert resp.status_code == 404
+
+
+async def test_attendance_materializes_virtual_occurrence(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    schedule_id = await _virtual_schedule(client, admin, school)
+    virtual_id = f"{schedule_id}@2030-01-14"
+
+    for _ in range(2):
+        resp = await client.post(
+            "/api/attendance/",
+            json={"lesson_id": virtual_id, "student_ids": [student.id]},
+            headers=auth_headers(admin),
+        )
+        assert resp.status_code == 200
+    assert await _lesson_count(db_session, schedule_id) == 1
+
+    resp = await client.get(f"/api/lessons/?schedule_id={schedule_id}", headers=auth_headers(admin))
+    body = resp.json()
+    assert body["total"] == 4
+    real = [item for item in body["items"] if not item["is_virtual"]]
+    assert len(real) == 1
+    assert real[0]["attendance_count"] == 1
+    assert real[0]["lesson_date"] == "2030-01-14T19:30:00"
+
+
+async def test_editing_virtual_occurrence_moves_it(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    schedule_id = await _virtual_schedule(client, admin, school)
+
+    resp = await client.put(
+        f"/api/lessons/{schedule_id}@2030-01-14",
+        json={"lesson_date": "2030-01-15T18:00:00", "notes": "Salı'ya alındı"},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["is_virtual"] is False
+
+    resp = await client.get(f"/api/lessons/?schedule_id={schedule_id}", headers=auth_headers(admin))
+    dates = [item["lesson_date"] for item in resp.json()["items"]]
+    assert resp.json()["total"] == 4
+    assert "2030-01-15T18:00:00" in dates
+    assert "2030-01-14T19:30:00" not in dates
+
+
+async def test_lesson_list_pages_long_virtual_schedules(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    schedule_ids = []
+    for day in (0, 2):
+        resp = await client.post(
+            "/api/lesson-schedules/",
+            json=_payload(school.id, day_of_week=day, end_date="2031-12-31", is_virtual=True),
+            headers=auth_headers(admin),
+        )
+        schedule_ids.append(resp.json()["schedule"]["id"])
+    # Biri yoklamayla olusur, biri baska gune tasinir; toplam degismez
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    await client.post(
+        "/api/attendance/",
+        json={"lesson_id": f"{schedule_ids[0]}@2031-06-02", "student_ids": [student.id]},
+        headers=auth_headers(admin),
+    )
+    await client.put(
+        f"/api/lessons/{schedule_ids[1]}@2031-06-04",
+        json={"lesson_date": "2031-06-05T18:00:00"},
+        headers=auth_headers(admin),
+    )
+
+    # Her programdan yalnizca en yeni dersler uretilir
+    newest = await virtual_occurrences(db_session, per_schedule_limit=3)
+    assert len(newest) == 6
+    assert min(item.lesson_date for item in newest).date().isoformat() == "2031-12-15"
+
+    seen, cursor = [], None
+    while True:
+        url = f"/api/lessons/?school_id={school.id}&limit=25"
+        resp = await client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=auth_headers(admin))
+        body = resp.json()
+        # 2030-2031: 104 pazartesi, 105 carsamba
+        assert body["total"] == 209
+        seen += [(item["lesson_date"], item["id"]) for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 209
+    assert seen == sorted(seen, reverse=True)
+
+    resp = await client.get(f"/api/lessons/?school_id={school.id}&skip=50&limit=25", headers=auth_headers(admin))
+    assert [(item["lesson_date"], item["id"]) for item in resp.json()["items"]] == seen[50:75]
+
+
+async def test_offline_sync_accepts_virtual_lesson_id(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    schedule_id = await _virtual_schedule(client, admin, school)
+
+    resp = await client.post(
+        "/api/attendance/sync",
+        json={"operations": [{
+            "op_id": "tablet-1",
+            "operation": "ADD",
+            "lesson_id": f"{schedule_id}@2030-01-21",
+            "student_id": student.id,
+        }]},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["results"][0]["status"] == "APPLIED"
+    assert await _lesson_count(db_session, schedule_id) == 1
+
+
+async def test_delete_schedule_keeps_attended_lessons(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json=_payload(school.id, end_date="2030-01-31"),
+        headers=auth_headers(admin),
+    )
+    schedule_id = resp.json()["schedule"]["id"]
+
+    lesson_id = (await db_session.execute(
+        select(Lesson.id).where(Lesson.schedule_id == schedule_id).order_by(Lesson.lesson_date).limit(1)
+    )).scalar_one()
+    await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson_id, "student_ids": [student.id]},
+        headers=auth_headers(admin),
+    )
+
+    resp = await client.delete(f"/api/lesson-schedules/{schedule_id}", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert resp.json()["deleted_count"] == 3
+    assert await _lesson_count(db_session, schedule_id) == 1
+
+    resp = await client.get(f"/api/lesson-schedules/{schedule_id}", headers=auth_headers(admin))
+    assert resp.json()["is_active"] is False
+
+    resp = await client.delete("/api/lesson-schedules/missing", headers=auth_headers(admin))
+    assert resp.status_code == 404
+
+
+async def test_list_schedules_reports_lesson_counts(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Merkez")
+    await client.post(
+        "/api/lesson-schedules/",
+        json=_payload(school.id, end_date="2030-01-31"),
+        headers=auth_headers(admin),
+    )
+
+    resp = await client.get("/api/lesson-schedules/", headers=auth_headers(admin))
+    item = resp.json()["items"][0]
+    assert (item["generated_lesson_count"], item["school_name"]) == (4, "Merkez")
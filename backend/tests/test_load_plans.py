@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+
+from app.load_plans import LOAD_PLANS, load_plan
+from app.models.school import School
+from app.models.student import Branch, Student
+from app.models.user import UserRole
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_lesson
+
+
+async def test_unloaded_relationship_raises(db_session):
+    school = await make_school(db_session)
+    await make_student(db_session, school)
+    db_session.expunge_all()
+
+    loaded = (await db_session.execute(select(School).where(School.id == school.id))).scalar_one()
+    with pytest.raises(InvalidRequestError):
+        loaded.students
+
+
+async def test_load_plan_loads_requested_relationships(db_session):
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 0)})
+    db_session.expunge_all()
+
+    loaded = (
+        await db_session.execute(
+            select(Student).options(*load_plan("student_list")).where(Student.id == student.id)
+        )
+    ).scalar_one()
+    assert loaded.school.name == school.name
+    assert len(loaded.progress) == 1
+    with pytest.raises(InvalidRequestError):
+        loaded.attendances
+
+
+def test_unknown_plan_name_raises():
+    with pytest.raises(KeyError):
+        load_plan("does_not_exist")
+    assert "student_list" in LOAD_PLANS
+
+
+async def test_list_schools_with_students_and_lessons(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    await make_student(db_session, school)
+    await make_lesson(db_session, school, admin)
+
+    resp = await client.get("/api/schools/", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 1
+
+
+async def test_delete_lesson_with_attendance_does_not_hydrate_children(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 10)})
+    lesson = await make_lesson(db_session, school, admin)
+
+    await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson.id, "student_ids": [student.id]},
+        headers=auth_headers(admin),
+    )
+    resp = await client.delete(f"/api/lessons/{lesson.id}", headers=auth_headers(admin))
+    assert resp.status_code == 200
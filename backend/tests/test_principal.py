@@ -0,0 +1,93 @@
+from sqlalchemy import update
+
+from app.models.user import User, UserRole
+from app.permissions import Permission
+from app.principal import get_cached_principal, load_principal
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager, make_student
+
+
+async def test_principal_carries_scope_fields(db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    school_a = await make_school(db_session, name="A")
+    school_b = await make_school(db_session, name="B")
+    await make_school_manager(db_session, school_a, manager)
+    await make_school_manager(db_session, school_b, manager)
+
+    principal = await load_principal(db_session, manager.id)
+    assert principal.role == UserRole.MANAGER.value
+    assert principal.managed_school_ids == {school_a.id, school_b.id}
+    assert principal.student_id is None
+
+    student = await make_student(db_session, school_a)
+    student_principal = await load_principal(db_session, student.user_id)
+    assert student_principal.student_id == student.id
+    assert student_principal.managed_school_ids == frozenset()
+
+
+async def test_cached_principal_is_reused_until_invalidated(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+
+    resp = await client.get("/api/users/", headers=auth_headers(manager))
+    assert resp.status_code == 403
+    assert get_cached_principal(manager.id) is not None
+
+    # Dogrudan DB degisikligi onbellegi atlamaz
+    await db_session.execute(
+        update(User).where(User.id == manager.id).values(extra_permissions=[Permission.MANAGE_USERS.value])
+    )
+    await db_session.commit()
+    resp = await client.get("/api/users/", headers=auth_headers(manager))
+    assert resp.status_code == 403
+
+    # update_user ile yapilan degisiklik principal'i gecersiz kilar
+    resp = await client.put(
+        f"/api/users/{manager.id}",
+        json={"extra_permissions": [Permission.MANAGE_USERS.value]},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert get_cached_principal(manager.id) is None
+
+    resp = await client.get("/api/users/", headers=auth_headers(manager))
+    assert resp.status_code == 200
+
+
+async def test_suspend_invalidates_student_principal(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student_user = await make_user(db_session, role=UserRole.USER.value)
+    student = await make_student(db_session, school, user=student_user)
+
+    await client.get("/api/dashboard/stats", headers=auth_headers(student_user))
+    assert get_cached_principal(student.user_id).role == UserRole.USER.value
+
+    resp = await client.post(f"/api/students/{student.id}/suspend", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert get_cached_principal(student.user_id) is None
+
+    principal = await load_principal(db_session, student.user_id)
+    assert principal.role == UserRole.MEMBER.value
+
+
+async def test_assign_manager_invalidates_managed_schools(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    school = await make_school(db_session)
+
+    assert (await load_principal(db_session, manager.id)).managed_school_ids == frozenset()
+
+    resp = await client.post(
+        f"/api/schools/{school.id}/managers",
+        json={"user_id": manager.id},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert (await load_principal(db_session, manager.id)).managed_school_ids == {school.id}
+
+
+async def test_me_returns_full_user(client, db_session):
+    user = await make_user(db_session, role=UserRole.USER.value)
+    resp = await client.get("/api/auth/me", headers=auth_headers(user))
+    assert resp.status_code == 200
+    assert resp.json()["email"] == user.email
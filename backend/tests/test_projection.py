@@ -0,0 +1,130 @@
+from app.models.user import UserRole
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_lesson
+
+
+async def _get(client, caller, url, **params):
+    resp = await client.get(url, params=params, headers=auth_headers(caller))
+    assert resp.status_code == 200
+    return resp.json()
+
+
+async def test_student_fields_return_only_requested_columns(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Kadıköy")
+    students = [await make_student(db_session, school) for _ in range(3)]
+
+    full = await _get(client, admin, "/api/students/")
+    body = await _get(client, admin, "/api/students/", fields="id,user_name,school_name")
+    assert body["total"] == 3
+    assert body["items"] == [
+        {"id": item["id"], "user_name": item["user_name"], "school_name": "Kadıköy"}
+        for item in full["items"]
+    ]
+    assert sorted(item["id"] for item in body["items"]) == sorted(s.id for s in students)
+
+
+async def test_projection_follows_cursor(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    for _ in range(5):
+        await make_student(db_session, school)
+
+    ids, cursor = [], None
+    for _ in range(10):
+        params = {"fields": "user_email", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = await _get(client, admin, "/api/students/", **params)
+        assert all(list(item) == ["user_email"] for item in body["items"])
+        ids.extend(item["user_email"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    full = (await _get(client, admin, "/api/students/"))["items"]
+    assert ids == [item["user_email"] for item in full]
+    assert len(ids) == 5
+
+
+async def test_projection_with_search(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    await make_student(db_session, school)
+    await make_student(db_session, school)
+
+    body = await _get(client, admin, "/api/students/", fields="id", search="test user")
+    assert body["total"] == 2
+    assert len(body["items"]) == 2
+    body = await _get(client, admin, "/api/users/", fields="id,first_name", search="tes")
+    assert {item["first_name"] for item in body["items"]} == {"Test"}
+
+
+async def test_user_fields_include_student_school(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Beşiktaş")
+    student = await make_student(db_session, school)
+
+    body = await _get(client, admin, "/api/users/", fields="id,email,school_name,extra_permissions")
+    by_id = {item["id"]: item for item in body["items"]}
+    assert by_id[student.user_id]["school_name"] == "Beşiktaş"
+    assert by_id[admin.id]["school_name"] is None
+    assert set(by_id[admin.id]) == {"id", "email", "school_name", "extra_permissions"}
+
+
+async def test_school_fields_for_picker(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    await make_school(db_session, name="A")
+    await make_school(db_session, name="B")
+
+    body = await _get(client, admin, "/api/schools/", fields="id,name")
+    assert body["total"] == 2
+    assert sorted(item["name"] for item in body["items"]) == ["A", "B"]
+    assert all(set(item) == {"id", "name"} for item in body["items"])
+
+
+async def test_lesson_fields_merge_virtual_occurrences(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Üsküdar")
+    await make_lesson(db_session, school, admin, duration_hours=1.5)
+    resp = await client.post(
+        "/api/lesson-schedules/",
+        json={
+            "school_id": school.id,
+            "branch": "WING_TSUN",
+            "lesson_type": "GROUP",
+            "day_of_week": 0,
+            "start_time": "19:30",
+            "start_date": "2030-01-01",
+            "end_date": "2030-01-31",
+            "is_virtual": True,
+        },
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+
+    full = await _get(client, admin, "/api/lessons/")
+    body = await _get(
+        client, admin, "/api/lessons/",
+        fields="id,lesson_date,duration_hours,school_name,attendance_count,is_virtual",
+    )
+    assert body["total"] == full["total"] == 5
+    assert [item["id"] for item in body["items"]] == [item["id"] for item in full["items"]]
+    real = [item for item in body["items"] if not item["is_virtual"]]
+    assert real == [{
+        "id": real[0]["id"],
+        "lesson_date": real[0]["lesson_date"],
+        "duration_hours": 1.5,
+        "school_name": "Üsküdar",
+        "attendance_count": 0,
+        "is_virtual": False,
+    }]
+
+
+async def test_unknown_or_nested_field_is_rejected(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    resp = await client.get(
+        "/api/students/", params={"fields": "id,progress"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 400
+    assert "progress" in resp.json()["detail"]
+    resp = await client.get(
+        "/api/users/", params={"fields": "password_hash"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 400
@@ -0,0 +1,72 @@
+from sqlalchemy import select
+
+from app.models.student import Student
+from app.models.user import UserRole
+from app.principal import Principal
+from app.services.school_scope import school_scope
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager, make_student
+
+
+def _principal(role: str, school_ids=()) -> Principal:
+    return Principal(id="u1", role=role, status="ACTIVE", managed_school_ids=frozenset(school_ids))
+
+
+def test_only_managers_are_restricted():
+    assert not school_scope(_principal(UserRole.ADMIN.value)).restricted
+    assert not school_scope(None).restricted
+
+    scope = school_scope(_principal(UserRole.MANAGER.value, ["s1"]))
+    assert scope.allows("s1")
+    assert not scope.allows("s2")
+    assert not scope.allows(None)
+
+
+async def test_scope_filter_limits_query(db_session):
+    own = await make_school(db_session, name="Own")
+    other = await make_school(db_session, name="Other")
+    mine = await make_student(db_session, own)
+    await make_student(db_session, other)
+
+    scope = school_scope(_principal(UserRole.MANAGER.value, [own.id]))
+    rows = (await db_session.execute(scope.apply(select(Student.id), Student.school_id))).scalars().all()
+    assert rows == [mine.id]
+
+    empty = school_scope(_principal(UserRole.MANAGER.value))
+    rows = (await db_session.execute(empty.apply(select(Student.id), Student.school_id))).scalars().all()
+    assert rows == []
+
+
+async def test_manager_with_two_schools_dashboard(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    school_a = await make_school(db_session, name="A")
+    school_b = await make_school(db_session, name="B")
+    await make_school_manager(db_session, school_a, manager)
+    await make_school_manager(db_session, school_b, manager)
+    await make_student(db_session, school_a)
+    await make_student(db_session, school_b)
+
+    resp = await client.get("/api/dashboard/stats", headers=auth_headers(manager))
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["school_name"] == "A, B"
+    assert body["total_students"] == 2
+
+
+async def test_manager_cannot_create_lesson_outside_scope(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    own = await make_school(db_session, name="Own")
+    other = await make_school(db_session, name="Other")
+    await make_school_manager(db_session, own, manager)
+
+    payload = {
+        "school_id": other.id,
+        "branch": "WING_TSUN",
+        "lesson_type": "GROUP",
+        "lesson_date": "2030-01-01T10:00:00",
+    }
+    resp = await client.post("/api/lessons/", json=payload, headers=auth_headers(manager))
+    assert resp.status_code == 403
+
+    payload["school_id"] = own.id
+    resp = await client.post("/api/lessons/", json=payload, headers=auth_headers(manager))
+    assert resp.status_code == 200
@@ -0,0 +1,117 @@
+from sqlalchemy import select
+
+from app.models.student import Branch
+from app.models.student_directory import StudentDirectory
+from app.models.user import UserRole, UserStatus
+from app.services.student_directory import rebuild_student_directory
+from tests.conftest import auth_headers, make_user, make_school, make_student, make_lesson
+
+
+async def _listed(client, caller, student_id, url="/api/students/"):
+    resp = await client.get(url, headers=auth_headers(caller))
+    assert resp.status_code == 200
+    return next((item for item in resp.json()["items"] if item["id"] == student_id), None)
+
+
+async def test_attendance_updates_directory_hours(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (1, 43)})
+    lesson = await make_lesson(db_session, school, admin, duration_hours=2.0)
+
+    before = await _listed(client, admin, student.id)
+    assert before["progress"][0]["exam_eligibility"] == "NOT_ELIGIBLE"
+
+    resp = await client.post(
+        "/api/attendance/",
+        json={"lesson_id": lesson.id, "student_ids": [student.id]},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+
+    progress = (await _listed(client, admin, student.id))["progress"][0]
+    assert progress["completed_hours"] == 45.0
+    assert progress["remaining_hours"] == 9.0
+    assert progress["exam_eligibility"] == "NEEDS_APPROVAL"
+
+
+async def test_user_and_school_changes_reach_directory(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school)
+
+    resp = await client.put(
+        f"/api/users/{student.user_id}", json={"first_name": "Zeynep"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 200
+    resp = await client.put(
+        f"/api/schools/{school.id}", json={"name": "Yeni Okul"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 200
+
+    listed = await _listed(client, admin, student.id)
+    assert listed["user_name"] == "Zeynep User"
+    assert listed["school_name"] == "Yeni Okul"
+
+    resp = await client.delete(f"/api/users/{student.user_id}", headers=auth_headers(admin))
+    assert resp.status_code == 200
+    assert await _listed(client, admin, student.id) is None
+
+
+async def test_application_is_listed_as_pending(client, db_session):
+    manager = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    applicant = await make_user(db_session, role=UserRole.MEMBER.value)
+
+    resp = await client.post(
+        "/api/students/apply", json={"school_id": school.id}, headers=auth_headers(applicant)
+    )
+    assert resp.status_code == 200
+    student_id = resp.json()["id"]
+
+    pending = await _listed(client, manager, student_id, url="/api/students/pending")
+    assert pending["user_email"] == applicant.email
+
+    resp = await client.post(
+        f"/api/students/{student_id}/approve", json={"approved": True}, headers=auth_headers(manager)
+    )
+    assert resp.status_code == 200
+    assert await _listed(client, manager, student_id, url="/api/students/pending") is None
+    assert [p["branch"] for p in (await _listed(client, manager, student_id))["progress"]] == [
+        Branch.WING_TSUN.value, Branch.ESCRIMA.value,
+    ]
+
+
+async def test_mail_recipients_filter_by_branch_grade(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    await make_student(db_session, school, grades={Branch.ESCRIMA.value: (3, 0)})
+    await make_student(db_session, school, grades={Branch.ESCRIMA.value: (6, 0)})
+    await make_student(db_session, school, grades={Branch.WING_TSUN.value: (4, 0)})
+    pending = await make_user(db_session, role=UserRole.USER.value, status=UserStatus.PENDING.value)
+    await make_student(db_session, school, pending, grades={Branch.ESCRIMA.value: (4, 0)})
+
+    resp = await client.post(
+        "/api/mail/send",
+        json={"subject": "Duyuru", "body": "...", "branch": "ESCRIMA", "grade_min": 2, "grade_max": 5},
+        headers=auth_headers(admin),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["recipient_count"] == 1
+
+
+async def test_rebuild_matches_incremental_refresh(db_session):
+    school = await make_school(db_session)
+    for hours in (0, 50):
+        await make_student(db_session, school, grades={Branch.WING_TSUN.value: (2, hours)})
+
+    def snapshot(rows):
+        return sorted(
+            (r.student_id, r.wt_grade, float(r.wt_remaining_hours), r.wt_exam_eligibility)
+            for r in rows
+        )
+
+    query = select(StudentDirectory).execution_options(populate_existing=True)
+    incremental = snapshot((await db_session.execute(query)).scalars().all())
+    assert await rebuild_student_directory(db_session) == 2
+    assert snapshot((await db_session.execute(query)).scalars().all()) == incremental
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import zipfile
+from xml.etree import ElementTree
+
+from app.models.student import Branch
+from app.models.user import UserRole
+from app.services.student_directory import refresh_student_directory
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager, make_student
+
+
+async def _export(client, caller, fmt, **params):
+    resp = await client.get(
+        "/api/students/export", params={"format": fmt, **params}, headers=auth_headers(caller)
+    )
+    assert resp.status_code == 200
+    assert "attachment" in resp.headers["content-disposition"]
+    return resp
+
+
+async def test_csv_export_includes_progress_columns(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school, grades={Branch.WING_TSUN.value: (2, 50)})
+
+    resp = await _export(client, admin, "csv")
+    rows = list(csv.DictReader(io.StringIO(resp.content.decode("utf-8-sig"))))
+    assert len(rows) == 1
+    assert rows[0]["student_id"] == student.id
+    assert rows[0]["wt_grade"] == "2"
+    assert rows[0]["wt_remaining_hours"] == "4.0"
+    assert rows[0]["wt_exam_eligibility"] == "NEEDS_APPROVAL"
+    assert rows[0]["escrima_grade"] == ""
+
+
+async def test_csv_export_neutralizes_formula_cells(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    user = await make_user(db_session)
+    user.first_name = '=HYPERLINK("http://x","a")'
+    user.last_name = "@SUM(A1)"
+    await db_session.commit()
+    await make_student(db_session, school, user=user, grades={Branch.WING_TSUN.value: (2, 50)})
+
+    resp = await _export(client, admin, "csv")
+    rows = list(csv.DictReader(io.StringIO(resp.content.decode("utf-8-sig"))))
+    assert rows[0]["first_name"] == '\'=HYPERLINK("http://x","a")'
+    assert rows[0]["last_name"] == "'@SUM(A1)"
+    assert rows[0]["wt_grade"] == "2"
+
+    resp = await _export(client, admin, "ndjson")
+    assert json.loads(resp.content.splitlines()[0])["first_name"] == '=HYPERLINK("http://x","a")'
+
+
+async def test_ndjson_export_is_scoped_to_manager_schools(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    own_school = await make_school(db_session, name="Own")
+    other_school = await make_school(db_session, name="Other")
+    await make_school_manager(db_session, own_school, manager)
+    own = [await make_student(db_session, own_school) for _ in range(3)]
+    await make_student(db_session, other_school)
+
+    resp = await _export(client, manager, "ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(line["student_id"] for line in lines) == sorted(s.id for s in own)
+    assert {line["school_name"] for line in lines} == {"Own"}
+
+
+async def test_xlsx_export_is_a_readable_workbook(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session, name="Şişli & Co")
+    await make_student(db_session, school)
+
+    resp = await _export(client, admin, "xlsx")
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+    assert sheet.count("<row>") == 2
+    assert "Şişli &amp; Co" in sheet
+
+
+async def test_xlsx_export_strips_xml_illegal_characters(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    student = await make_student(db_session, school)
+    student.emergency_contact = "Anne\x07 Baba\x0b\x00"
+    await db_session.commit()
+    await refresh_student_directory(db_session, [student.id])
+    await db_session.commit()
+
+    resp = await _export(client, admin, "xlsx")
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    texts = [node.text for node in sheet.iter("{http://schemas.openxmlformats.org/spreadsheetml/2006/main}t")]
+    assert "Anne Baba" in texts
+
+
+async def test_export_rejects_unknown_format(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    resp = await client.get(
+        "/api/students/export", params={"format": "pdf"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 422
+
+
+async def test_export_applies_search(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    await make_student(db_session, school)
+    await make_student(db_session, school)
+
+    resp = await _export(client, admin, "ndjson", search="test")
+    assert len(resp.text.splitlines()) == 2
+
+    user = await make_user(db_session, role=UserRole.USER.value, email="gulsen@test.com")
+    named = await make_student(db_session, school, user)
+    resp = await _export(client, admin, "ndjson", search="gülşen")
+    assert [json.loads(line)["student_id"] for line in resp.text.splitlines()] == [named.id]
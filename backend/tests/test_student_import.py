@@ -0,0 +1,223 @@
+import asyncio
+import io
+import zipfile
+
+from sqlalchemy import func, select
+
+from app.auth import pwd_context
+from app.models.student import Student, StudentProgress
+from app.models.student_directory import StudentDirectory
+from app.models.user import User, UserRole, UserStatus
+from app.config import settings
+from app.services import student_import
+from app.services.password_hashing import hashing_stats
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager
+
+
+async def _import(client, caller, school, content, filename="students.csv", **form):
+    return await client.post(
+        "/api/students/import",
+        files={"file": (filename, content)},
+        data={"school_id": school.id, **form},
+        headers=auth_headers(caller),
+    )
+
+
+async def _count(db_session, model) -> int:
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def test_csv_import_creates_students_and_reports_bad_rows(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    existing = await make_user(db_session, email="taken@test.com")
+    school = await make_school(db_session)
+    existing_email = existing.email
+
+    content = (
+        "\ufeffemail,first_name,last_name,phone,password,date_of_birth\n"
+        "ayse@test.com,Ayşe,Yılmaz,5551112233,secret123,2001-04-05\n"
+        "not-an-email,Ali,Kaya,,,\n"
+        f"{existing_email},Eski,Kayit,,,\n"
+        "mehmet@test.com,Mehmet,Demir,,,\n"
+        "ayse@test.com,Ayşe,Tekrar,,,\n"
+        ",,,,,\n"
+        "zeynep@test.com,,Ak,,,\n"
+    ).encode()
+    resp = await _import(client, admin, school, content, default_password="ilksifre1")
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["total_rows"] == 6
+    assert report["created"] == 2
+    assert [(error["row"], error["email"]) for error in report["errors"]] == [
+        (3, "not-an-email"),
+        (4, existing_email),
+        (6, "ayse@test.com"),
+        (8, "zeynep@test.com"),
+    ]
+
+    users = {
+        user.email: user
+        for user in (await db_session.execute(
+            select(User).where(User.email.in_(["ayse@test.com", "mehmet@test.com"]))
+        )).scalars()
+    }
+    assert users["ayse@test.com"].role == UserRole.USER.value
+    assert users["ayse@test.com"].status == UserStatus.ACTIVE.value
+    assert users["ayse@test.com"].search_text == "ayse yilmaz ayse@test.com"
+    assert pwd_context.verify("secret123", users["ayse@test.com"].password_hash)
+    assert pwd_context.verify("ilksifre1", users["mehmet@test.com"].password_hash)
+
+    assert await _count(db_session, Student) == 2
+    assert await _count(db_session, StudentProgress) == 4
+    rows = (await db_session.execute(select(StudentDirectory))).scalars().all()
+    assert {row.email for row in rows} == {"ayse@test.com", "mehmet@test.com"}
+    assert all(row.wt_grade == 1 and row.escrima_grade == 1 for row in rows)
+
+    login = await client.post("/api/auth/login", json={"email": "ayse@test.com", "password": "secret123"})
+    assert login.status_code == 200
+
+
+async def test_rows_without_password_fail_without_default(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    content = b"email,first_name,last_name\nnopass@test.com,No,Pass\n"
+    resp = await _import(client, admin, school, content)
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 0
+    assert resp.json()["errors"][0]["message"] == "Şifre belirtilmemiş"
+
+
+async def test_shared_default_password_is_hashed_once(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    lines = ["email,first_name,last_name"] + [f"s{i}@test.com,Ogrenci,{i}" for i in range(200)]
+    before = hashing_stats()["completed"]
+    resp = await _import(client, admin, school, "\n".join(lines).encode(), default_password="ilksifre1")
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 200
+    assert hashing_stats()["completed"] - before == 1
+    assert await _count(db_session, StudentDirectory) == 200
+
+
+async def test_per_row_passwords_leave_a_hashing_thread_free(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 4)
+    in_flight, peak, jobs = 0, 0, []
+
+    async def fake_run_hashing(func, *args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        jobs.append(args)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return f"hash:{args[0]}"
+
+    monkeypatch.setattr(student_import, "run_hashing", fake_run_hashing)
+    passwords = {f"secret{i}" for i in range(20)}
+    hashes = await student_import.hash_passwords(passwords)
+
+    assert hashes == {password: f"hash:{password}" for password in passwords}
+    # Her sifre ayri is; ayni anda en fazla worker - 1 is
+    assert len(jobs) == 20
+    assert peak == 3
+
+
+def _xlsx(rows) -> bytes:
+    shared = sorted({value for row in rows for value in row if isinstance(value, str)})
+    sheet_rows = []
+    for number, row in enumerate(rows, start=1):
+        cells = []
+        for column, value in enumerate(row):
+            ref = f"{chr(ord('A') + column)}{number}"
+            if isinstance(value, str):
+                cells.append(f'<c r="{ref}" t="s"><v>{shared.index(value)}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{number}">{"".join(cells)}</row>')
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "xl/workbook.xml",
+            f'<workbook {ns} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Liste" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        archive.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/liste.xml" Type="worksheet"/></Relationships>',
+        )
+        archive.writestr(
+            "xl/sharedStrings.xml",
+            f"<sst {ns}>" + "".join(f"<si><t>{value}</t></si>" for value in shared) + "</sst>",
+        )
+        archive.writestr(
+            "xl/worksheets/liste.xml",
+            f"<worksheet {ns}><sheetData>{''.join(sheet_rows)}</sheetData></worksheet>",
+        )
+    return buffer.getvalue()
+
+
+async def test_xlsx_import_reads_shared_strings_and_dates(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    content = _xlsx([
+        ["Email", "First_Name", "Last_Name", "Phone", "Date_Of_Birth"],
+        ["xlsx@test.com", "Işıl", "Güneş", 5551234567, 36526],
+    ])
+    resp = await _import(
+        client, admin, school, content, filename="liste.xlsx", default_password="ilksifre1"
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"total_rows": 1, "created": 1, "dry_run": False, "errors": []}
+
+    row = (await db_session.execute(select(StudentDirectory))).scalar_one()
+    assert (row.first_name, row.last_name) == ("Işıl", "Güneş")
+    assert row.date_of_birth.isoformat() == "2000-01-01"
+    user = (await db_session.execute(select(User).where(User.email == "xlsx@test.com"))).scalar_one()
+    assert user.phone == "5551234567"
+
+
+async def test_dry_run_validates_without_writing(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+    users_before = await _count(db_session, User)
+
+    content = b"email,first_name,last_name,password\ndry@test.com,Dry,Run,secret123\n"
+    resp = await _import(client, admin, school, content, dry_run="true")
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 1
+    assert resp.json()["dry_run"] is True
+    assert await _count(db_session, User) == users_before
+    assert await _count(db_session, Student) == 0
+
+
+async def test_manager_cannot_import_into_other_school(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    manager.extra_permissions = ["manage_users"]
+    await db_session.commit()
+    own_school = await make_school(db_session, name="Own")
+    other_school = await make_school(db_session, name="Other")
+    await make_school_manager(db_session, own_school, manager)
+
+    content = b"email,first_name,last_name,password\nm@test.com,M,N,secret123\n"
+    resp = await _import(client, manager, other_school, content)
+    assert resp.status_code == 403
+    resp = await _import(client, manager, own_school, content)
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 1
+
+
+async def test_missing_required_column_is_rejected(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    school = await make_school(db_session)
+
+    resp = await _import(client, admin, school, b"email,first_name\na@test.com,A\n")
+    assert resp.status_code == 400
+    assert "last_name" in resp.json()["detail"]
+
+    resp = await _import(client, admin, school, b"x", filename="students.txt")
+    assert resp.status_code == 400
@@ -0,0 +1,88 @@
+from app.models.user import UserRole
+from app.utils import fold_search_text
+from tests.conftest import auth_headers, make_user, make_school, make_school_manager, make_student
+
+
+class TestFoldSearchText:
+    def test_turkish_letters_and_case_fold_to_ascii(self):
+        assert fold_search_text("Işıl", "GÜNEŞ") == "isil gunes"
+        assert fold_search_text("İLKER", "Çağrı") == "ilker cagri"
+
+    def test_skips_empty_parts(self):
+        assert fold_search_text("  Ayşe ", None, "") == "ayse"
+
+
+async def _named_user(db_session, first_name, last_name, email=None):
+    user = await make_user(db_session, role=UserRole.USER.value, email=email)
+    user.first_name = first_name
+    user.last_name = last_name
+    await db_session.commit()
+    return user
+
+
+async def _search(client, caller, url, term, **params):
+    resp = await client.get(url, params={"search": term, **params}, headers=auth_headers(caller))
+    assert resp.status_code == 200
+    return resp.json()
+
+
+async def test_user_search_ignores_case_and_accents(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    isil = await _named_user(db_session, "Işıl", "Güneş")
+    await _named_user(db_session, "Mehmet", "Yılmaz")
+
+    body = await _search(client, admin, "/api/users/", "ISIL gunes")
+    assert [item["id"] for item in body["items"]] == [isil.id]
+    assert body["total"] == 1
+
+    # Kisa parca dizin disinda LIKE ile elenir
+    body = await _search(client, admin, "/api/users/", "yı")
+    assert [item["last_name"] for item in body["items"]] == ["Yılmaz"]
+
+
+async def test_search_follows_user_updates(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    user = await _named_user(db_session, "Ayşe", "Demir")
+
+    resp = await client.put(
+        f"/api/users/{user.id}", json={"last_name": "Kaya"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 200
+
+    assert (await _search(client, admin, "/api/users/", "demir"))["items"] == []
+    assert [i["id"] for i in (await _search(client, admin, "/api/users/", "ayse kaya"))["items"]] == [user.id]
+
+
+async def test_best_match_ranks_first(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    await _named_user(db_session, "Kemal", "Kemaloğlu", email="kemal.kemaloglu@test.com")
+    partial = await _named_user(db_session, "Ali", "Kemaloğlu")
+
+    body = await _search(client, admin, "/api/users/", "kemaloglu ali")
+    assert [item["id"] for item in body["items"]] == [partial.id]
+
+    body = await _search(client, admin, "/api/users/", "kemal")
+    assert body["items"][0]["first_name"] == "Kemal"
+    assert body["next_cursor"] is None
+
+
+async def test_student_search_is_scoped_to_manager_schools(client, db_session):
+    manager = await make_user(db_session, role=UserRole.MANAGER.value)
+    own_school = await make_school(db_session, name="Own")
+    other_school = await make_school(db_session, name="Other")
+    await make_school_manager(db_session, own_school, manager)
+
+    own = await make_student(db_session, own_school, await _named_user(db_session, "Şule", "Öztürk"))
+    await make_student(db_session, other_school, await _named_user(db_session, "Sule", "Ozturk"))
+
+    body = await _search(client, manager, "/api/students/", "sule ozturk")
+    assert [item["id"] for item in body["items"]] == [own.id]
+    assert body["total"] == 1
+
+
+async def test_cursor_is_rejected_for_ranked_search(client, db_session):
+    admin = await make_user(db_session, role=UserRole.ADMIN.value)
+    resp = await client.get(
+        "/api/users/", params={"search": "test", "cursor": "abc"}, headers=auth_headers(admin)
+    )
+    assert resp.status_code == 400